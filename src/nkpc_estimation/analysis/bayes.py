@@ -0,0 +1,345 @@
+"""Functions for the Bayesian estimation of the regression grid."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from nkpc_estimation.analysis.results import FULL_SAMPLE
+
+DEFAULT_PRIOR = {"mean": 0.0, "precision": 0.01, "shape": 0.01, "scale": 0.01}
+"""dict: The Normal-Inverse-Gamma prior of the coefficients and error variance."""
+
+
+def nig_posterior(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    prior: dict[str, float] | None = None,
+) -> dict[str, np.ndarray]:
+    """Compute the conjugate Normal-Inverse-Gamma posteriors of a batch of regressions.
+
+    The prior is ``beta | sigma2 ~ N(mean, sigma2 / precision * I)`` and
+    ``sigma2 ~ IG(shape, scale)``.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        prior (dict, optional): The prior 'mean', 'precision', 'shape', and 'scale'.
+            Defaults to :data:`DEFAULT_PRIOR`.
+
+    Returns:
+        dict: The posterior 'mean' of shape (n_models, n_params), 'precision' of shape
+            (n_models, n_params, n_params), 'shape', and 'scale' of shape (n_models,).
+
+    """
+    prior = DEFAULT_PRIOR | (prior or {})
+    endog = np.asarray(outcome_variable, dtype=float)
+    k_params = design.shape[2]
+    prior_mean = np.full(k_params, prior["mean"])
+    prior_precision = prior["precision"] * np.eye(k_params)
+    precision = np.einsum("mnk,mnl->mkl", design, design) + prior_precision
+    mean = np.linalg.solve(
+        precision,
+        (np.einsum("mnk,n->mk", design, endog) + prior_precision @ prior_mean)[
+            ..., None
+        ],
+    )[..., 0]
+    scale = prior["scale"] + 0.5 * (
+        endog @ endog
+        + prior_mean @ prior_precision @ prior_mean
+        - np.einsum("mk,mkl,ml->m", mean, precision, mean)
+    )
+    return {
+        "mean": mean,
+        "precision": precision,
+        "shape": prior["shape"] + 0.5 * len(endog),
+        "scale": scale,
+    }
+
+
+def posterior_moments(posterior: dict[str, np.ndarray]) -> tuple[np.ndarray, ...]:
+    """Compute the mean and covariance of the marginal posterior of the coefficients.
+
+    Args:
+        posterior (dict): The output of :func:`nig_posterior`.
+
+    Returns:
+        tuple: The means of shape (n_models, n_params) and covariances of shape
+            (n_models, n_params, n_params) of the multivariate t posteriors.
+
+    """
+    factor = posterior["scale"] / (posterior["shape"] - 1)
+    return (
+        posterior["mean"],
+        factor[:, None, None] * np.linalg.inv(posterior["precision"]),
+    )
+
+
+def draw_nig(
+    posterior: dict[str, np.ndarray],
+    n_draws: int = 2_000,
+    n_chains: int = 4,
+    seed: int = 0,
+    n_workers: int | None = 1,
+) -> dict[str, np.ndarray]:
+    """Draw exactly from Normal-Inverse-Gamma posteriors.
+
+    Each chain has its own child seed of ``seed``, so the draws do not depend on the
+    number of workers. All models of a chain are drawn with batched operations.
+
+    Args:
+        posterior (dict): The output of :func:`nig_posterior`.
+        n_draws (int): The number of draws per chain. Defaults to 2_000.
+        n_chains (int): The number of chains. Defaults to 4.
+        seed (int): The seed of the random number generators. Defaults to 0.
+        n_workers (int, optional): The number of processes. If None, the number of
+            processors of the machine is used. Defaults to 1.
+
+    Returns:
+        dict: The float32 draws of the coefficients of shape (n_models, n_chains,
+            n_draws, n_params) and of the error variance of shape (n_models, n_chains,
+            n_draws).
+
+    """
+    seeds = np.random.SeedSequence(seed).spawn(n_chains)
+    args = [(posterior, n_draws, chain_seed) for chain_seed in seeds]
+    return _map_chains(_nig_chain, args, n_workers)
+
+
+def gibbs_tvp(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    prior: dict[str, float] | None = None,
+    state_shape: float = 2.0,
+    state_scale: float = 0.01,
+    n_draws: int = 1_000,
+    n_burn: int = 500,
+    n_chains: int = 4,
+    seed: int = 0,
+    n_workers: int | None = 1,
+) -> dict[str, np.ndarray]:
+    """Draw from the posterior of regressions with random walk coefficients.
+
+    The model is ``y_t = x_t' beta_t + e_t`` with ``e_t ~ N(0, sigma2)`` and
+    ``beta_t = beta_{t-1} + u_t`` with ``u_t ~ N(0, diag(q))``. The Gibbs sampler draws
+    the coefficient paths by forward filtering and backward sampling, and the
+    variances from their Inverse-Gamma conditionals. All models of a chain are sampled
+    jointly with batched operations.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        prior (dict, optional): The prior of the initial coefficients and the error
+            variance, see :func:`nig_posterior`.
+        state_shape (float): The shape of the Inverse-Gamma prior of q. Defaults to 2.
+        state_scale (float): The scale of the Inverse-Gamma prior of q. Defaults to
+            0.01.
+        n_draws (int): The number of retained draws per chain. Defaults to 1_000.
+        n_burn (int): The number of discarded draws per chain. Defaults to 500.
+        n_chains (int): The number of chains. Defaults to 4.
+        seed (int): The seed of the random number generators. Defaults to 0.
+        n_workers (int, optional): The number of processes. If None, the number of
+            processors of the machine is used. Defaults to 1.
+
+    Returns:
+        dict: The float32 draws of the coefficient 'paths' of shape (n_models,
+            n_chains, n_draws, n_obs, n_params), the error variance 'sigma2' of shape
+            (n_models, n_chains, n_draws), and the state variances 'q' of shape
+            (n_models, n_chains, n_draws, n_params).
+
+    """
+    prior = DEFAULT_PRIOR | (prior or {})
+    endog = np.asarray(outcome_variable, dtype=float)
+    seeds = np.random.SeedSequence(seed).spawn(n_chains)
+    options = (prior, state_shape, state_scale, n_draws, n_burn)
+    args = [(endog, design, *options, chain_seed) for chain_seed in seeds]
+    return _map_chains(_tvp_chain, args, n_workers)
+
+
+def posterior_bands(
+    draws: np.ndarray,
+    probabilities: tuple[float, ...] = (0.05, 0.5, 0.95),
+) -> np.ndarray:
+    """Compute quantiles of posterior draws pooled over chains.
+
+    Args:
+        draws (numpy.ndarray): The draws of shape (n_models, n_chains, n_draws, ...).
+        probabilities (tuple): The probabilities of the quantiles. Defaults to
+            (0.05, 0.5, 0.95).
+
+    Returns:
+        numpy.ndarray: The float32 quantiles of shape (n_models, n_quantiles, ...).
+
+    """
+    pooled = draws.reshape(draws.shape[0], -1, *draws.shape[3:])
+    return np.quantile(pooled, probabilities, axis=1).swapaxes(0, 1).astype(np.float32)
+
+
+def draws_to_store(
+    draws: dict[str, np.ndarray],
+    pairs: list[tuple[str, str]],
+    model_type: str = "Bayes",
+    date: str | None = None,
+) -> dict[str, np.ndarray]:
+    """Collect posterior draws into the float32 arrays of a posterior store.
+
+    The store has the index arrays of the results stores of
+    :mod:`nkpc_estimation.analysis.results` and is saved with
+    :func:`nkpc_estimation.analysis.results.save_results`.
+
+    Args:
+        draws (dict): The output of :func:`draw_nig` or :func:`gibbs_tvp`, or
+            summaries of the draws of the same shape along the first axis.
+        pairs (list): The pairs of feature names of the models.
+        model_type (str): The name of the regression method. Defaults to 'Bayes'.
+        date (str, optional): The first date of the sample. None for the full sample.
+
+    Returns:
+        dict: The store.
+
+    """
+    n_models = len(pairs)
+    return {
+        "feature_1": np.array([feature_1 for feature_1, _ in pairs]),
+        "feature_2": np.array([feature_2 for _, feature_2 in pairs]),
+        "model": np.full(n_models, model_type),
+        "date": np.full(n_models, FULL_SAMPLE if date is None else date),
+        **{name: np.asarray(value, dtype=np.float32) for name, value in draws.items()},
+    }
+
+
+def _map_chains(func, args, n_workers):
+    """Run the chains in processes and stack their draws along the chain axis."""
+    if n_workers == 1:
+        chains = [func(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chains = list(executor.map(func, *zip(*args)))
+    return {
+        name: np.stack([chain[name] for chain in chains], axis=1) for name in chains[0]
+    }
+
+
+def _nig_chain(posterior, n_draws, seed):
+    """Draw one chain of all models from their Normal-Inverse-Gamma posteriors."""
+    rng = np.random.default_rng(seed)
+    n_models, k_params = posterior["mean"].shape
+    sigma2 = posterior["scale"][:, None] / rng.gamma(
+        posterior["shape"],
+        size=(n_models, n_draws),
+    )
+    cholesky = np.linalg.cholesky(posterior["precision"])
+    z = rng.standard_normal((n_models, k_params, n_draws))
+    # beta = mean + sqrt(sigma2) * L^-T z has covariance sigma2 * precision^-1.
+    deviations = np.linalg.solve(cholesky.transpose(0, 2, 1), z).transpose(0, 2, 1)
+    params = posterior["mean"][:, None] + np.sqrt(sigma2)[..., None] * deviations
+    return {
+        "params": params.astype(np.float32),
+        "sigma2": sigma2.astype(np.float32),
+    }
+
+
+def _tvp_chain(endog, design, prior, state_shape, state_scale, n_draws, n_burn, seed):
+    """Run one Gibbs chain of all random walk coefficient models."""
+    rng = np.random.default_rng(seed)
+    n_models, nobs, k_params = design.shape
+    sigma2 = np.full(n_models, np.var(endog))
+    q = np.full((n_models, k_params), state_scale / (state_shape + 1))
+    initial_mean = np.full((n_models, k_params), prior["mean"])
+    initial_cov = np.broadcast_to(
+        np.eye(k_params) / prior["precision"],
+        (n_models, k_params, k_params),
+    )
+    filtered_mean = np.empty((n_models, nobs, k_params))
+    filtered_cov = np.empty((n_models, nobs, k_params, k_params))
+    paths = np.empty((n_models, n_draws, nobs, k_params), dtype=np.float32)
+    sigma2_draws = np.empty((n_models, n_draws), dtype=np.float32)
+    q_draws = np.empty((n_models, n_draws, k_params), dtype=np.float32)
+
+    for iteration in range(n_burn + n_draws):
+        path = _ffbs(
+            endog,
+            design,
+            sigma2,
+            q,
+            initial_mean,
+            initial_cov,
+            filtered_mean,
+            filtered_cov,
+            rng,
+        )
+        resid = endog - np.einsum("mnk,mnk->mn", design, path)
+        sigma2 = (prior["scale"] + 0.5 * np.einsum("mn,mn->m", resid, resid)) / (
+            rng.gamma(prior["shape"] + 0.5 * nobs, size=n_models)
+        )
+        steps = np.diff(path, axis=1)
+        q = (state_scale + 0.5 * np.einsum("mnk,mnk->mk", steps, steps)) / rng.gamma(
+            state_shape + 0.5 * (nobs - 1),
+            size=(n_models, k_params),
+        )
+        if iteration >= n_burn:
+            paths[:, iteration - n_burn] = path
+            sigma2_draws[:, iteration - n_burn] = sigma2
+            q_draws[:, iteration - n_burn] = q
+    return {"paths": paths, "sigma2": sigma2_draws, "q": q_draws}
+
+
+def _ffbs(
+    endog,
+    design,
+    sigma2,
+    q,
+    initial_mean,
+    initial_cov,
+    filtered_mean,
+    filtered_cov,
+    rng,
+):
+    """Draw coefficient paths by forward filtering and backward sampling.
+
+    The filtered moments are written into the preallocated arrays.
+
+    """
+    n_models, nobs, k_params = design.shape
+    state_cov = q[..., None] * np.eye(k_params)
+    mean = initial_mean
+    cov = initial_cov
+    for t in range(nobs):
+        x = design[:, t]
+        cov = cov + state_cov
+        gain = np.einsum("mkl,ml->mk", cov, x)
+        variance = np.einsum("mk,mk->m", x, gain) + sigma2
+        mean = (
+            mean
+            + gain * ((endog[t] - np.einsum("mk,mk->m", x, mean)) / variance)[:, None]
+        )
+        cov = cov - gain[:, :, None] * gain[:, None, :] / variance[:, None, None]
+        filtered_mean[:, t] = mean
+        filtered_cov[:, t] = cov
+
+    path = np.empty((n_models, nobs, k_params))
+    path[:, -1] = _draw_normal(filtered_mean[:, -1], filtered_cov[:, -1], rng)
+    for t in range(nobs - 2, -1, -1):
+        cov = filtered_cov[:, t]
+        smoother = np.linalg.solve(cov + state_cov, cov).transpose(0, 2, 1)
+        mean = filtered_mean[:, t] + np.einsum(
+            "mkl,ml->mk",
+            smoother,
+            path[:, t + 1] - filtered_mean[:, t],
+        )
+        path[:, t] = _draw_normal(mean, cov - smoother @ cov, rng)
+    return path
+
+
+def _draw_normal(mean, cov, rng):
+    """Draw from a batch of multivariate normal distributions."""
+    k_params = mean.shape[1]
+    cov = 0.5 * (cov + cov.transpose(0, 2, 1)) + 1e-12 * np.eye(k_params)
+    cholesky = np.linalg.cholesky(cov)
+    return mean + np.einsum(
+        "mkl,ml->mk",
+        cholesky,
+        rng.standard_normal(mean.shape),
+    )
@@ -0,0 +1,149 @@
+"""Functions for the block bootstrap inference of the regression model."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+_METHODS = ("moving", "stationary")
+
+
+def block_bootstrap_indices(
+    nobs: int,
+    n_replicates: int,
+    block_length: int,
+    method: str = "stationary",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """Draw the resampling indices of a block bootstrap for all replicates at once.
+
+    The moving block bootstrap concatenates blocks of fixed length with uniformly drawn
+    start positions. The stationary bootstrap of Politis and Romano (1994) uses blocks
+    of geometrically distributed length with mean ``block_length`` that wrap around the
+    end of the sample.
+
+    Args:
+        nobs (int): The number of observations.
+        n_replicates (int): The number of bootstrap replicates.
+        block_length (int): The (expected) length of the blocks.
+        method (str): The type of block bootstrap. Defaults to 'stationary'.
+        rng (numpy.random.Generator, optional): The random number generator.
+
+    Returns:
+        numpy.ndarray: The indices of shape (n_replicates, nobs).
+
+    Raises:
+        ValueError: If the method is not supported or the block length is invalid.
+
+    """
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}.")
+    if not 1 <= block_length <= nobs:
+        raise ValueError(
+            "block_length must be between 1 and the number of observations."
+        )
+    rng = np.random.default_rng() if rng is None else rng
+
+    if method == "moving":
+        n_blocks = -(-nobs // block_length)
+        starts = rng.integers(0, nobs - block_length + 1, size=(n_replicates, n_blocks))
+        indices = starts[..., None] + np.arange(block_length)
+        return indices.reshape(n_replicates, -1)[:, :nobs]
+
+    positions = np.arange(nobs)
+    new_block = rng.random((n_replicates, nobs)) < 1 / block_length
+    new_block[:, 0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    starts = rng.integers(0, nobs, size=(n_replicates, nobs))
+    offsets = positions - block_start
+    return (np.take_along_axis(starts, block_start, axis=1) + offsets) % nobs
+
+
+def bootstrap_ols(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    n_replicates: int = 10_000,
+    block_length: int = 8,
+    method: str = "stationary",
+    seed: int = 0,
+    n_workers: int | None = 1,
+    chunk_size: int = 1_000,
+) -> np.ndarray:
+    """Draw block bootstrap replicates of OLS coefficients.
+
+    The replicates are split into chunks with their own child seed of ``seed``, so the
+    draws do not depend on the number of workers. All replicates of a chunk are solved
+    as one batched least squares problem.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of shape
+            (n_obs,).
+        design (numpy.ndarray): The design matrix of shape (n_obs, n_params) or a batch
+            of design matrices of shape (n_models, n_obs, n_params). All models are
+            resampled with the same indices.
+        n_replicates (int): The number of bootstrap replicates. Defaults to 10_000.
+        block_length (int): The (expected) length of the blocks. Defaults to 8.
+        method (str): The type of block bootstrap. Defaults to 'stationary'.
+        seed (int): The seed of the random number generators. Defaults to 0.
+        n_workers (int, optional): The number of processes. If None, the number of
+            processors of the machine is used. Defaults to 1.
+        chunk_size (int): The number of replicates per chunk. Defaults to 1_000.
+
+    Returns:
+        numpy.ndarray: The coefficients of shape (n_models, n_replicates, n_params).
+
+    """
+    endog = np.asarray(outcome_variable, dtype=float)
+    design = np.asarray(design, dtype=float)
+    if design.ndim == 2:
+        design = design[None]
+    sizes = [chunk_size] * (n_replicates // chunk_size)
+    if n_replicates % chunk_size:
+        sizes.append(n_replicates % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (endog, design, size, block_length, method, chunk_seed)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+    if n_workers == 1:
+        chunks = [_bootstrap_chunk(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, *zip(*args)))
+    return np.concatenate(chunks, axis=1)
+
+
+def bootstrap_summary(
+    draws: np.ndarray,
+    alpha: float = 0.05,
+) -> dict[str, np.ndarray]:
+    """Summarize bootstrap replicates by standard errors and percentile intervals.
+
+    Args:
+        draws (numpy.ndarray): The coefficients of shape
+            (n_models, n_replicates, n_params).
+        alpha (float): The significance level of the intervals. Defaults to 0.05.
+
+    Returns:
+        dict: The bootstrap standard errors and the lower and upper bounds of the
+            percentile intervals of shape (n_models, n_params).
+
+    """
+    lower, upper = np.quantile(draws, [alpha / 2, 1 - alpha / 2], axis=1)
+    return {"bse": draws.std(axis=1, ddof=1), "ci_lower": lower, "ci_upper": upper}
+
+
+def _bootstrap_chunk(endog, design, n_replicates, block_length, method, seed):
+    """Solve the least squares problems of one chunk of bootstrap replicates."""
+    rng = np.random.default_rng(seed)
+    indices = block_bootstrap_indices(
+        design.shape[1],
+        n_replicates,
+        block_length,
+        method=method,
+        rng=rng,
+    )
+    resampled_design = design[:, indices]
+    gram = np.einsum("mbnk,mbnl->mbkl", resampled_design, resampled_design)
+    xy = np.einsum("mbnk,bn->mbk", resampled_design, endog[indices])
+    return np.linalg.solve(gram, xy[..., None])[..., 0]
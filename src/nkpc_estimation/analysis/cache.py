@@ -0,0 +1,110 @@
+"""Functions for the content-addressed cache of estimation results."""
+
+import hashlib
+import json
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from nkpc_estimation.analysis.results import load_results, save_results
+
+
+def hash_inputs(*data: pd.Series | pd.DataFrame | np.ndarray, **options) -> str:
+    """Hash the exact input data and options of an estimation.
+
+    Pandas objects are hashed together with their index, so the sample window is part
+    of the hash. The names of the objects are ignored.
+
+    Args:
+        *data (pandas.Series, pandas.DataFrame or numpy.ndarray): The input data.
+        **options: Estimator options. They must be serializable to JSON.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+
+    """
+    hasher = hashlib.sha256()
+    for obj in data:
+        if isinstance(obj, pd.Series | pd.DataFrame):
+            values = pd.util.hash_pandas_object(obj, index=True).to_numpy()
+        else:
+            values = np.ascontiguousarray(obj)
+            hasher.update(f"{values.dtype}{values.shape}".encode())
+        hasher.update(values.tobytes())
+    hasher.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+def load_store_from_cache(
+    cache_dir: str | pathlib.Path,
+    key: str,
+) -> dict[str, np.ndarray] | None:
+    """Load a cached results store.
+
+    Args:
+        cache_dir (str or pathlib.Path): The cache directory.
+        key (str): The key of the cached store.
+
+    Returns:
+        dict: The results store or None if it is not in the cache.
+
+    """
+    cached = pathlib.Path(cache_dir) / key
+    try:
+        os.utime(cached)
+        return load_results(cached)
+    except FileNotFoundError:
+        return None
+
+
+def save_store_to_cache(
+    cache_dir: str | pathlib.Path,
+    key: str,
+    store: dict[str, np.ndarray],
+) -> None:
+    """Store a results store in the cache.
+
+    Args:
+        cache_dir (str or pathlib.Path): The cache directory.
+        key (str): The key of the store.
+        store (dict): The results store.
+
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    save_results(store, cache_dir / key)
+
+
+def evict_cache(cache_dir: str | pathlib.Path, max_bytes: int) -> list[str]:
+    """Remove the least recently used results until the cache fits its size limit.
+
+    Args:
+        cache_dir (str or pathlib.Path): The cache directory.
+        max_bytes (int): The maximum total size of the cache in bytes.
+
+    Returns:
+        list: The keys of the removed results.
+
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    if not cache_dir.is_dir():
+        return []
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.name))
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(cache_dir / name)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed.append(name)
+    return removed
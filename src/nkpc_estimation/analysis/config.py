@@ -4,10 +4,72 @@ import pathlib
 
 from nkpc_estimation.config import BLD
 
-_MODELS = ["OLS"]
+_MODELS = ["OLS", "IV", "GMM", "Bayes"]
 _FEATURE_1 = ["Unemp", "Unemp_Gap", "Labor_share", "GDP"]
 _FEATURE_2 = ["BackExp", "MSC"]
 _DATES = ["1961-04-01", "1984-10-01", "2007-07-01", "2013-01-01", "2020-04-01"]
+_BREAK_POINTS = ["1984-10-01", "2007-07-01", "2013-01-01", "2020-04-01"]
+
+CACHE = {
+    "directory": BLD / "python" / "cache",
+    "max_bytes": 256 * 1024**2,
+}
+ESTIMATOR_OPTIONS = {
+    "maxlags": 4,
+    "kernel": "bartlett",
+    "robust_cov_type": "HAC",
+    "nlags": 4,
+    "significance": 0.05,
+    "instrument_lags": 1,
+    "max_iter": 100,
+    "tol": 1e-8,
+    "prior": {"mean": 0.0, "precision": 0.01, "shape": 0.01, "scale": 0.01},
+}
+
+BAYES = {
+    "n_draws": 2_000,
+    "n_chains": 4,
+    "seed": 925,
+    "n_workers": None,
+    "tvp": {"n_draws": 1_000, "n_burn": 500, "state_shape": 2.0, "state_scale": 0.01},
+}
+
+KALMAN = {
+    "initial_variance": 1e6,
+    "max_iter": 500,
+    "grid": {"n_points": 21, "width": 5.0},
+}
+
+SPEC_CURVE = {
+    "choices": {
+        "expectation_lags": [2, 4, 6, 8, 12],
+        "detrend_order": [None, 1, 2, 3],
+        "start": [None, *_DATES],
+        "end": [None, "2019-10-01", "2007-04-01"],
+        "model": ["OLS", "IV"],
+        "feature_1": _FEATURE_1,
+        "feature_2": _FEATURE_2,
+        "hac_maxlags": [0, 1, 2, 4, 8],
+    },
+    "kernel": "bartlett",
+    "instrument_lags": 1,
+    "min_nobs": 20,
+    "significance": 0.05,
+}
+
+BOOTSTRAP = {
+    "n_replicates": 10_000,
+    "block_length": 8,
+    "method": "stationary",
+    "seed": 925,
+    "n_workers": None,
+}
+
+ROLLING = {
+    "expanding": {"min_nobs": 20},
+    "rolling": {"window": 40},
+    "backward": {"min_nobs": 20},
+}
 
 ESTIMATIONS = {
     f"{feature_name_1}_{feature_name_2}_{model_name}": {
@@ -34,51 +96,108 @@ SENSITIVITY = {
 }
 
 
-def path_to_estimation_result(
-    feature_name_1: str,
-    feature_name_2: str,
+RESULTS = BLD / "python" / "models" / "results.npz"
+
+
+def path_to_results_store(
     model_type: str,
+    date: str | None = None,
 ) -> pathlib.PosixPath:
-    """Create the paths for the estimation results.
+    """Create the paths for the results stores of the estimation tasks.
 
     Args:
-        feature_name_1 (str): The name of the first independent variable.
-        feature_name_2 (str): The name of the second independent variable.
         model_type (str): The name of the estimation method.
+        date (str, optional): The first date of the sample of the sensitivity
+            analysis. None for the full sample.
 
     Returns:
-        pathlib.PosixPath: The path for the estimation results.
+        pathlib.PosixPath: The path for the results store.
 
     """
-    return (
-        BLD
-        / "python"
-        / "models"
-        / f"{feature_name_1}_{feature_name_2}_{model_type}.pickle"
-    )
+    suffix = "" if date is None else f"_sensitivity_{date}"
+    return BLD / "python" / "models" / f"results_{model_type}{suffix}.npz"
+
+
+def path_to_posterior_store(
+    model_type: str,
+    date: str | None = None,
+) -> pathlib.PosixPath:
+    """Create the paths for the stores of posterior draws.
+
+    Args:
+        model_type (str): The name of the estimation method.
+        date (str, optional): The first date of the sample of the sensitivity
+            analysis. None for the full sample.
+
+    Returns:
+        pathlib.PosixPath: The path for the posterior store.
+
+    """
+    suffix = "" if date is None else f"_sensitivity_{date}"
+    return BLD / "python" / "models" / f"posterior_{model_type}{suffix}.npz"
+
 
+def path_to_state_space_store(model_type: str) -> pathlib.PosixPath:
+    """Create the path for the store of the state space estimation results.
+
+    Args:
+        model_type (str): The name of the state space model.
 
-def path_to_sensitivity_result(
+    Returns:
+        pathlib.PosixPath: The path for the store.
+
+    """
+    return BLD / "python" / "models" / f"state_space_{model_type}.npz"
+
+
+def path_to_rolling_result(
     feature_name_1: str,
     feature_name_2: str,
     model_type: str,
-    date: str,
+    method: str,
 ) -> pathlib.PosixPath:
-    """Create the paths for the sensitivity results.
+    """Create the paths for the rolling window estimation results.
 
     Args:
         feature_name_1 (str): The name of the first independent variable.
         feature_name_2 (str): The name of the second independent variable.
         model_type (str): The name of the estimation method.
-        date (str): The date of the breakpoint.
+        method (str): The type of window.
 
     Returns:
-        pathlib.PosixPath: The path for the sensitivity results.
+        pathlib.PosixPath: The path for the rolling window estimation results.
 
     """
     return (
         BLD
         / "python"
         / "models"
-        / f"{feature_name_1}_{feature_name_2}_{model_type}_sensitivity_{date}.pickle"
+        / f"{feature_name_1}_{feature_name_2}_{model_type}_{method}.csv"
     )
+
+
+def path_to_spec_curve(name: str) -> pathlib.PosixPath:
+    """Create the paths for the specification curve results.
+
+    Args:
+        name (str): The name of the output, 'table' or 'summary'.
+
+    Returns:
+        pathlib.PosixPath: The path for the output.
+
+    """
+    suffix = ".arrow" if name == "table" else ".csv"
+    return BLD / "python" / "models" / f"spec_curve_{name}{suffix}"
+
+
+def path_to_bootstrap_result(model_type: str) -> pathlib.PosixPath:
+    """Create the path for the bootstrap results.
+
+    Args:
+        model_type (str): The name of the estimation method.
+
+    Returns:
+        pathlib.PosixPath: The path for the bootstrap results.
+
+    """
+    return BLD / "python" / "models" / f"bootstrap_{model_type}.csv"
@@ -0,0 +1,146 @@
+"""Functions for the batched specification tests of the regression grid."""
+
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def breusch_godfrey_batch(
+    resid: np.ndarray,
+    q: np.ndarray,
+    nlags: int = 4,
+) -> dict[str, np.ndarray]:
+    """Compute Breusch-Godfrey LM tests for a batch of regressions.
+
+    The auxiliary regression of the residuals on the regressors, a constant, and
+    ``nlags`` zero-filled lags of the residuals is solved by partialling the regressors
+    out with the orthonormal factors of the original fit. The statistic is the number of
+    observations times the centered R-squared, which matches
+    ``statsmodels.stats.diagnostic.acorr_breusch_godfrey``.
+
+    Args:
+        resid (numpy.ndarray): The residuals of shape (n_models, n_obs).
+        q (numpy.ndarray): The orthonormal factors of the QR decompositions of the
+            design matrices of shape (n_models, n_obs, n_params).
+        nlags (int): The number of lags. Defaults to 4.
+
+    Returns:
+        dict: The LM statistics and p-values of shape (n_models,).
+
+    """
+    n_models, nobs = resid.shape
+    padded = np.concatenate((np.zeros((n_models, nlags)), resid), axis=1)
+    lags = np.stack(
+        [padded[:, nlags - lag : nlags - lag + nobs] for lag in range(1, nlags + 1)],
+        axis=-1,
+    )
+    extra = np.concatenate((np.ones((n_models, nobs, 1)), lags), axis=-1)
+    explained = _explained_sum_of_squares(resid, q, extra)
+    demeaned = resid - resid.mean(axis=1, keepdims=True)
+    centered_tss = np.einsum("mn,mn->m", demeaned, demeaned)
+    ssr = np.einsum("mn,mn->m", resid, resid) - explained
+    lm = nobs * (1 - ssr / centered_tss)
+    return {"lm": lm, "p_value": stats.chi2.sf(lm, nlags)}
+
+
+def breusch_pagan_batch(
+    resid: np.ndarray,
+    q: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Compute Breusch-Pagan LM tests for a batch of regressions.
+
+    The squared residuals are regressed on a constant and the regressors, reusing the
+    orthonormal factors of the original fit. The statistic is the studentized version
+    of Koenker (1981), which matches ``statsmodels.stats.diagnostic.het_breuschpagan``
+    with the design matrix and a constant as ``exog_het``.
+
+    Args:
+        resid (numpy.ndarray): The residuals of shape (n_models, n_obs).
+        q (numpy.ndarray): The orthonormal factors of the QR decompositions of the
+            design matrices of shape (n_models, n_obs, n_params).
+
+    Returns:
+        dict: The LM statistics and p-values of shape (n_models,).
+
+    """
+    n_models, nobs, k_params = q.shape
+    squared = resid**2
+    constant = np.ones((n_models, nobs, 1))
+    # The constant adds a regressor unless it is already spanned by the design.
+    residual_constant = constant - q @ (q.transpose(0, 2, 1) @ constant)
+    has_constant = np.linalg.norm(residual_constant[..., 0], axis=1) <= 1e-8 * np.sqrt(
+        nobs,
+    )
+    explained = _explained_sum_of_squares(squared, q, constant)
+    demeaned = squared - squared.mean(axis=1, keepdims=True)
+    centered_tss = np.einsum("mn,mn->m", demeaned, demeaned)
+    ssr = np.einsum("mn,mn->m", squared, squared) - explained
+    lm = nobs * (1 - ssr / centered_tss)
+    df = np.where(has_constant, k_params - 1, k_params)
+    return {"lm": lm, "p_value": stats.chi2.sf(lm, df)}
+
+
+def batch_diagnostics(batch: dict[str, np.ndarray], nlags: int = 4) -> dict:
+    """Run the specification tests for the output of a batched fit.
+
+    Args:
+        batch (dict): The output of
+            :func:`nkpc_estimation.analysis.ols.fit_ols_batch`.
+        nlags (int): The number of lags of the Breusch-Godfrey test. Defaults to 4.
+
+    Returns:
+        dict: The LM statistics and p-values of the Breusch-Godfrey and Breusch-Pagan
+            tests of shape (n_models,).
+
+    """
+    bg = breusch_godfrey_batch(batch["resid"], batch["q"], nlags=nlags)
+    bp = breusch_pagan_batch(batch["resid"], batch["q"])
+    return {
+        "bg_lm": bg["lm"],
+        "bg_pvalue": bg["p_value"],
+        "bp_lm": bp["lm"],
+        "bp_pvalue": bp["p_value"],
+    }
+
+
+def diagnostics_to_frame(
+    diagnostics: dict[str, np.ndarray],
+    pairs: list[tuple[str, str]],
+) -> pd.DataFrame:
+    """Convert the output of :func:`batch_diagnostics` into a DataFrame.
+
+    Args:
+        diagnostics (dict): The output of :func:`batch_diagnostics`.
+        pairs (list): The pairs of feature names of the models.
+
+    Returns:
+        pandas.DataFrame: The diagnostics with one row per model.
+
+    """
+    index = pd.MultiIndex.from_tuples(pairs, names=["feature_1", "feature_2"])
+    return pd.DataFrame(diagnostics, index=index)
+
+
+def _explained_sum_of_squares(endog, q, extra):
+    """Compute the explained sum of squares of a regression on the design and extra
+    regressors, where the design is given by its orthonormal factors.
+
+    Extra regressors that are spanned by the design are dropped by the pseudo-inverse.
+
+    """
+    explained = np.einsum("mnk,mn->mk", q, endog)
+    explained = np.einsum("mk,mk->m", explained, explained)
+    residual_extra = extra - q @ (q.transpose(0, 2, 1) @ extra)
+    spanned = np.linalg.norm(residual_extra, axis=1) <= 1e-8 * np.linalg.norm(
+        extra,
+        axis=1,
+    )
+    residual_extra = np.where(spanned[:, None, :], 0.0, residual_extra)
+    coefficients = np.einsum(
+        "mjn,mn->mj",
+        np.linalg.pinv(residual_extra, rcond=1e-10),
+        endog,
+    )
+    fitted = np.einsum("mnj,mj->mn", residual_extra, coefficients)
+    return explained + np.einsum("mn,mn->m", fitted, fitted)
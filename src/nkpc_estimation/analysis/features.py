@@ -0,0 +1,184 @@
+"""Registry of the regression variables built from the cleaned data set."""
+
+import functools
+import operator
+import os
+
+import pandas as pd
+
+from nkpc_estimation.analysis.config import _FEATURE_1, _FEATURE_2
+from nkpc_estimation.data_management.transformations import transformation_pipeline
+from nkpc_estimation.utilities import load_panel
+
+FEATURES = {
+    "Inflation": {"columns": ["Inflation"]},
+    "Unemp": {"columns": ["Unemployment"]},
+    "Unemp_Gap": {"columns": ["Unemployment", "NAIRU"], "transform": operator.sub},
+    "Labor_share": {"columns": ["Labor_share"]},
+    "GDP": {"columns": ["GDP"]},
+    "BackExp": {"columns": ["Backward_Expectations_Inflation"]},
+    "MSC": {"columns": ["MSC"]},
+}
+"""dict: The variables by name. Each variable is computed from the data set columns
+with ``transform`` or is the single column itself if no transform is given."""
+
+_CACHE_SIZE = 128
+
+
+def load_data(path: str | os.PathLike) -> pd.DataFrame:
+    """Load the cleaned data set once per process.
+
+    The data set is memory-mapped and memoized by path and modification time, so a
+    rebuilt data set is loaded again. The returned DataFrame is shared and must not be
+    modified.
+
+    Args:
+        path (str or pathlib.Path): Path to the cleaned data set.
+
+    Returns:
+        pandas.DataFrame: The data set.
+
+    """
+    return _load_data(os.fspath(path), os.stat(path).st_mtime_ns)
+
+
+def load_pipeline(path: str | os.PathLike) -> dict:
+    """Load the transformation pipeline of the cleaned data set once per process.
+
+    The pipeline is memoized like :func:`load_data`, so all consumers of a data set
+    share the variables of the registry and the series derived with
+    :func:`nkpc_estimation.data_management.transformations.derive`.
+
+    Args:
+        path (str or pathlib.Path): Path to the cleaned data set.
+
+    Returns:
+        dict: The transformation pipeline of the data set.
+
+    """
+    return _load_pipeline(os.fspath(path), os.stat(path).st_mtime_ns)
+
+
+def get_feature(
+    name: str,
+    path: str | os.PathLike,
+    start: str | None = None,
+    end: str | None = None,
+) -> pd.Series:
+    """Get a variable of the registry on a sample window.
+
+    Variables are computed lazily on the full sample and memoized in the pipeline of the
+    data set, see :func:`pipeline_feature`. Their sample windows are memoized in a
+    bounded least recently used cache.
+
+    Args:
+        name (str): The name of the variable in :data:`FEATURES`.
+        path (str or pathlib.Path): Path to the cleaned data set.
+        start (str, optional): The first date of the sample.
+        end (str, optional): The last date of the sample.
+
+    Returns:
+        pandas.Series: The variable. The Series is shared and must not be modified.
+
+    Raises:
+        KeyError: If the variable is not in the registry.
+
+    """
+    if name not in FEATURES:
+        raise KeyError(f"Unknown feature {name!r}.")
+    return _get_feature(name, os.fspath(path), os.stat(path).st_mtime_ns, start, end)
+
+
+def get_feature_vars(
+    path: str | os.PathLike,
+    start: str | None = None,
+    end: str | None = None,
+) -> tuple[dict[str, pd.Series], dict[str, pd.Series]]:
+    """Get the feature variables of the regression grid.
+
+    Args:
+        path (str or pathlib.Path): Path to the cleaned data set.
+        start (str, optional): The first date of the sample.
+        end (str, optional): The last date of the sample.
+
+    Returns:
+        tuple: Two dictionaries with the first and second feature variables.
+
+    """
+    feature_vars_1 = {name: get_feature(name, path, start, end) for name in _FEATURE_1}
+    feature_vars_2 = {name: get_feature(name, path, start, end) for name in _FEATURE_2}
+    return feature_vars_1, feature_vars_2
+
+
+def pipeline_feature(pipeline: dict, name: str) -> pd.Series:
+    """Get a variable of the registry memoized in a transformation pipeline.
+
+    The variable is memoized with the derived series of the pipeline under the key
+    ``("feature", name)``.
+
+    Args:
+        pipeline (dict): The transformation pipeline of the data set.
+        name (str): The name of the variable in :data:`FEATURES`.
+
+    Returns:
+        pandas.Series: The variable. The Series is shared and must not be modified.
+
+    Raises:
+        KeyError: If the variable is not in the registry.
+
+    """
+    key = ("feature", name)
+    derived = pipeline["derived"]
+    if key not in derived:
+        derived[key] = compute_feature(pipeline["data"], name)
+    return derived[key]
+
+
+def compute_feature(data: pd.DataFrame, name: str) -> pd.Series:
+    """Compute a variable of the registry from a data set.
+
+    Args:
+        data (pandas.DataFrame): The cleaned data set.
+        name (str): The name of the variable in :data:`FEATURES`.
+
+    Returns:
+        pandas.Series: The variable.
+
+    Raises:
+        KeyError: If the variable is not in the registry.
+
+    """
+    if name not in FEATURES:
+        raise KeyError(f"Unknown feature {name!r}.")
+    spec = FEATURES[name]
+    columns = [data[column] for column in spec["columns"]]
+    transform = spec.get("transform")
+    feature = transform(*columns) if transform is not None else columns[0].copy()
+    return feature.rename(name)
+
+
+def clear_cache():
+    """Clear the memoized data set, pipeline, and variables."""
+    _load_data.cache_clear()
+    _load_pipeline.cache_clear()
+    _get_feature.cache_clear()
+
+
+@functools.lru_cache(maxsize=2)
+def _load_data(path, mtime):
+    """Load the data set memoized by path and modification time."""
+    return load_panel(path, memory_map=True)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_pipeline(path, mtime):
+    """Create the transformation pipeline memoized by path and modification time."""
+    return transformation_pipeline(_load_data(path, mtime))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _get_feature(name, path, mtime, start, end):
+    """Compute a variable memoized by name, data set, and sample window."""
+    if start is not None or end is not None:
+        return _get_feature(name, path, mtime, None, None).loc[start:end]
+    return pipeline_feature(_load_pipeline(path, mtime), name)
@@ -0,0 +1,224 @@
+"""Functions for the batched instrumental variable estimation of the regression grid."""
+
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from nkpc_estimation.analysis.ols import fit_ols_batch, long_run_covariance
+
+
+def lagged_instruments(
+    variables: dict[str, pd.Series],
+    lags: int = 1,
+) -> pd.DataFrame:
+    """Build the lags of variables as instruments.
+
+    Args:
+        variables (dict): The variables by name.
+        lags (int): The number of lags of each variable. Defaults to 1.
+
+    Returns:
+        pandas.DataFrame: The instruments with columns '{name}_lag{lag}'. The first
+            ``lags`` rows are missing.
+
+    """
+    return pd.DataFrame(
+        {
+            f"{name}_lag{lag}": variable.shift(lag)
+            for name, variable in variables.items()
+            for lag in range(1, lags + 1)
+        },
+    )
+
+
+def instrument_projection(instruments: pd.DataFrame | np.ndarray) -> np.ndarray:
+    """Compute an orthonormal basis of the column space of the instruments.
+
+    The basis is shared by all models estimated on the same sample window, so the
+    projection on the instruments is factorized only once.
+
+    Args:
+        instruments (pandas.DataFrame or numpy.ndarray): The instruments of shape
+            (n_obs, n_instruments).
+
+    Returns:
+        numpy.ndarray: The orthonormal basis of shape (n_obs, n_instruments).
+
+    Raises:
+        ValueError: If the instruments contain missing values.
+
+    """
+    instruments = np.asarray(instruments, dtype=float)
+    if np.isnan(instruments).any():
+        raise ValueError("instruments must not contain missing values.")
+    q, _ = np.linalg.qr(instruments)
+    return q
+
+
+def fit_iv_batch(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    projection: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Fit many two-stage least squares regressions with shared instruments.
+
+    The first stage of all models is one product with the basis of the instruments,
+    and the second stage is the batched least squares fit of
+    :func:`nkpc_estimation.analysis.ols.fit_ols_batch` on the projected designs. The
+    residuals are computed with the original designs, so the covariances of
+    :func:`nkpc_estimation.analysis.ols.batch_cov_params` are the 2SLS sandwich
+    covariances.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        projection (numpy.ndarray): The output of :func:`instrument_projection`.
+
+    Returns:
+        dict: The estimates of all models stacked along the first axis with the
+            Sargan statistics and p-values of the overidentifying restrictions.
+
+    """
+    projected = projection @ np.einsum("nl,mnk->mlk", projection, design)
+    batch = fit_ols_batch(outcome_variable, projected)
+    endog = np.broadcast_to(np.asarray(outcome_variable, dtype=float), design.shape[:2])
+    fittedvalues = np.einsum("mnk,mk->mn", design, batch["params"])
+    resid = endog - fittedvalues
+    ssr = np.einsum("mn,mn->m", resid, resid)
+    explained = np.einsum("nl,mn->ml", projection, resid)
+    j_stat = batch["nobs"] * np.einsum("ml,ml->m", explained, explained) / ssr
+    batch.update(
+        {
+            "resid": resid,
+            "fittedvalues": fittedvalues,
+            "ssr": ssr,
+            "scale": ssr / batch["df_resid"],
+            "j_stat": j_stat,
+            "j_pvalue": stats.chi2.sf(j_stat, projection.shape[1] - design.shape[2]),
+        },
+    )
+    del batch["rsquared"]
+    return batch
+
+
+def fit_gmm_batch(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    instruments: pd.DataFrame | np.ndarray,
+    maxlags: int = 4,
+    kernel: str = "bartlett",
+    initial: dict[str, np.ndarray] | None = None,
+    weights: np.ndarray | None = None,
+    max_iter: int = 50,
+    tol: float = 1e-8,
+    min_nobs_ratio: float = 5.0,
+    max_condition: float = 1e7,
+) -> dict[str, np.ndarray]:
+    """Fit many linear models by iterated efficient GMM with shared instruments.
+
+    The iterations are warm-started from the 2SLS fit and, if given, from the weighting
+    matrices of a previous fit, e.g. of a neighbouring sample window. All models are
+    updated jointly until the coefficients of every model converged.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        instruments (pandas.DataFrame or numpy.ndarray): The instruments of shape
+            (n_obs, n_instruments).
+        maxlags (int): The number of lags of the HAC estimate of the covariance of the
+            moments. Defaults to 4.
+        kernel (str): The kernel of the HAC estimate, 'bartlett' or 'uniform'.
+            Defaults to 'bartlett'.
+        initial (dict, optional): The output of :func:`fit_iv_batch` for the same
+            models. Computed if None.
+        weights (numpy.ndarray, optional): The weighting matrices of the first
+            iteration of shape (n_instruments, n_instruments) or (n_models,
+            n_instruments, n_instruments). By default, they are estimated from the
+            2SLS residuals.
+        max_iter (int): The maximum number of iterations. Defaults to 50.
+        tol (float): The relative tolerance of the coefficients. Defaults to 1e-8.
+        min_nobs_ratio (float): The minimum number of observations per instrument.
+            Defaults to 5.
+        max_condition (float): The maximum condition number of the correlation
+            matrix of the long-run covariance of the moments. Defaults to 1e7.
+
+    Returns:
+        dict: The coefficients, residuals, covariances, weighting matrices, and Hansen
+            J statistics and p-values of all models, whether each model converged,
+            and the number of iterations.
+
+    Raises:
+        ValueError: If the sample is too short for the number of instruments or the
+            long-run covariance of the moments is ill-conditioned, so the efficient
+            weighting matrix cannot be estimated reliably.
+
+    """
+    instruments = np.asarray(instruments, dtype=float)
+    nobs, n_instruments = instruments.shape
+    if nobs < min_nobs_ratio * n_instruments:
+        raise ValueError(
+            f"GMM requires at least {min_nobs_ratio:g} observations per instrument, "
+            f"got {nobs} observations of {n_instruments} instruments.",
+        )
+    endog = np.broadcast_to(np.asarray(outcome_variable, dtype=float), design.shape[:2])
+    if initial is None:
+        initial = fit_iv_batch(endog[0], design, instrument_projection(instruments))
+    zx = np.einsum("nl,mnk->mlk", instruments, design)
+    zy = np.einsum("nl,mn->ml", instruments, endog)
+    params = initial["params"]
+    if weights is None:
+        weights = _gmm_weights(
+            instruments,
+            initial["resid"],
+            maxlags,
+            kernel,
+            max_condition,
+        )
+    weights = np.broadcast_to(weights, (len(params), *weights.shape[-2:]))
+
+    for n_iter in range(1, max_iter + 1):
+        hessian = zx.transpose(0, 2, 1) @ weights @ zx
+        gradient = np.einsum("mlk,mlj,mj->mk", zx, weights, zy)
+        updated = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        converged = np.abs(updated - params) <= tol * (1 + np.abs(params))
+        params = updated
+        resid = endog - np.einsum("mnk,mk->mn", design, params)
+        weights = _gmm_weights(instruments, resid, maxlags, kernel, max_condition)
+        if converged.all():
+            break
+
+    moments = np.einsum("nl,mn->ml", instruments, resid)
+    j_stat = np.einsum("ml,mlj,mj->m", moments, weights, moments)
+    return {
+        "params": params,
+        "resid": resid,
+        "fittedvalues": endog - resid,
+        "cov_params": np.linalg.inv(zx.transpose(0, 2, 1) @ weights @ zx),
+        "weights": weights,
+        "j_stat": j_stat,
+        "j_pvalue": stats.chi2.sf(j_stat, instruments.shape[1] - design.shape[2]),
+        "nobs": design.shape[1],
+        "converged": converged.all(axis=1),
+        "n_iter": n_iter,
+    }
+
+
+def _gmm_weights(instruments, resid, maxlags, kernel, max_condition):
+    """Compute the efficient weighting matrices from the residuals.
+
+    The condition number is measured on the correlation scale, so it does not depend on
+    the units of the instruments.
+
+    """
+    cov = long_run_covariance(instruments * resid[..., None], maxlags, kernel)
+    scale = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    condition = np.linalg.cond(cov / scale[:, :, None] / scale[:, None, :])
+    if (condition > max_condition).any():
+        raise ValueError(
+            "The long-run covariance of the moments is ill-conditioned (condition "
+            f"number {condition.max():.3g}).",
+        )
+    return np.linalg.inv(cov)
@@ -0,0 +1,435 @@
+"""Functions for the state space model with random walk coefficients.
+
+The model is ``y_t = x_t' beta_t + e_t`` with ``e_t ~ N(0, sigma2)`` and
+``beta_t = beta_{t-1} + u_t`` with ``u_t ~ N(0, diag(q))``. The hyperparameters are
+the log variances ``(log sigma2, log q_1, ..., log q_k)``.
+
+"""
+
+import contextlib
+
+import numpy as np
+import pandas as pd
+from scipy import optimize
+
+from nkpc_estimation.analysis.ols import batch_bse, fit_ols_batch
+
+_numba = None
+with contextlib.suppress(ImportError):
+    import numba as _numba
+
+_ENGINES = ("numpy", "numba")
+_LOG_2PI = np.log(2 * np.pi)
+
+
+def allocate_workspace(n_models: int, nobs: int, k_params: int) -> dict:
+    """Allocate the arrays of the Kalman filter for a batch of models.
+
+    A workspace can be passed to :func:`tvp_filter` repeatedly, e.g. by an optimizer.
+    The filter writes every intermediate result of its loop over time into the
+    workspace, so the loop creates no temporary arrays. Only the bounded iteration
+    buffers of NumPy are used for broadcast operands.
+
+    Args:
+        n_models (int): The number of models.
+        nobs (int): The number of observations.
+        k_params (int): The number of coefficients.
+
+    Returns:
+        dict: The preallocated arrays.
+
+    """
+    m, n, k, p = n_models, nobs, k_params, k_params + 1
+    return {
+        "filtered_mean": np.empty((m, n, k)),
+        "filtered_cov": np.empty((m, n, k, k)),
+        "predicted_cov": np.empty((m, n, k, k)),
+        "mean": np.empty((m, k)),
+        "cov": np.empty((m, k, k)),
+        "state_cov": np.empty((m, k, k)),
+        "px": np.empty((m, k)),
+        "gain": np.empty((m, k)),
+        "forecast": np.empty(m),
+        "variance": np.empty(m),
+        "error": np.empty(m),
+        "scaled_error": np.empty(m),
+        "term": np.empty(m),
+        "step": np.empty((m, k)),
+        "outer": np.empty((m, k, k)),
+        "loglike": np.empty(m),
+        "d_mean": np.empty((m, p, k)),
+        "d_cov": np.empty((m, p, k, k)),
+        "d_state_cov": np.empty((m, p, k, k)),
+        "d_sigma2": np.empty((m, p)),
+        "d_px": np.empty((m, p, k)),
+        "d_gain": np.empty((m, p, k)),
+        "d_variance": np.empty((m, p)),
+        "d_error": np.empty((m, p)),
+        "d_term": np.empty((m, p)),
+        "d_step": np.empty((m, p, k)),
+        "d_outer": np.empty((m, p, k, k)),
+        "score": np.empty((m, p)),
+    }
+
+
+def tvp_filter(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    log_variances: np.ndarray,
+    initial_variance: float = 1e6,
+    gradient: bool = False,
+    workspace: dict | None = None,
+    engine: str = "numpy",
+) -> dict[str, np.ndarray]:
+    """Run the Kalman filter of random walk coefficient models for a batch of models.
+
+    The coefficients start from a diffuse prior with variance ``initial_variance``,
+    and the first ``k_params`` observations are excluded from the log-likelihood. The
+    score is computed analytically by differentiating the filter recursions.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        log_variances (numpy.ndarray): The hyperparameters of shape
+            (n_models, n_params + 1).
+        initial_variance (float): The variance of the initial coefficients. Defaults to
+            1e6.
+        gradient (bool): Whether to compute the score. Defaults to False.
+        workspace (dict, optional): The output of :func:`allocate_workspace`.
+        engine (str): 'numpy' for the filter vectorized over models or 'numba' for a
+            compiled loop. The score is only available with 'numpy'. Defaults to
+            'numpy'.
+
+    Returns:
+        dict: The log-likelihoods of shape (n_models,), the filtered means and
+            covariances, the predicted covariances, and, if requested, the score of
+            shape (n_models, n_params + 1). The arrays are views of the workspace.
+
+    Raises:
+        ValueError: If the engine is not supported.
+        ImportError: If the 'numba' engine is requested but numba is not installed.
+
+    """
+    if engine not in _ENGINES:
+        raise ValueError(f"engine must be one of {_ENGINES}.")
+    endog = np.asarray(outcome_variable, dtype=float)
+    design = np.asarray(design, dtype=float)
+    variances = np.exp(np.asarray(log_variances, dtype=float))
+    n_models, nobs, k_params = design.shape
+    if workspace is None:
+        workspace = allocate_workspace(n_models, nobs, k_params)
+    if engine == "numba":
+        if gradient:
+            raise ValueError("The score is only available with the 'numpy' engine.")
+        if _numba is None:
+            raise ImportError("The 'numba' engine requires numba.")
+        _filter_kernel_jit()(
+            endog,
+            design,
+            variances,
+            initial_variance,
+            workspace["filtered_mean"],
+            workspace["filtered_cov"],
+            workspace["predicted_cov"],
+            workspace["loglike"],
+        )
+    else:
+        _filter_numpy(endog, design, variances, initial_variance, gradient, workspace)
+    out = {
+        name: workspace[name]
+        for name in ("loglike", "filtered_mean", "filtered_cov", "predicted_cov")
+    }
+    if gradient:
+        out["score"] = workspace["score"]
+    return out
+
+
+def tvp_smoother(filtered: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Run the Rauch-Tung-Striebel smoother on the output of :func:`tvp_filter`.
+
+    Args:
+        filtered (dict): The output of :func:`tvp_filter`.
+
+    Returns:
+        dict: The smoothed means of shape (n_models, n_obs, n_params) and covariances
+            of shape (n_models, n_obs, n_params, n_params).
+
+    """
+    filtered_mean = filtered["filtered_mean"]
+    filtered_cov = filtered["filtered_cov"]
+    predicted_cov = filtered["predicted_cov"]
+    smoothed_mean = np.empty_like(filtered_mean)
+    smoothed_cov = np.empty_like(filtered_cov)
+    smoothed_mean[:, -1] = filtered_mean[:, -1]
+    smoothed_cov[:, -1] = filtered_cov[:, -1]
+    for t in range(filtered_mean.shape[1] - 2, -1, -1):
+        # The predicted mean of a random walk is the filtered mean of the last period.
+        smoother = np.linalg.solve(
+            predicted_cov[:, t + 1],
+            filtered_cov[:, t],
+        ).transpose(0, 2, 1)
+        smoothed_mean[:, t] = filtered_mean[:, t] + np.einsum(
+            "mkl,ml->mk",
+            smoother,
+            smoothed_mean[:, t + 1] - filtered_mean[:, t],
+        )
+        smoothed_cov[:, t] = filtered_cov[:, t] + smoother @ (
+            smoothed_cov[:, t + 1] - predicted_cov[:, t + 1]
+        ) @ smoother.transpose(0, 2, 1)
+    return {"smoothed_mean": smoothed_mean, "smoothed_cov": smoothed_cov}
+
+
+def fit_tvp(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    start: np.ndarray | None = None,
+    initial_variance: float = 1e6,
+    max_iter: int = 500,
+) -> dict[str, np.ndarray]:
+    """Estimate the hyperparameters of random walk coefficient models by maximum
+    likelihood and smooth their coefficient paths.
+
+    The log-likelihoods of all models are maximized jointly with L-BFGS-B and the
+    analytic score. Since the models do not share hyperparameters, this is equivalent
+    to separate fits.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        start (numpy.ndarray, optional): The starting log variances of shape
+            (n_models, n_params + 1). By default, the OLS residual variance and the
+            squared OLS standard errors.
+        initial_variance (float): The variance of the initial coefficients. Defaults to
+            1e6.
+        max_iter (int): The maximum number of iterations. Defaults to 500.
+
+    Returns:
+        dict: The estimated log variances, log-likelihoods, smoothed means and
+            covariances, and whether the optimizer converged.
+
+    """
+    n_models, nobs, k_params = design.shape
+    if start is None:
+        batch = fit_ols_batch(outcome_variable, design)
+        start = np.log(
+            np.column_stack([batch["scale"], batch_bse(batch) ** 2]),
+        )
+    workspace = allocate_workspace(n_models, nobs, k_params)
+    shape = (n_models, k_params + 1)
+
+    def _criterion(x):
+        filtered = tvp_filter(
+            outcome_variable,
+            design,
+            x.reshape(shape),
+            initial_variance=initial_variance,
+            gradient=True,
+            workspace=workspace,
+        )
+        return -filtered["loglike"].sum(), -filtered["score"].ravel()
+
+    result = optimize.minimize(
+        _criterion,
+        np.ravel(start),
+        jac=True,
+        method="L-BFGS-B",
+        bounds=[(-40, 20)] * start.size,
+        options={"maxiter": max_iter},
+    )
+    log_variances = result.x.reshape(shape)
+    filtered = tvp_filter(
+        outcome_variable,
+        design,
+        log_variances,
+        initial_variance=initial_variance,
+        workspace=workspace,
+    )
+    return {
+        "log_variances": log_variances,
+        "loglike": filtered["loglike"].copy(),
+        **tvp_smoother(filtered),
+        "converged": result.success,
+    }
+
+
+def tvp_loglike_grid(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    log_variances: np.ndarray,
+    initial_variance: float = 1e6,
+    engine: str = "numpy",
+) -> np.ndarray:
+    """Evaluate the log-likelihoods of many models over a grid of hyperparameters.
+
+    All models and grid points are filtered as one batch.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of
+            shape (n_obs,).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        log_variances (numpy.ndarray): The grid of shape (n_points, n_params + 1) or
+            (n_models, n_points, n_params + 1).
+        initial_variance (float): The variance of the initial coefficients. Defaults to
+            1e6.
+        engine (str): The engine of :func:`tvp_filter`. Defaults to 'numpy'.
+
+    Returns:
+        numpy.ndarray: The log-likelihoods of shape (n_models, n_points).
+
+    """
+    n_models, nobs, k_params = design.shape
+    log_variances = np.broadcast_to(
+        log_variances,
+        (n_models, *np.shape(log_variances)[-2:]),
+    )
+    n_points = log_variances.shape[1]
+    filtered = tvp_filter(
+        outcome_variable,
+        np.repeat(design, n_points, axis=0),
+        log_variances.reshape(-1, k_params + 1),
+        initial_variance=initial_variance,
+        engine=engine,
+    )
+    return filtered["loglike"].reshape(n_models, n_points)
+
+
+def _filter_numpy(endog, design, variances, initial_variance, gradient, ws):
+    """Run the filter vectorized over models, writing into the workspace."""
+    n_models, nobs, k_params = design.shape
+    sigma2 = variances[:, 0]
+    mean, cov, state_cov = ws["mean"], ws["cov"], ws["state_cov"]
+    px, gain, outer = ws["px"], ws["gain"], ws["outer"]
+    forecast, variance, error = ws["forecast"], ws["variance"], ws["error"]
+    scaled_error, term, step = ws["scaled_error"], ws["term"], ws["step"]
+    loglike = ws["loglike"]
+    mean[:] = 0.0
+    cov[:] = initial_variance * np.eye(k_params)
+    state_cov[:] = 0.0
+    diagonal = np.arange(k_params)
+    state_cov[:, diagonal, diagonal] = variances[:, 1:]
+    loglike[:] = 0.0
+    if gradient:
+        d_mean, d_cov, d_state_cov = ws["d_mean"], ws["d_cov"], ws["d_state_cov"]
+        d_sigma2, d_px, d_gain = ws["d_sigma2"], ws["d_px"], ws["d_gain"]
+        d_variance, d_error, d_outer = ws["d_variance"], ws["d_error"], ws["d_outer"]
+        d_term, d_step, score = ws["d_term"], ws["d_step"], ws["score"]
+        d_mean[:] = 0.0
+        d_cov[:] = 0.0
+        d_state_cov[:] = 0.0
+        # The derivatives of the variances with respect to their logarithms.
+        d_state_cov[:, 1 + diagonal, diagonal, diagonal] = variances[:, 1:]
+        d_sigma2[:] = 0.0
+        d_sigma2[:, 0] = sigma2
+        score[:] = 0.0
+
+    for t in range(nobs):
+        x = design[:, t]
+        predicted = ws["predicted_cov"][:, t]
+        np.add(cov, state_cov, out=predicted)
+        np.einsum("mkl,ml->mk", predicted, x, out=px)
+        np.einsum("mk,mk->m", x, px, out=variance)
+        variance += sigma2
+        np.einsum("mk,mk->m", x, mean, out=forecast)
+        np.subtract(endog[t], forecast, out=error)
+        np.divide(px, variance[:, None], out=gain)
+        np.divide(error, variance, out=scaled_error)
+        if gradient:
+            d_cov += d_state_cov
+            np.einsum("mpkl,ml->mpk", d_cov, x, out=d_px)
+            np.einsum("mk,mpk->mp", x, d_px, out=d_variance)
+            d_variance += d_sigma2
+            np.einsum("mk,mpk->mp", x, d_mean, out=d_error)
+            np.negative(d_error, out=d_error)
+            np.multiply(gain[:, None, :], d_variance[..., None], out=d_gain)
+            np.subtract(d_px, d_gain, out=d_gain)
+            d_gain /= variance[:, None, None]
+            if t >= k_params:
+                # The score is -0.5 * (d_variance * (1 - e^2 / f) / f + 2 e / f * d_e).
+                np.multiply(scaled_error, error, out=term)
+                np.subtract(1.0, term, out=term)
+                term /= variance
+                term *= 0.5
+                np.multiply(d_variance, term[:, None], out=d_term)
+                score -= d_term
+                np.multiply(d_error, scaled_error[:, None], out=d_term)
+                score -= d_term
+            np.multiply(d_gain, error[:, None, None], out=d_step)
+            d_mean += d_step
+            np.multiply(gain[:, None, :], d_error[..., None], out=d_step)
+            d_mean += d_step
+            np.einsum("mpk,ml->mpkl", d_gain, px, out=d_outer)
+            d_cov -= d_outer
+            # One hyperparameter at a time, so that einsum does not buffer the outer
+            # products.
+            for i in range(k_params + 1):
+                np.einsum("mk,ml->mkl", gain, d_px[:, i], out=d_outer[:, i])
+            d_cov -= d_outer
+        if t >= k_params:
+            np.log(variance, out=term)
+            term += _LOG_2PI
+            np.multiply(error, scaled_error, out=scaled_error)
+            term += scaled_error
+            term *= 0.5
+            loglike -= term
+        np.multiply(gain, error[:, None], out=step)
+        mean += step
+        np.einsum("mk,ml->mkl", gain, px, out=outer)
+        np.subtract(predicted, outer, out=cov)
+        ws["filtered_mean"][:, t] = mean
+        ws["filtered_cov"][:, t] = cov
+
+
+def _filter_kernel(
+    endog,
+    design,
+    variances,
+    initial_variance,
+    filtered_mean,
+    filtered_cov,
+    predicted_cov,
+    loglike,
+):
+    """Run the filter with explicit loops, written to be compiled with numba."""
+    n_models, nobs, k_params = design.shape
+    log_2pi = np.log(2 * np.pi)
+    mean = np.empty(k_params)
+    cov = np.empty((k_params, k_params))
+    px = np.empty(k_params)
+    for m in range(n_models):
+        mean[:] = 0.0
+        cov[:] = 0.0
+        for i in range(k_params):
+            cov[i, i] = initial_variance
+        loglike[m] = 0.0
+        for t in range(nobs):
+            for i in range(k_params):
+                cov[i, i] += variances[m, 1 + i]
+            predicted_cov[m, t] = cov
+            variance = variances[m, 0]
+            error = endog[t]
+            for i in range(k_params):
+                px[i] = 0.0
+                for j in range(k_params):
+                    px[i] += cov[i, j] * design[m, t, j]
+                variance += design[m, t, i] * px[i]
+                error -= design[m, t, i] * mean[i]
+            if t >= k_params:
+                loglike[m] -= 0.5 * (log_2pi + np.log(variance) + error**2 / variance)
+            for i in range(k_params):
+                mean[i] += px[i] / variance * error
+                for j in range(k_params):
+                    cov[i, j] -= px[i] * px[j] / variance
+            filtered_mean[m, t] = mean
+            filtered_cov[m, t] = cov
+
+
+_COMPILED = {}
+
+
+def _filter_kernel_jit():
+    """Compile the filter kernel with numba on first use."""
+    if "filter" not in _COMPILED:
+        _COMPILED["filter"] = _numba.njit(cache=True)(_filter_kernel)
+    return _COMPILED["filter"]
@@ -1,11 +1,50 @@
 """Functions for fitting the regression model."""
 
 
+import warnings
+
+import numpy as np
 import pandas as pd
 import statsmodels
-import statsmodels.api as sm
 from statsmodels.iolib.smpickle import load_pickle
-from statsmodels.stats.diagnostic import acorr_breusch_godfrey, het_breuschpagan
+
+from nkpc_estimation.analysis.bayes import nig_posterior, posterior_moments
+from nkpc_estimation.analysis.diagnostics import batch_diagnostics
+from nkpc_estimation.analysis.iv import (
+    fit_gmm_batch,
+    fit_iv_batch,
+    instrument_projection,
+    lagged_instruments,
+)
+from nkpc_estimation.analysis.ols import (
+    batch_cov_params,
+    fit_ols_batch,
+    newey_west_maxlags,
+    stack_design_matrices,
+    to_fitted_results,
+    to_results,
+)
+
+MODEL_TYPES = ("OLS", "IV", "GMM", "Bayes")
+
+MODEL_OPTIONS = {
+    "OLS": ("maxlags", "kernel", "robust_cov_type", "nlags", "significance"),
+    "IV": ("maxlags", "kernel", "robust_cov_type", "instrument_lags"),
+    "GMM": (
+        "maxlags",
+        "kernel",
+        "robust_cov_type",
+        "instrument_lags",
+        "max_iter",
+        "tol",
+    ),
+    "Bayes": ("prior",),
+}
+"""dict: The options of :func:`fit_model` used by each model type."""
+
+INSTRUMENTED_MODEL_TYPES = ("IV", "GMM")
+"""tuple: The model types instrumenting the features with the lags of all variables,
+so every model depends on all features."""
 
 
 def fit_model(
@@ -13,46 +52,271 @@ def fit_model(
     feature_vars_1: dict[str, pd.Series],
     feature_vars_2: pd.Series,
     model_type: str,
+    pairs: list[tuple[str, str]] | None = None,
+    maxlags: int | str = 4,
+    kernel: str = "bartlett",
+    robust_cov_type: str = "HAC",
+    nlags: int = 4,
+    significance: float = 0.05,
+    instrument_lags: int = 1,
+    max_iter: int = 50,
+    tol: float = 1e-8,
+    prior: dict[str, float] | None = None,
+    weights: dict[str, np.ndarray] | None = None,
+    return_diagnostics: bool = False,
 ) -> statsmodels.base.model.Results:
     """Fit a model to data.
 
+    All regressions of the feature grid are estimated jointly with
+    :func:`nkpc_estimation.analysis.ols.fit_ols_batch`. The HAC covariance is attached
+    to the same point estimates if the Breusch-Godfrey or Breusch-Pagan test rejects,
+    so the coefficients are estimated only once.
+    Both tests are computed for the whole batch with
+    :func:`nkpc_estimation.analysis.diagnostics.batch_diagnostics`.
+
+    The 'IV' and 'GMM' model types instrument the features with their own lags and the
+    lags of the outcome variable. The instruments are shared by all feature pairs, so
+    their projection is computed once. 'IV' is two-stage least squares with robust
+    standard errors and 'GMM' is iterated efficient GMM started from the 2SLS fit.
+
+    The 'Bayes' model type reports the means and covariances of the conjugate
+    Normal-Inverse-Gamma posteriors, see :mod:`nkpc_estimation.analysis.bayes`.
+
     Args:
         outcome_variable (pandas.Series): The outcome variable of the regression.
         feature_vars_1 (dict): A dictionary of feature variables for the regression.
         feature_vars_2 (dict): A dictionary of feature variables for the regression.
-        model_type (str): Type of regression. Only 'OLS' model_type is supported.
+        model_type (str): Type of regression, one of 'OLS', 'IV', 'GMM', or 'Bayes'.
+        pairs (list, optional): The pairs of feature names to fit. Defaults to all
+            combinations of feature_vars_1 and feature_vars_2.
+        maxlags (int or str): The number of lags of the HAC covariance or 'auto' for the
+            rule of thumb of Newey and West (1994). Defaults to 4.
+        kernel (str): The kernel of the HAC covariance, 'bartlett' or 'uniform'.
+            Defaults to 'bartlett'.
+        robust_cov_type (str): The covariance type used if a diagnostic test rejects,
+            'HAC' or one of 'HC0' to 'HC3'. Defaults to 'HAC'.
+        nlags (int): The number of lags of the Breusch-Godfrey test. Defaults to 4.
+        significance (float): The significance level of the diagnostic tests.
+            Defaults to 0.05.
+        instrument_lags (int): The number of lags of each variable used as
+            instruments by 'IV' and 'GMM'. Defaults to 1.
+        max_iter (int): The maximum number of iterations of 'GMM'. Defaults to 50.
+        tol (float): The relative tolerance of the coefficients of 'GMM'. Defaults to
+            1e-8.
+        prior (dict, optional): The prior of 'Bayes', see
+            :func:`nkpc_estimation.analysis.bayes.nig_posterior`.
+        weights (dict, optional): The initial weighting matrices of 'GMM' by model
+            name, e.g. the final weighting matrices of a neighbouring sample window.
+            They are used if all fitted models have one. Defaults to starting from the
+            2SLS fit.
+        return_diagnostics (bool): Whether to also return the p-values of the
+            diagnostic tests. Defaults to False.
 
     Returns:
-        statsmodels.base.model.Results: The fitted model.
+        statsmodels.base.model.Results: The fitted model. If return_diagnostics is True,
+            a tuple of the fitted models and the statistics and p-values of the
+            diagnostic tests together with the chosen covariance type. The
+            diagnostics of 'IV' and 'GMM' are the tests of the overidentifying
+            restrictions. The diagnostics of 'GMM' also contain whether it fell back to
+            2SLS, whether it converged, the number of iterations, and its final
+            weighting matrix.
 
     """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"model_type must be one of {MODEL_TYPES}.")
+    if model_type == "Bayes":
+        models, diagnostics = _fit_bayes(
+            outcome_variable,
+            feature_vars_1,
+            feature_vars_2,
+            pairs,
+            prior,
+        )
+        if return_diagnostics:
+            return models, diagnostics
+        return models
     if model_type != "OLS":
-        raise ValueError("Only 'OLS' model_type is supported.")
+        models, diagnostics = _fit_instrumental(
+            outcome_variable,
+            feature_vars_1,
+            feature_vars_2,
+            model_type,
+            pairs,
+            maxlags,
+            kernel,
+            robust_cov_type,
+            instrument_lags,
+            max_iter,
+            tol,
+            weights,
+        )
+        if return_diagnostics:
+            return models, diagnostics
+        return models
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2, pairs)
+    batch = fit_ols_batch(outcome_variable, design)
+    if maxlags == "auto":
+        maxlags = newey_west_maxlags(batch["nobs"])
+    robust_cov_kwds = (
+        {"maxlags": maxlags, "kernel": kernel} if robust_cov_type == "HAC" else None
+    )
+    tests = batch_diagnostics(batch, nlags=nlags)
     models = {}
-    for feature_name_1, feature_var_1 in feature_vars_1.items():
-        for feature_name_2, feature_var_2 in feature_vars_2.items():
-            feature_var = list(zip(feature_var_1, feature_var_2))
-            model = sm.OLS(outcome_variable, feature_var).fit()
-            BG_pvalue = acorr_breusch_godfrey(model, nlags=4, store=False)[1]
-            BP_pvalue = het_breuschpagan(model.resid, feature_var)[1]
-
-            if BG_pvalue < 0.05 or BP_pvalue < 0.05:
-                model = sm.OLS(outcome_variable, feature_var).fit(
-                    cov_type="HAC",
-                    cov_kwds={"maxlags": 4},
-                )
-                print(
-                    f"Refitted model with HAC standard errors (BG p-value={BG_pvalue:.4f}, BP p-value={BP_pvalue:.4f}).",
-                )
-            else:
-                print(
-                    f"Fitted model with OLS (BG p-value={BG_pvalue:.4f}, BP p-value={BP_pvalue:.4f}).",
-                )
-            models[f"{feature_name_1}, {feature_name_2}"] = model
+    diagnostics = {}
+    for i, (feature_name_1, feature_name_2) in enumerate(pairs):
+        BG_pvalue = tests["bg_pvalue"][i]
+        BP_pvalue = tests["bp_pvalue"][i]
+
+        if BG_pvalue < significance or BP_pvalue < significance:
+            cov_type = robust_cov_type
+            model = to_results(
+                outcome_variable,
+                design[i],
+                batch,
+                i,
+                cov_type=cov_type,
+                cov_kwds=robust_cov_kwds,
+            )
+            print(
+                f"Fitted model with {cov_type} standard errors (BG p-value={BG_pvalue:.4f}, BP p-value={BP_pvalue:.4f}).",
+            )
+        else:
+            cov_type = "nonrobust"
+            model = to_results(outcome_variable, design[i], batch, i)
+            print(
+                f"Fitted model with OLS (BG p-value={BG_pvalue:.4f}, BP p-value={BP_pvalue:.4f}).",
+            )
+        models[f"{feature_name_1}, {feature_name_2}"] = model
+        diagnostics[f"{feature_name_1}, {feature_name_2}"] = {
+            name: value[i] for name, value in tests.items()
+        } | {"cov_type": cov_type}
 
+    if return_diagnostics:
+        return models, diagnostics
     return models
 
 
+def _fit_bayes(outcome_variable, feature_vars_1, feature_vars_2, pairs, prior):
+    """Summarize the conjugate posteriors of the feature grid by their moments."""
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2, pairs)
+    mean, cov = posterior_moments(nig_posterior(outcome_variable, design, prior))
+    models = {}
+    diagnostics = {}
+    for i, (feature_name_1, feature_name_2) in enumerate(pairs):
+        name = f"{feature_name_1}, {feature_name_2}"
+        models[name] = to_fitted_results(
+            outcome_variable,
+            design[i],
+            mean[i],
+            cov[i],
+            "posterior",
+        )
+        diagnostics[name] = {"cov_type": "posterior"}
+    return models, diagnostics
+
+
+def _fit_instrumental(
+    outcome_variable,
+    feature_vars_1,
+    feature_vars_2,
+    model_type,
+    pairs,
+    maxlags,
+    kernel,
+    robust_cov_type,
+    instrument_lags,
+    max_iter,
+    tol,
+    weights,
+):
+    """Fit the feature grid by 2SLS or iterated GMM with shared lagged instruments."""
+    instruments = lagged_instruments(
+        {"Inflation": outcome_variable} | feature_vars_1 | feature_vars_2,
+        lags=instrument_lags,
+    ).iloc[instrument_lags:]
+    outcome_variable = outcome_variable.iloc[instrument_lags:]
+    pairs, design = stack_design_matrices(
+        {name: var.iloc[instrument_lags:] for name, var in feature_vars_1.items()},
+        {name: var.iloc[instrument_lags:] for name, var in feature_vars_2.items()},
+        pairs,
+    )
+    nobs = len(outcome_variable)
+    if maxlags == "auto":
+        maxlags = newey_west_maxlags(nobs)
+    if robust_cov_type != "HAC":
+        maxlags = 0
+    batch = fit_iv_batch(outcome_variable, design, instrument_projection(instruments))
+    names = [
+        f"{feature_name_1}, {feature_name_2}"
+        for feature_name_1, feature_name_2 in pairs
+    ]
+    if weights is not None and all(name in weights for name in names):
+        weights = np.stack([weights[name] for name in names])
+    else:
+        weights = None
+    fallback = False
+    if model_type == "IV":
+        cov_type = robust_cov_type
+        cov = batch_cov_params(batch, cov_type, maxlags=maxlags, kernel=kernel)
+    else:
+        cov_type = "HAC" if robust_cov_type == "HAC" else "HC0"
+        try:
+            batch = fit_gmm_batch(
+                outcome_variable,
+                design,
+                instruments,
+                maxlags=maxlags,
+                kernel=kernel,
+                initial=batch,
+                weights=weights,
+                max_iter=max_iter,
+                tol=tol,
+            )
+            cov = batch["cov_params"]
+        except ValueError as error:
+            warnings.warn(f"GMM falls back to 2SLS: {error}", RuntimeWarning)
+            fallback = True
+            cov = batch_cov_params(batch, cov_type, maxlags=maxlags, kernel=kernel)
+        else:
+            if not batch["converged"].all():
+                warnings.warn(
+                    f"GMM did not converge in {max_iter} iterations for "
+                    f"{(~batch['converged']).sum()} of {len(names)} models.",
+                    RuntimeWarning,
+                )
+    cov_kwds = {"maxlags": maxlags, "kernel": kernel} if cov_type == "HAC" else None
+
+    models = {}
+    diagnostics = {}
+    for i, name in enumerate(names):
+        models[name] = to_fitted_results(
+            outcome_variable,
+            design[i],
+            batch["params"][i],
+            cov[i],
+            cov_type,
+            cov_kwds,
+        )
+        diagnostics[name] = {
+            "j_stat": batch["j_stat"][i],
+            "j_pvalue": batch["j_pvalue"][i],
+            "cov_type": cov_type,
+        }
+        if model_type == "GMM" and fallback:
+            diagnostics[name]["gmm_fallback"] = 1.0
+        elif model_type == "GMM":
+            diagnostics[name] |= {
+                "gmm_fallback": 0.0,
+                "converged": float(batch["converged"][i]),
+                "n_iter": batch["n_iter"],
+                "weights": batch["weights"][i],
+            }
+        print(
+            f"Fitted model with {model_type} and {cov_type} standard errors (J p-value={batch['j_pvalue'][i]:.4f}).",
+        )
+    return models, diagnostics
+
+
 def load_model(path):
     """Load statsmodels model.
 
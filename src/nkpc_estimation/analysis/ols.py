@@ -0,0 +1,384 @@
+"""Functions for the batched least squares estimation of the regression grid."""
+
+
+import numpy as np
+import pandas as pd
+import statsmodels
+import statsmodels.api as sm
+from statsmodels.regression.linear_model import OLSResults, RegressionResultsWrapper
+from statsmodels.stats.sandwich_covariance import kernel_dict
+
+
+def stack_design_matrices(
+    feature_vars_1: dict[str, pd.Series],
+    feature_vars_2: dict[str, pd.Series],
+    pairs: list[tuple[str, str]] | None = None,
+) -> tuple[list[tuple[str, str]], np.ndarray]:
+    """Stack the design matrices of all feature pairs into one array.
+
+    Args:
+        feature_vars_1 (dict): A dictionary of feature variables for the regression.
+        feature_vars_2 (dict): A dictionary of feature variables for the regression.
+        pairs (list, optional): The pairs of feature names to stack. Defaults to all
+            combinations of the two dictionaries.
+
+    Returns:
+        tuple: The list of feature name pairs and the design matrices as a
+            numpy.ndarray of shape (n_models, n_obs, 2).
+
+    """
+    if pairs is None:
+        pairs = [
+            (name_1, name_2) for name_1 in feature_vars_1 for name_2 in feature_vars_2
+        ]
+    names_1 = list(feature_vars_1)
+    names_2 = list(feature_vars_2)
+    values_1 = np.column_stack(
+        [np.asarray(var, dtype=float) for var in feature_vars_1.values()]
+    )
+    values_2 = np.column_stack(
+        [np.asarray(var, dtype=float) for var in feature_vars_2.values()]
+    )
+    index_1 = [names_1.index(name_1) for name_1, _ in pairs]
+    index_2 = [names_2.index(name_2) for _, name_2 in pairs]
+    design = np.stack((values_1[:, index_1], values_2[:, index_2]), axis=-1)
+    return pairs, design.transpose(1, 0, 2)
+
+
+def fit_ols_batch(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    return_results: bool = False,
+) -> dict[str, np.ndarray]:
+    """Fit many OLS regressions with one vectorized QR decomposition.
+
+    Covariance matrices are not computed here. They are attached lazily from the same
+    residuals and design with :func:`batch_cov_params`.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable, either
+            shared by all models with shape (n_obs,) or of shape (n_models, n_obs).
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        return_results (bool): Whether to also build the statsmodels results objects
+            with nonrobust covariances. Defaults to False.
+
+    Returns:
+        dict: The estimates of all models stacked along the first axis.
+
+    Raises:
+        ValueError: If the design matrices are not three-dimensional.
+
+    """
+    if design.ndim != 3:
+        raise ValueError("design must be of shape (n_models, n_obs, n_params).")
+    endog = np.broadcast_to(np.asarray(outcome_variable, dtype=float), design.shape[:2])
+    n_models, nobs, k_params = design.shape
+
+    q, r = np.linalg.qr(design)
+    effects = np.einsum("mnk,mn->mk", q, endog)
+    params = np.linalg.solve(r, effects[..., None])[..., 0]
+    fittedvalues = np.einsum("mnk,mk->mn", design, params)
+    resid = endog - fittedvalues
+    r_inv = np.linalg.inv(r)
+    normalized_cov_params = r_inv @ r_inv.transpose(0, 2, 1)
+
+    df_resid = nobs - k_params
+    ssr = np.einsum("mn,mn->m", resid, resid)
+    scale = ssr / df_resid
+    has_constant = np.any(
+        (np.ptp(design, axis=1) == 0) & (design[:, 0, :] != 0),
+        axis=1,
+    )
+    demeaned = endog - endog.mean(axis=1, keepdims=True)
+    centered_tss = np.einsum("mn,mn->m", demeaned, demeaned)
+    uncentered_tss = np.einsum("mn,mn->m", endog, endog)
+    tss = np.where(has_constant, centered_tss, uncentered_tss)
+
+    batch = {
+        "params": params,
+        "resid": resid,
+        "fittedvalues": fittedvalues,
+        "normalized_cov_params": normalized_cov_params,
+        "cov_params": {},
+        "design": design,
+        "ssr": ssr,
+        "scale": scale,
+        "rsquared": 1 - ssr / tss,
+        "nobs": nobs,
+        "df_resid": df_resid,
+        "q": q,
+        "r": r,
+    }
+    if return_results:
+        batch["results"] = [
+            to_results(outcome_variable, design[i], batch, i) for i in range(n_models)
+        ]
+    return batch
+
+
+def batch_cov_params(
+    batch: dict[str, np.ndarray],
+    cov_type: str = "nonrobust",
+    maxlags: int | str = 4,
+    kernel: str = "bartlett",
+) -> np.ndarray:
+    """Get the covariance matrices of a batched fit, computing them on first use.
+
+    The covariances are computed from the residuals and factorized design matrices of
+    the fit and memoized in ``batch["cov_params"]``, so the coefficients are never
+    re-estimated. They match the corresponding ``cov_type`` in statsmodels.
+
+    Args:
+        batch (dict): The output of :func:`fit_ols_batch`.
+        cov_type (str): One of 'nonrobust', 'HC0', 'HC1', 'HC2', 'HC3', or 'HAC'.
+            Defaults to 'nonrobust'.
+        maxlags (int or str): The number of lags of the HAC covariance or 'auto' for
+            the rule of thumb of :func:`newey_west_maxlags`. Defaults to 4.
+        kernel (str): The kernel of the HAC covariance, 'bartlett' or 'uniform'.
+            Defaults to 'bartlett'.
+
+    Returns:
+        numpy.ndarray: The covariance matrices of shape (n_models, n_params, n_params).
+
+    Raises:
+        ValueError: If the covariance type or kernel is not supported.
+
+    """
+    if cov_type == "HAC":
+        maxlags = newey_west_maxlags(batch["nobs"]) if maxlags == "auto" else maxlags
+        key = (cov_type, maxlags, kernel)
+    else:
+        key = (cov_type,)
+    if key in batch["cov_params"]:
+        return batch["cov_params"][key]
+
+    design = batch["design"]
+    resid = batch["resid"]
+    normalized_cov_params = batch["normalized_cov_params"]
+    if cov_type == "nonrobust":
+        cov = batch["scale"][:, None, None] * normalized_cov_params
+    elif cov_type in ("HC0", "HC1", "HC2", "HC3"):
+        cov = hc_covariance(design, resid, normalized_cov_params, batch["q"], cov_type)
+    elif cov_type == "HAC":
+        cov = hac_covariance(design, resid, normalized_cov_params, maxlags, kernel)
+    else:
+        raise ValueError(f"Unsupported cov_type {cov_type!r}.")
+    batch["cov_params"][key] = cov
+    return cov
+
+
+def batch_bse(
+    batch: dict[str, np.ndarray],
+    cov_type: str = "nonrobust",
+    maxlags: int | str = 4,
+    kernel: str = "bartlett",
+) -> np.ndarray:
+    """Get the standard errors of a batched fit for a covariance type.
+
+    Args:
+        batch (dict): The output of :func:`fit_ols_batch`.
+        cov_type (str): The covariance type, see :func:`batch_cov_params`. Defaults to
+            'nonrobust'.
+        maxlags (int or str): The number of lags of the HAC covariance. Defaults to 4.
+        kernel (str): The kernel of the HAC covariance. Defaults to 'bartlett'.
+
+    Returns:
+        numpy.ndarray: The standard errors of shape (n_models, n_params).
+
+    """
+    cov = batch_cov_params(batch, cov_type, maxlags=maxlags, kernel=kernel)
+    return np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+
+
+def hc_covariance(
+    design: np.ndarray,
+    resid: np.ndarray,
+    normalized_cov_params: np.ndarray,
+    q: np.ndarray,
+    cov_type: str = "HC0",
+) -> np.ndarray:
+    """Compute heteroskedasticity robust covariances for a batch of regressions.
+
+    Args:
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        resid (numpy.ndarray): The residuals of shape (n_models, n_obs).
+        normalized_cov_params (numpy.ndarray): The inverse Gram matrices of shape
+            (n_models, n_params, n_params).
+        q (numpy.ndarray): The orthonormal factors of the QR decompositions of the
+            design matrices, used for the leverages.
+        cov_type (str): One of 'HC0', 'HC1', 'HC2', or 'HC3'. Defaults to 'HC0'.
+
+    Returns:
+        numpy.ndarray: The covariance matrices of shape (n_models, n_params, n_params).
+
+    """
+    nobs, k_params = design.shape[1:]
+    weights = resid**2
+    if cov_type == "HC1":
+        weights = weights * nobs / (nobs - k_params)
+    elif cov_type in ("HC2", "HC3"):
+        leverage = np.einsum("mnk,mnk->mn", q, q)
+        weights = weights / (1 - leverage) ** (1 if cov_type == "HC2" else 2)
+    meat = np.einsum("mnk,mn,mnl->mkl", design, weights, design)
+    return normalized_cov_params @ meat @ normalized_cov_params
+
+
+def hac_covariance(
+    design: np.ndarray,
+    resid: np.ndarray,
+    normalized_cov_params: np.ndarray,
+    maxlags: int,
+    kernel: str = "bartlett",
+) -> np.ndarray:
+    """Compute Newey-West HAC covariances for a batch of regressions.
+
+    The estimator uses no small sample correction, which matches ``cov_type="HAC"`` in
+    statsmodels.
+
+    Args:
+        design (numpy.ndarray): The design matrices of shape (n_models, n_obs, n_params).
+        resid (numpy.ndarray): The residuals of shape (n_models, n_obs).
+        normalized_cov_params (numpy.ndarray): The inverse Gram matrices of shape
+            (n_models, n_params, n_params).
+        maxlags (int): The number of lags.
+        kernel (str): The lag window, 'bartlett' or 'uniform'. Defaults to 'bartlett'.
+
+    Returns:
+        numpy.ndarray: The covariance matrices of shape (n_models, n_params, n_params).
+
+    Raises:
+        ValueError: If the kernel is not supported.
+
+    """
+    meat = long_run_covariance(design * resid[..., None], maxlags, kernel)
+    return normalized_cov_params @ meat @ normalized_cov_params
+
+
+def long_run_covariance(
+    scores: np.ndarray,
+    maxlags: int,
+    kernel: str = "bartlett",
+) -> np.ndarray:
+    """Compute the kernel weighted sums of the autocovariances of a batch of scores.
+
+    Args:
+        scores (numpy.ndarray): The scores of shape (n_models, n_obs, n_scores).
+        maxlags (int): The number of lags.
+        kernel (str): The lag window, 'bartlett' or 'uniform'. Defaults to 'bartlett'.
+
+    Returns:
+        numpy.ndarray: The long-run covariances, not divided by the number of
+            observations, of shape (n_models, n_scores, n_scores).
+
+    Raises:
+        ValueError: If the kernel is not supported.
+
+    """
+    if kernel not in _KERNELS:
+        raise ValueError(f"kernel must be one of {tuple(_KERNELS)}.")
+    meat = np.einsum("mnk,mnl->mkl", scores, scores)
+    for lag in range(1, maxlags + 1):
+        weight = _KERNELS[kernel](lag, maxlags)
+        cross = np.einsum("mnk,mnl->mkl", scores[:, lag:], scores[:, :-lag])
+        meat += weight * (cross + cross.transpose(0, 2, 1))
+    return meat
+
+
+def newey_west_maxlags(nobs: int) -> int:
+    """Choose the number of HAC lags with the rule of thumb of Newey and West (1994).
+
+    Args:
+        nobs (int): The number of observations.
+
+    Returns:
+        int: The number of lags, ``floor(4 * (nobs / 100) ** (2 / 9))``.
+
+    """
+    return int(np.floor(4 * (nobs / 100) ** (2 / 9)))
+
+
+_KERNELS = {
+    "bartlett": lambda lag, maxlags: 1 - lag / (maxlags + 1),
+    "uniform": lambda lag, maxlags: 1.0,
+}
+
+
+def to_results(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    batch: dict[str, np.ndarray],
+    index: int,
+    cov_type: str = "nonrobust",
+    cov_kwds: dict | None = None,
+) -> statsmodels.base.model.Results:
+    """Build a statsmodels results object from a batched fit without refitting.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable.
+        design (numpy.ndarray): The design matrix of the model of shape (n_obs, n_params).
+        batch (dict): The output of :func:`fit_ols_batch`.
+        index (int): The position of the model in the batch.
+        cov_type (str): The covariance type passed to statsmodels. Defaults to
+            'nonrobust'.
+        cov_kwds (dict, optional): Keyword arguments for the covariance type.
+
+    Returns:
+        statsmodels.base.model.Results: The fitted model.
+
+    """
+    model = sm.OLS(outcome_variable, design)
+    r_inv = np.linalg.inv(batch["r"][index])
+    model.pinv_wexog = r_inv @ batch["q"][index].T
+    model.normalized_cov_params = batch["normalized_cov_params"][index]
+    model.wexog_singular_values = np.linalg.svd(batch["r"][index], compute_uv=False)
+    model.rank = design.shape[1]
+    model.df_model = float(model.rank - model.k_constant)
+    model.df_resid = float(model.nobs - model.rank)
+    results = OLSResults(
+        model,
+        batch["params"][index],
+        normalized_cov_params=model.normalized_cov_params,
+        cov_type=cov_type,
+        cov_kwds=cov_kwds,
+    )
+    return RegressionResultsWrapper(results)
+
+
+def to_fitted_results(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    params: np.ndarray,
+    cov_params: np.ndarray,
+    cov_type: str,
+    cov_kwds: dict | None = None,
+) -> statsmodels.base.model.Results:
+    """Build a statsmodels results object from coefficients and their covariance.
+
+    The residuals and fit statistics are computed from the coefficients, and the
+    covariance is attached as is. This is used for estimators other than OLS, e.g.
+    instrumental variables or posterior moments.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable.
+        design (numpy.ndarray): The design matrix of the model of shape (n_obs, n_params).
+        params (numpy.ndarray): The coefficients.
+        cov_params (numpy.ndarray): The covariance of the coefficients.
+        cov_type (str): The covariance type, e.g. 'HAC' or 'posterior'.
+        cov_kwds (dict, optional): The maxlags and kernel of a HAC covariance.
+
+    Returns:
+        statsmodels.base.model.Results: The fitted model.
+
+    """
+    model = sm.OLS(outcome_variable, design)
+    model.rank = design.shape[1]
+    model.df_model = float(model.rank - model.k_constant)
+    model.df_resid = float(model.nobs - model.rank)
+    results = OLSResults(model, params, normalized_cov_params=cov_params)
+    results.cov_params_default = cov_params
+    results.cov_type = cov_type
+    results.cov_kwds = dict(cov_kwds or {})
+    if "kernel" in results.cov_kwds:
+        results.cov_kwds["weights_func"] = kernel_dict[results.cov_kwds["kernel"]]
+    results.use_t = False
+    return RegressionResultsWrapper(results)
@@ -0,0 +1,277 @@
+"""Functions for the compact store of estimation results."""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import statsmodels
+import statsmodels.api as sm
+from statsmodels.regression.linear_model import OLSResults, RegressionResultsWrapper
+
+from nkpc_estimation.analysis.features import get_feature
+from nkpc_estimation.analysis.ols import to_fitted_results
+
+FULL_SAMPLE = "full"
+"""str: The date level of results estimated on the full sample."""
+
+INDEX_NAMES = ["feature_1", "feature_2", "model", "date"]
+
+_STATISTICS = (
+    "nobs",
+    "df_model",
+    "df_resid",
+    "ssr",
+    "rsquared",
+    "rsquared_adj",
+    "llf",
+    "aic",
+    "bic",
+    "fvalue",
+    "f_pvalue",
+)
+
+
+def results_to_store(
+    models: dict[str, statsmodels.base.model.Results],
+    model_type: str,
+    date: str | None = None,
+    diagnostics: dict[str, dict[str, float]] | None = None,
+) -> dict[str, np.ndarray]:
+    """Collect fitted models into the arrays of a results store.
+
+    Args:
+        models (dict): The fitted models as returned by
+            :func:`nkpc_estimation.analysis.model.fit_model`.
+        model_type (str): The name of the regression method.
+        date (str, optional): The first date of the sample. None for the full sample.
+        diagnostics (dict, optional): The p-values of the diagnostic tests of each
+            model by test name. Non-scalar diagnostics, such as the weighting matrices
+            of 'GMM', are not stored.
+
+    Returns:
+        dict: The index arrays 'feature_1', 'feature_2', 'model', and 'date', the
+            arrays 'param_names', 'params', 'bse', 'cov_params', and
+            'normalized_cov_params' of shape (n_models, n_params[, n_params]), the
+            chosen covariance type with its HAC lags and kernel, the fit statistics,
+            and the diagnostics.
+
+    """
+    keys = [key.split(", ") for key in models]
+    results = list(models.values())
+    store = {
+        "feature_1": np.array([feature_1 for feature_1, _ in keys]),
+        "feature_2": np.array([feature_2 for _, feature_2 in keys]),
+        "model": np.full(len(results), model_type),
+        "date": np.full(len(results), FULL_SAMPLE if date is None else date),
+        "param_names": np.array([result.model.exog_names for result in results]),
+        "params": np.array([np.asarray(result.params) for result in results]),
+        "bse": np.array([np.asarray(result.bse) for result in results]),
+        "cov_params": np.array([np.asarray(result.cov_params()) for result in results]),
+        "normalized_cov_params": np.array(
+            [result.normalized_cov_params for result in results],
+        ),
+        "cov_type": np.array([result.cov_type for result in results]),
+        "maxlags": np.array(
+            [result.cov_kwds.get("maxlags", -1) for result in results],
+            dtype=int,
+        ),
+        "kernel": np.array([_kernel_name(result) for result in results]),
+    }
+    for statistic in _STATISTICS:
+        store[statistic] = np.array(
+            [float(getattr(result, statistic)) for result in results],
+        )
+    for test in sorted(
+        {test for value in (diagnostics or {}).values() for test in value}
+    ):
+        values = [diagnostics.get(key, {}).get(test, np.nan) for key in models]
+        if test in store or any(np.ndim(value) for value in values):
+            continue
+        store[test] = np.array(values)
+    return store
+
+
+def concat_stores(stores: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    """Concatenate results stores along the models.
+
+    Args:
+        stores (list): The results stores.
+
+    Returns:
+        dict: The combined results store. Arrays missing in a store are filled with
+            NaN.
+
+    """
+    names = dict.fromkeys(name for store in stores for name in store)
+    out = {}
+    for name in names:
+        parts = []
+        for store in stores:
+            if name in store:
+                parts.append(store[name])
+            else:
+                parts.append(np.full(len(store["params"]), np.nan))
+        out[name] = np.concatenate(parts)
+    return out
+
+
+def select_models(
+    store: dict[str, np.ndarray],
+    positions: list[int],
+) -> dict[str, np.ndarray]:
+    """Select the models at the given positions of a results store.
+
+    Args:
+        store (dict): The results store.
+        positions (list): The positions of the models.
+
+    Returns:
+        dict: The results store of the selected models.
+
+    """
+    return {name: values[positions] for name, values in store.items()}
+
+
+def save_results(store: dict[str, np.ndarray], path: str | os.PathLike):
+    """Save a results store as an uncompressed npz file.
+
+    The file is written to a temporary file first and moved into place, so readers
+    never see a partially written store.
+
+    Args:
+        store (dict): The results store.
+        path (str or pathlib.Path): Path to file.
+
+    """
+    directory = os.path.dirname(os.fspath(path)) or "."
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".npz", delete=False) as f:
+        np.savez(f, **store)
+    os.replace(f.name, path)
+
+
+def load_results(path: str | os.PathLike) -> dict[str, np.ndarray]:
+    """Load a results store with one read.
+
+    Args:
+        path (str or pathlib.Path): Path to file.
+
+    Returns:
+        dict: The results store.
+
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        return dict(npz)
+
+
+def results_index(store: dict[str, np.ndarray]) -> pd.MultiIndex:
+    """Get the index of the models of a results store.
+
+    Args:
+        store (dict): The results store.
+
+    Returns:
+        pandas.MultiIndex: The index with levels feature_1, feature_2, model, and date.
+
+    """
+    return pd.MultiIndex.from_arrays(
+        [store[name] for name in INDEX_NAMES],
+        names=INDEX_NAMES,
+    )
+
+
+def results_to_frame(store: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Convert the coefficients of a results store into a long DataFrame.
+
+    Args:
+        store (dict): The results store.
+
+    Returns:
+        pandas.DataFrame: The coefficients and standard errors with one row per model
+            and parameter.
+
+    """
+    n_models, n_params = store["params"].shape
+    index = results_index(store)
+    return pd.DataFrame(
+        {
+            "params": store["params"].ravel(),
+            "bse": store["bse"].ravel(),
+        },
+        index=pd.MultiIndex.from_arrays(
+            [
+                *(
+                    index.get_level_values(name).repeat(n_params)
+                    for name in INDEX_NAMES
+                ),
+                store["param_names"].ravel(),
+            ],
+            names=[*INDEX_NAMES, "param"],
+        ),
+    )
+
+
+def rehydrate_results(
+    store: dict[str, np.ndarray],
+    key: tuple[str, str, str, str],
+    data_path: str | os.PathLike,
+) -> statsmodels.base.model.Results:
+    """Rebuild a statsmodels results object from a results store without refitting.
+
+    The outcome and features are taken from the feature registry on the sample window
+    of the model. Instrumental variable fits get the stored covariance attached.
+
+    Args:
+        store (dict): The results store.
+        key (tuple): The feature_1, feature_2, model, and date of the model.
+        data_path (str or pathlib.Path): Path to the cleaned data set.
+
+    Returns:
+        statsmodels.base.model.Results: The fitted model.
+
+    """
+    position = results_index(store).get_loc(key)
+    feature_name_1, feature_name_2, model_type, date = key
+    start = None if date == FULL_SAMPLE else date
+    # Instrumental variable fits drop the first observations of the window.
+    nobs = int(store["nobs"][position])
+    design = np.column_stack(
+        [
+            get_feature(feature_name_1, data_path, start)[-nobs:],
+            get_feature(feature_name_2, data_path, start)[-nobs:],
+        ],
+    )
+    outcome = get_feature("Inflation", data_path, start)[-nobs:]
+    cov_type = str(store["cov_type"][position])
+    cov_kwds = None
+    if cov_type == "HAC":
+        cov_kwds = {
+            "maxlags": int(store["maxlags"][position]),
+            "kernel": str(store["kernel"][position]),
+        }
+    if model_type != "OLS":
+        return to_fitted_results(
+            outcome,
+            design,
+            store["params"][position],
+            store["cov_params"][position],
+            cov_type,
+            cov_kwds,
+        )
+    model = sm.OLS(outcome, design)
+    results = OLSResults(
+        model,
+        store["params"][position],
+        normalized_cov_params=store["normalized_cov_params"][position],
+        cov_type=cov_type,
+        cov_kwds=cov_kwds,
+    )
+    return RegressionResultsWrapper(results)
+
+
+def _kernel_name(result):
+    """Get the name of the HAC kernel of a fitted model or an empty string."""
+    weights_func = result.cov_kwds.get("weights_func")
+    if weights_func is None:
+        return ""
+    return weights_func.__name__.removeprefix("weights_")
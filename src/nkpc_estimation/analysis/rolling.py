@@ -0,0 +1,138 @@
+"""Functions for rolling and recursive window estimation of the regression model."""
+
+
+import numpy as np
+import pandas as pd
+
+_METHODS = ("expanding", "rolling", "backward")
+
+
+def rolling_ols(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    method: str = "expanding",
+    window: int | None = None,
+    min_nobs: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Estimate OLS regressions on a sequence of sample windows.
+
+    The Gram matrices and cross products of all windows are obtained from cumulative
+    sums of the rank-one updates x_t x_t' and x_t y_t, so the whole path costs
+    O(n_obs * n_params**2) instead of one full fit per window. The supported windows
+    are
+
+    - 'expanding': the sample from the first observation up to each date.
+    - 'rolling': the last ``window`` observations up to each date.
+    - 'backward': the sample from each date up to the last observation.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of shape
+            (n_obs,).
+        design (numpy.ndarray): The design matrix of shape (n_obs, n_params) or a batch
+            of design matrices of shape (n_models, n_obs, n_params).
+        method (str): The type of window. Defaults to 'expanding'.
+        window (int, optional): The length of the window. Required for 'rolling'.
+        min_nobs (int, optional): The minimum number of observations of a window.
+            Defaults to the window length for 'rolling' and to ``n_params + 1``
+            otherwise.
+
+    Returns:
+        dict: The nonrobust coefficient and standard error paths of shape
+            (n_models, n_windows, n_params), the sums of squared residuals of shape
+            (n_models, n_windows), the number of observations of each window, and
+            the position of the date each window is labelled with (its last
+            observation, or its first observation for 'backward').
+
+    Raises:
+        ValueError: If the method is not supported or the window is invalid.
+
+    """
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}.")
+    if method == "rolling" and window is None:
+        raise ValueError("window must be specified for the 'rolling' method.")
+    design = np.asarray(design, dtype=float)
+    if design.ndim == 2:
+        design = design[None]
+    endog = np.asarray(outcome_variable, dtype=float)
+    n_models, nobs, k_params = design.shape
+    if min_nobs is None:
+        min_nobs = window if method == "rolling" else k_params + 1
+    if min_nobs <= k_params or min_nobs > nobs:
+        raise ValueError(
+            "min_nobs must exceed the number of parameters and must not exceed the "
+            "number of observations.",
+        )
+
+    gram = _prefix_sums(np.einsum("mnk,mnl->mnkl", design, design))
+    xy = _prefix_sums(design * endog[:, None])
+    yy = _prefix_sums(endog**2)
+
+    if method == "expanding":
+        end = np.arange(min_nobs, nobs + 1)
+        start = np.zeros_like(end)
+        labels = end - 1
+    elif method == "rolling":
+        end = np.arange(max(window, min_nobs), nobs + 1)
+        start = end - window
+        labels = end - 1
+    else:
+        start = np.arange(0, nobs - min_nobs + 1)
+        end = np.full_like(start, nobs)
+        labels = start
+
+    window_gram = gram[:, end] - gram[:, start]
+    window_xy = xy[:, end] - xy[:, start]
+    window_nobs = end - start
+    params = np.linalg.solve(window_gram, window_xy[..., None])[..., 0]
+    ssr = (yy[end] - yy[start]) - np.einsum("mtk,mtk->mt", params, window_xy)
+    ssr = np.maximum(ssr, 0)
+    scale = ssr / (window_nobs - k_params)
+    normalized_cov_params = np.linalg.inv(window_gram)
+    bse = np.sqrt(
+        scale[..., None] * np.diagonal(normalized_cov_params, axis1=2, axis2=3)
+    )
+    return {
+        "params": params,
+        "bse": bse,
+        "ssr": ssr,
+        "nobs": window_nobs,
+        "index": labels,
+    }
+
+
+def rolling_path_to_frame(
+    path: dict[str, np.ndarray],
+    index: pd.Index,
+    param_names: list[str],
+    model: int = 0,
+) -> pd.DataFrame:
+    """Convert the estimates of one model of a rolling estimation into a DataFrame.
+
+    Args:
+        path (dict): The output of :func:`rolling_ols`.
+        index (pandas.Index): The index of the data the path was estimated on.
+        param_names (list): The names of the parameters.
+        model (int): The position of the model in the batch. Defaults to 0.
+
+    Returns:
+        pandas.DataFrame: The coefficient and standard error paths indexed by the date
+            each window is labelled with.
+
+    """
+    columns = {
+        f"params_{name}": path["params"][model, :, i]
+        for i, name in enumerate(param_names)
+    }
+    columns |= {
+        f"bse_{name}": path["bse"][model, :, i] for i, name in enumerate(param_names)
+    }
+    columns["nobs"] = path["nobs"]
+    return pd.DataFrame(columns, index=index[path["index"]])
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums along the observation axis with a leading zero."""
+    axis = 0 if values.ndim == 1 else 1
+    zeros = np.zeros_like(np.take(values, [0], axis=axis))
+    return np.concatenate((zeros, np.cumsum(values, axis=axis)), axis=axis)
@@ -0,0 +1,189 @@
+"""Run the estimation grids in parallel processes outside of pytask."""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import pathlib
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from nkpc_estimation.analysis.config import (
+    ESTIMATIONS,
+    ESTIMATOR_OPTIONS,
+    SENSITIVITY,
+    path_to_results_store,
+)
+from nkpc_estimation.analysis.features import compute_feature
+from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.results import results_to_store, save_results
+from nkpc_estimation.config import BLD
+from nkpc_estimation.utilities import load_panel
+
+GRIDS = {"estimations": ESTIMATIONS, "sensitivity": SENSITIVITY}
+
+_BLAS_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_WORKER_DATA = {}
+
+
+def run_grid(
+    grid: dict[str, dict[str, str]],
+    data_path: str | os.PathLike,
+    produces: dict[tuple[str, str | None], str | os.PathLike] | None = None,
+    n_workers: int | None = None,
+    blas_threads: int = 1,
+) -> Iterator[tuple[tuple[str, str | None], str | os.PathLike]]:
+    """Fit the models of an estimation grid in parallel processes.
+
+    The grid is split into shards of models that share the model type and sample
+    start date, so that each shard is fitted as one batch. The data set is placed in
+    shared memory once and attached by every worker. The number of BLAS threads of the
+    workers is limited to avoid oversubscription.
+
+    Args:
+        grid (dict): The grid, e.g. :data:`ESTIMATIONS` or :data:`SENSITIVITY`. Each
+            entry has the keys 'model', 'feature_1', 'feature_2', and optionally 'date'.
+        data_path (str or pathlib.Path): Path to the cleaned data set.
+        produces (dict, optional): Paths where the results stores of the shards are
+            saved by model type and date. By default, the paths of the pytask tasks
+            are used.
+        n_workers (int, optional): The number of processes. If None, the number of
+            processors of the machine is used.
+        blas_threads (int): The number of BLAS threads per worker. Defaults to 1.
+
+    Yields:
+        tuple: The model type and date of each shard and the path of its results store
+            as soon as the shard finishes.
+
+    """
+    shards = {}
+    for config in grid.values():
+        key = (config["model"], config.get("date"))
+        shards.setdefault(key, []).append((config["feature_1"], config["feature_2"]))
+    if produces is None:
+        produces = {key: path_to_results_store(*key) for key in shards}
+
+    data = load_panel(data_path)
+    values = data.to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        layout = (shm.name, values.shape, data.index, list(data.columns))
+        with _limit_blas_threads(blas_threads), ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(layout, blas_threads),
+        ) as executor:
+            futures = {
+                executor.submit(_fit_shard, *key, pairs, produces[key]): key
+                for key, pairs in shards.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def main(argv: list[str] | None = None):
+    """Run an estimation grid from the command line.
+
+    Args:
+        argv (list, optional): The command line arguments.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("grid", choices=sorted(GRIDS), help="The grid to run.")
+    parser.add_argument(
+        "--data",
+        default=BLD / "python" / "data" / "data_clean.arrow",
+        help="Path to the cleaned data set.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of processes. Defaults to the number of processors.",
+    )
+    parser.add_argument(
+        "--blas-threads",
+        type=int,
+        default=1,
+        help="The number of BLAS threads per process. Defaults to 1.",
+    )
+    args = parser.parse_args(argv)
+    for (model_type, date), path in run_grid(
+        GRIDS[args.grid],
+        args.data,
+        n_workers=args.workers,
+        blas_threads=args.blas_threads,
+    ):
+        print(f"{model_type} ({date or 'full sample'}): {path}")
+
+
+@contextlib.contextmanager
+def _limit_blas_threads(n_threads):
+    """Set the BLAS thread variables inherited by the spawned workers."""
+    previous = {variable: os.environ.get(variable) for variable in _BLAS_VARIABLES}
+    os.environ.update({variable: str(n_threads) for variable in _BLAS_VARIABLES})
+    try:
+        yield
+    finally:
+        for variable, value in previous.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+
+def _init_worker(layout, blas_threads):
+    """Attach the shared data set and limit the BLAS threads of a worker."""
+    name, shape, index, columns = layout
+    shm = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _WORKER_DATA["shm"] = shm
+    _WORKER_DATA["data"] = pd.DataFrame(
+        values, index=index, columns=columns, copy=False
+    )
+    with contextlib.suppress(ImportError):
+        from threadpoolctl import threadpool_limits
+
+        _WORKER_DATA["limits"] = threadpool_limits(limits=blas_threads)
+
+
+def _fit_shard(model_type, date, pairs, produces):
+    """Fit the models of one shard in a worker and save their results store."""
+    data = _WORKER_DATA["data"]
+    if date is not None:
+        data = data.loc[date:]
+    names_1 = dict.fromkeys(feature_1 for feature_1, _ in pairs)
+    names_2 = dict.fromkeys(feature_2 for _, feature_2 in pairs)
+    models, diagnostics = fit_model(
+        compute_feature(data, "Inflation"),
+        {name: compute_feature(data, name) for name in names_1},
+        {name: compute_feature(data, name) for name in names_2},
+        model_type=model_type,
+        pairs=pairs,
+        return_diagnostics=True,
+        **ESTIMATOR_OPTIONS,
+    )
+    pathlib.Path(produces).parent.mkdir(parents=True, exist_ok=True)
+    save_results(results_to_store(models, model_type, date, diagnostics), produces)
+    return produces
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """Functions for the sensitivity analysis of the regression model."""
 
 
-import chow_test as ct
+import numpy as np
 import pandas as pd
+from scipy import stats
+from scipy.special import logsumexp
+
+from nkpc_estimation.analysis.rolling import rolling_ols
 
 
 def break_point_analysis(
@@ -13,6 +17,10 @@ def break_point_analysis(
 ) -> dict[str, dict[str | pd.Timestamp, float]]:
     """Test for possible breakpoints.
 
+    For each feature, the outcome variable is regressed on a constant and the feature
+    and a Chow test is computed for a break at each date. The first regime ends before
+    the date, the second regime starts at the date.
+
     Args:
         data (pandas.DataFrame): The data set.
         outcome_variable (pandas.Series): The outcome variable of the regression.
@@ -22,17 +30,168 @@ def break_point_analysis(
     Returns:
         dict: A dictionary with p-values of a Chow test.
 
+    Raises:
+        ValueError: If a date leaves too few observations in one of the regimes.
+
     """
+    design = stack_bivariate_designs(feature_variables)
+    chow = chow_statistics(outcome_variable, design)
+    positions = [data.index.get_loc(date) for date in dates]
+    if not np.isin(positions, chow["index"]).all():
+        raise ValueError(
+            "Each regime must contain more observations than regression parameters.",
+        )
+    columns = np.searchsorted(chow["index"], positions)
     pvalues = {}
-    for feature_name, feature_var in feature_variables.items():
-        pvalues[feature_name] = {}
-        for date in dates:
-            chowtest = ct.chow_test(
-                X_series=outcome_variable,
-                y_series=feature_var,
-                last_index=data.index.get_loc(date),
-                first_index=data.index.get_loc(date) + 1,
-                significance=0.05,
-            )
-            pvalues[feature_name][date] = chowtest[1]
+    for i, feature_name in enumerate(feature_variables):
+        pvalues[feature_name] = {
+            date: chow["p_value"][i, column] for date, column in zip(dates, columns)
+        }
     return pvalues
+
+
+def chow_statistics(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    min_nobs: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Compute Chow tests for a break at every admissible date in one pass.
+
+    The sums of squared residuals of all pre-break and post-break samples are obtained
+    from cumulative cross products with :func:`rolling_ols`.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of shape
+            (n_obs,).
+        design (numpy.ndarray): The design matrix of shape (n_obs, n_params) or a batch
+            of design matrices of shape (n_models, n_obs, n_params).
+        min_nobs (int, optional): The minimum number of observations in each regime.
+            Defaults to ``n_params + 1``.
+
+    Returns:
+        dict: The F-statistics and p-values of shape (n_models, n_breaks) and the
+            positions of the first observation of the second regime.
+
+    """
+    design = np.asarray(design, dtype=float)
+    if design.ndim == 2:
+        design = design[None]
+    nobs, k_params = design.shape[1:]
+    if min_nobs is None:
+        min_nobs = k_params + 1
+    before = rolling_ols(outcome_variable, design, "expanding", min_nobs=min_nobs)
+    after = rolling_ols(outcome_variable, design, "backward", min_nobs=min_nobs)
+    pooled_ssr = after["ssr"][:, :1]
+    # Pre-break sample [0, t) pairs with the post-break sample [t, n).
+    ssr_before = before["ssr"][:, : nobs - 2 * min_nobs + 1]
+    ssr_after = after["ssr"][:, min_nobs:]
+    df_denom = nobs - 2 * k_params
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_statistic = ((pooled_ssr - ssr_before - ssr_after) / k_params) / (
+            (ssr_before + ssr_after) / df_denom
+        )
+    return {
+        "f_statistic": f_statistic,
+        "p_value": stats.f.sf(f_statistic, k_params, df_denom),
+        "index": after["index"][min_nobs:],
+    }
+
+
+def break_scan(
+    outcome_variable: pd.Series | np.ndarray,
+    design: np.ndarray,
+    trim: float = 0.15,
+) -> dict[str, np.ndarray]:
+    """Scan all candidate break dates with the sup-, avg-, and exp-Wald statistics.
+
+    The statistics of Andrews (1993) and Andrews and Ploberger (1994) are computed
+    from the Wald statistics ``n_params`` times the Chow F-statistics of all break
+    dates that leave at least a fraction ``trim`` of the sample in each regime. They
+    are on the Wald scale of the published critical values.
+
+    Args:
+        outcome_variable (pandas.Series or numpy.ndarray): The outcome variable of shape
+            (n_obs,).
+        design (numpy.ndarray): The design matrix of shape (n_obs, n_params) or a batch
+            of design matrices of shape (n_models, n_obs, n_params).
+        trim (float): The trimming fraction. Defaults to 0.15.
+
+    Returns:
+        dict: The Chow statistics of the candidate dates and the sup-Wald, the
+            position of the sup-Wald date, avg-Wald, and exp-Wald statistics of each
+            model.
+
+    Raises:
+        ValueError: If the trimming fraction is not in (0, 0.5).
+
+    """
+    if not 0 < trim < 0.5:
+        raise ValueError("trim must be between 0 and 0.5.")
+    design = np.asarray(design, dtype=float)
+    if design.ndim == 2:
+        design = design[None]
+    nobs, k_params = design.shape[1:]
+    min_nobs = max(int(np.ceil(trim * nobs)), k_params + 1)
+    chow = chow_statistics(outcome_variable, design, min_nobs=min_nobs)
+    wald = k_params * chow["f_statistic"]
+    n_breaks = wald.shape[1]
+    return chow | {
+        "sup_wald": wald.max(axis=1),
+        "sup_index": chow["index"][wald.argmax(axis=1)],
+        "avg_wald": wald.mean(axis=1),
+        "exp_wald": logsumexp(wald / 2, axis=1) - np.log(n_breaks),
+    }
+
+
+def break_scan_to_frame(
+    scan: dict[str, np.ndarray],
+    index: pd.Index,
+    names: list[str],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Convert the output of a break scan into tidy DataFrames.
+
+    Args:
+        scan (dict): The output of :func:`break_scan`.
+        index (pandas.Index): The index of the data the scan was computed on.
+        names (list): The names of the models.
+
+    Returns:
+        tuple: The Chow statistics in long format with one row per model and date, and
+            the summary statistics with one row per model.
+
+    """
+    statistics = pd.DataFrame(
+        {
+            "model": np.repeat(names, len(scan["index"])),
+            "date": np.tile(index[scan["index"]], len(names)),
+            "f_statistic": scan["f_statistic"].ravel(),
+            "p_value": scan["p_value"].ravel(),
+        },
+    )
+    summary = pd.DataFrame(
+        {
+            "sup_wald": scan["sup_wald"],
+            "sup_date": index[scan["sup_index"]],
+            "avg_wald": scan["avg_wald"],
+            "exp_wald": scan["exp_wald"],
+        },
+        index=pd.Index(names, name="model"),
+    )
+    return statistics, summary
+
+
+def stack_bivariate_designs(feature_variables: dict[str, pd.Series]) -> np.ndarray:
+    """Stack the design matrices with a constant and one feature each.
+
+    Args:
+        feature_variables (dict): A dictionary of feature variables.
+
+    Returns:
+        numpy.ndarray: The design matrices of shape (n_features, n_obs, 2).
+
+    """
+    features = np.column_stack(
+        [np.asarray(var, dtype=float) for var in feature_variables.values()],
+    )
+    constant = np.ones_like(features)
+    return np.stack((constant, features), axis=-1).transpose(1, 0, 2)
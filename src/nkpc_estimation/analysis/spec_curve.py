@@ -0,0 +1,399 @@
+"""Functions for the specification curve analysis of the regression grid."""
+
+import itertools
+import math
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from nkpc_estimation.analysis.features import (
+    FEATURES,
+    compute_feature,
+    pipeline_feature,
+)
+from nkpc_estimation.analysis.iv import (
+    fit_iv_batch,
+    instrument_projection,
+    lagged_instruments,
+)
+from nkpc_estimation.analysis.ols import (
+    batch_bse,
+    fit_ols_batch,
+    stack_design_matrices,
+)
+from nkpc_estimation.data_management.transformations import derive, derive_family
+
+_PREPROCESSING = ("expectation_lags", "detrend_order")
+_SAMPLE = ("start", "end")
+_ESTIMATION = ("model", "feature_1", "feature_2", "hac_maxlags")
+
+SPEC_DIMENSIONS = _PREPROCESSING + _SAMPLE + _ESTIMATION
+"""tuple: The dimensions of a specification in the order of their enumeration. The
+preprocessing dimensions vary slowest, so consecutive specifications share their
+data."""
+
+_MODEL_TYPES = ("OLS", "IV")
+
+_PREPROCESSED_COLUMNS = ("Backward_Expectations_Inflation", "GDP")
+
+_DETRENDED_FEATURES = tuple(
+    name for name, spec in FEATURES.items() if "GDP" in spec["columns"]
+)
+
+
+def iter_specs(choices: dict[str, list]) -> Iterator[dict]:
+    """Enumerate the Cartesian product of the specification choices lazily.
+
+    Args:
+        choices (dict): The values of each dimension in :data:`SPEC_DIMENSIONS`. A
+            subset of the dimensions is enumerated in the same order.
+
+    Yields:
+        dict: The choice of each dimension of one specification.
+
+    Raises:
+        ValueError: If a dimension is unknown.
+
+    """
+    unknown = set(choices) - set(SPEC_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown specification dimensions {sorted(unknown)}.")
+    dimensions = [name for name in SPEC_DIMENSIONS if name in choices]
+    for values in itertools.product(*(choices[name] for name in dimensions)):
+        yield dict(zip(dimensions, values))
+
+
+def count_specs(choices: dict[str, list]) -> int:
+    """Count the specifications of the choices without enumerating them.
+
+    Args:
+        choices (dict): The values of each dimension in :data:`SPEC_DIMENSIONS`.
+
+    Returns:
+        int: The number of specifications.
+
+    """
+    return math.prod(len(values) for values in choices.values())
+
+
+def preprocess_data(
+    pipeline: dict,
+    expectation_lags: int,
+    detrend_order: int | None,
+    names: list[str] | None = None,
+) -> pd.DataFrame:
+    """Rebuild the derived columns of the cleaned data set for one specification.
+
+    The derived columns are memoized in the pipeline, so they are computed once for all
+    specifications.
+
+    Args:
+        pipeline (dict): The transformation pipeline of the cleaned data set.
+        expectation_lags (int): The number of periods of the backward-looking
+            inflation expectations.
+        detrend_order (int, optional): The order of the polynomial trend removed from
+            GDP. GDP is used in levels if None.
+        names (list, optional): The variables in
+            :data:`nkpc_estimation.analysis.features.FEATURES` computed from the data
+            set. Defaults to keeping all columns.
+
+    Returns:
+        pandas.DataFrame: The columns of the variables, or all columns, with the
+            derived columns replaced.
+
+    """
+    columns = {
+        "Backward_Expectations_Inflation": derive(
+            pipeline,
+            "Inflation",
+            "rolling_mean",
+            expectation_lags,
+        ),
+    }
+    if detrend_order is not None:
+        columns["GDP"] = derive(pipeline, "GDP", "detrend", detrend_order)
+    data = pipeline["data"]
+    kept = (
+        data.columns
+        if names is None
+        else dict.fromkeys(
+            column for name in names for column in FEATURES[name]["columns"]
+        )
+    )
+    return data[[column for column in kept if column not in columns]].assign(**columns)
+
+
+def iter_spec_batches(
+    pipeline: dict,
+    choices: dict[str, list],
+    kernel: str = "bartlett",
+    instrument_lags: int = 1,
+    min_nobs: int = 20,
+) -> Iterator[pd.DataFrame]:
+    """Evaluate the specifications in batches that share their data.
+
+    The derived columns of all preprocessing choices are computed in one sweep per
+    transform, and the data set is sliced once per sample window. All feature pairs of
+    a model type are fitted with one batched regression, and the HAC covariances of all
+    lag lengths are computed from the residuals of that fit.
+
+    Args:
+        pipeline (dict): The transformation pipeline of the cleaned data set.
+        choices (dict): The values of every dimension in :data:`SPEC_DIMENSIONS`.
+        kernel (str): The kernel of the HAC covariances, 'bartlett' or 'uniform'.
+            Defaults to 'bartlett'.
+        instrument_lags (int): The number of lags of the instruments of the IV models.
+            Defaults to 1.
+        min_nobs (int): The minimum number of observations of a sample window. Windows
+            with fewer observations are skipped. Defaults to 20.
+
+    Yields:
+        pandas.DataFrame: The choices, number of observations, and coefficients,
+            standard errors, and p-values of x1 and x2 of the specifications of one
+            sample window, in the order of :func:`iter_specs`.
+
+    Raises:
+        ValueError: If a dimension is missing or a model type is not supported.
+
+    """
+    missing = set(SPEC_DIMENSIONS) - set(choices)
+    if missing:
+        raise ValueError(f"Missing specification dimensions {sorted(missing)}.")
+    unsupported = set(choices["model"]) - set(_MODEL_TYPES)
+    if unsupported:
+        raise ValueError(f"Unsupported model types {sorted(unsupported)}.")
+    names = dict.fromkeys(["Inflation", *choices["feature_1"], *choices["feature_2"]])
+    preprocessed = [
+        name
+        for name in names
+        if set(FEATURES[name]["columns"]) & set(_PREPROCESSED_COLUMNS)
+    ]
+    pairs = list(itertools.product(choices["feature_1"], choices["feature_2"]))
+    lost_nobs = instrument_lags if "IV" in choices["model"] else 0
+    derive_family(pipeline, "Inflation", "rolling_mean", choices["expectation_lags"])
+    derive_family(
+        pipeline,
+        "GDP",
+        "detrend",
+        [order for order in choices["detrend_order"] if order is not None],
+    )
+
+    for preprocessing in iter_specs({name: choices[name] for name in _PREPROCESSING}):
+        transformed = preprocess_data(pipeline, **preprocessing, names=preprocessed)
+        variables = {
+            name: (
+                compute_feature(transformed, name)
+                if name in preprocessed
+                else pipeline_feature(pipeline, name)
+            )
+            for name in names
+        }
+        for window in iter_specs({name: choices[name] for name in _SAMPLE}):
+            sample = {
+                name: variable.loc[window["start"] : window["end"]]
+                for name, variable in variables.items()
+            }
+            if len(sample["Inflation"]) - lost_nobs < min_nobs:
+                continue
+            frames = [
+                _evaluate_model(
+                    model_type,
+                    sample,
+                    pairs,
+                    choices["hac_maxlags"],
+                    kernel,
+                    instrument_lags,
+                )
+                for model_type in choices["model"]
+            ]
+            frame = pd.concat(frames, ignore_index=True)
+            yield frame.assign(**preprocessing, **window)[
+                [*SPEC_DIMENSIONS, *frame.columns.drop(list(_ESTIMATION))]
+            ]
+
+
+def spec_curve(
+    pipeline: dict,
+    choices: dict[str, list],
+    kernel: str = "bartlett",
+    instrument_lags: int = 1,
+    min_nobs: int = 20,
+) -> pd.DataFrame:
+    """Evaluate all specifications of the choices in one table.
+
+    Args:
+        pipeline (dict): The transformation pipeline of the cleaned data set.
+        choices (dict): The values of every dimension in :data:`SPEC_DIMENSIONS`.
+        kernel (str): The kernel of the HAC covariances. Defaults to 'bartlett'.
+        instrument_lags (int): The number of lags of the instruments of the IV models.
+            Defaults to 1.
+        min_nobs (int): The minimum number of observations of a sample window.
+            Defaults to 20.
+
+    Returns:
+        pandas.DataFrame: One row per specification with an index named 'spec'. See
+            :func:`iter_spec_batches` for the columns.
+
+    """
+    batches = iter_spec_batches(pipeline, choices, kernel, instrument_lags, min_nobs)
+    table = pd.concat(batches, ignore_index=True)
+    table.index.name = "spec"
+    return table
+
+
+def rank_specs(
+    table: pd.DataFrame,
+    position: int = 1,
+    by: list[str] | None = None,
+) -> pd.Series:
+    """Rank the specifications by the coefficient of one regressor.
+
+    The ranks order the estimates of the specification curve from the smallest to the
+    largest within each group.
+
+    Args:
+        table (pandas.DataFrame): The output of :func:`spec_curve`.
+        position (int): The regressor, 1 or 2. Defaults to 1.
+        by (list, optional): The columns grouping specifications with comparable
+            coefficients. Defaults to the groups of :func:`comparable_groups`.
+
+    Returns:
+        pandas.Series: The ranks starting at 1.
+
+    """
+    groups = comparable_groups(table, position, by)
+    params = table[f"params_{position}"]
+    ranks = params.groupby(groups, sort=False, dropna=False).rank(method="first")
+    return ranks.astype(int)
+
+
+def spec_curve_summary(
+    table: pd.DataFrame,
+    position: int = 1,
+    significance: float = 0.05,
+    by: list[str] | None = None,
+) -> pd.DataFrame:
+    """Summarize the specification curve of the coefficient of one regressor.
+
+    Args:
+        table (pandas.DataFrame): The output of :func:`spec_curve`.
+        position (int): The regressor, 1 or 2. Defaults to 1.
+        significance (float): The significance level. Defaults to 0.05.
+        by (list, optional): The columns grouping specifications with comparable
+            coefficients. Defaults to the groups of :func:`comparable_groups`.
+
+    Returns:
+        pandas.DataFrame: The number of specifications, the median, minimum, and
+            maximum estimate, the share of positive estimates, and the shares of
+            significant, significantly positive, and significantly negative estimates
+            of each group.
+
+    """
+    groups = comparable_groups(table, position, by)
+    params = table[f"params_{position}"]
+    significant = table[f"pvalues_{position}"] < significance
+    indicators = pd.DataFrame(
+        {
+            "positive": params > 0,
+            "significant": significant,
+            "significant_positive": significant & (params > 0),
+            "significant_negative": significant & (params < 0),
+        },
+    )
+    summary = params.groupby(groups, sort=False, dropna=False).agg(
+        n_specs="size",
+        median="median",
+        min="min",
+        max="max",
+    )
+    shares = indicators.groupby(groups, sort=False, dropna=False).mean()
+    return summary.join(shares.add_prefix("share_"))
+
+
+def comparable_groups(
+    table: pd.DataFrame,
+    position: int = 1,
+    by: list[str] | None = None,
+) -> list[pd.Series]:
+    """Get the keys grouping the specifications with coefficients in the same units.
+
+    The coefficients of GDP in levels and detrended with polynomials of different
+    orders are in different units, so the order of the trend is a key of the features
+    of GDP.
+
+    Args:
+        table (pandas.DataFrame): The output of :func:`spec_curve`.
+        position (int): The regressor, 1 or 2. Defaults to 1.
+        by (list, optional): The columns used as keys instead.
+
+    Returns:
+        list: The feature of the regressor and the order of the trend, which is missing
+            for features not derived from GDP and for GDP in levels.
+
+    """
+    if by is not None:
+        return [table[column] for column in by]
+    feature = table[f"feature_{position}"]
+    detrended = feature.isin(_DETRENDED_FEATURES)
+    return [feature, table["detrend_order"].where(detrended)]
+
+
+def _evaluate_model(model_type, sample, pairs, hac_maxlags, kernel, instrument_lags):
+    """Evaluate the specifications of one model type and sample window."""
+    batch = _fit_batch(model_type, sample, pairs, instrument_lags)
+    bse = np.stack(
+        [
+            batch_bse(batch, "HAC", maxlags=maxlags, kernel=kernel)
+            for maxlags in hac_maxlags
+        ],
+        axis=1,
+    )
+    n_lags = len(hac_maxlags)
+    return pd.DataFrame(
+        {
+            "model": model_type,
+            "feature_1": np.repeat([feature_1 for feature_1, _ in pairs], n_lags),
+            "feature_2": np.repeat([feature_2 for _, feature_2 in pairs], n_lags),
+            "hac_maxlags": np.tile(hac_maxlags, len(pairs)),
+            "nobs": batch["nobs"],
+            **_coefficient_columns(
+                np.repeat(batch["params"], n_lags, axis=0),
+                bse.reshape(-1, bse.shape[2]),
+            ),
+        },
+    )
+
+
+def _fit_batch(model_type, sample, pairs, instrument_lags):
+    """Fit all feature pairs of a sample window with one batched regression."""
+    feature_names_1 = dict.fromkeys(feature_1 for feature_1, _ in pairs)
+    feature_names_2 = dict.fromkeys(feature_2 for _, feature_2 in pairs)
+    outcome_variable = sample["Inflation"]
+    if model_type == "IV":
+        instruments = lagged_instruments(sample, lags=instrument_lags)
+        instruments = instruments.iloc[instrument_lags:]
+        sample = {name: var.iloc[instrument_lags:] for name, var in sample.items()}
+        outcome_variable = sample["Inflation"]
+    _, design = stack_design_matrices(
+        {name: sample[name] for name in feature_names_1},
+        {name: sample[name] for name in feature_names_2},
+        pairs,
+    )
+    if model_type == "IV":
+        return fit_iv_batch(
+            outcome_variable, design, instrument_projection(instruments)
+        )
+    return fit_ols_batch(outcome_variable, design)
+
+
+def _coefficient_columns(params, bse):
+    """Build the columns of the coefficients, standard errors, and p-values."""
+    pvalues = 2 * stats.norm.sf(np.abs(params / bse))
+    columns = {}
+    for position in range(params.shape[1]):
+        columns[f"params_{position + 1}"] = params[:, position]
+        columns[f"bse_{position + 1}"] = bse[:, position]
+        columns[f"pvalues_{position + 1}"] = pvalues[:, position]
+    return columns
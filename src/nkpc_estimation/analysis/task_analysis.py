@@ -1,22 +1,87 @@
 """Tasks running the core analyses."""
 
+import numpy as np
 import pandas as pd
 import pytask
 
 from nkpc_estimation.analysis.config import (
+    _BREAK_POINTS,
+    _DATES,
+    BAYES,
+    BOOTSTRAP,
+    CACHE,
     ESTIMATIONS,
+    ESTIMATOR_OPTIONS,
+    KALMAN,
+    RESULTS,
+    ROLLING,
     SENSITIVITY,
-    path_to_estimation_result,
-    path_to_sensitivity_result,
+    SPEC_CURVE,
+    path_to_bootstrap_result,
+    path_to_posterior_store,
+    path_to_results_store,
+    path_to_rolling_result,
+    path_to_spec_curve,
+    path_to_state_space_store,
+)
+from nkpc_estimation.analysis.bayes import (
+    draw_nig,
+    draws_to_store,
+    gibbs_tvp,
+    nig_posterior,
+    posterior_bands,
+)
+from nkpc_estimation.analysis.bootstrap import bootstrap_ols, bootstrap_summary
+from nkpc_estimation.analysis.cache import (
+    evict_cache,
+    hash_inputs,
+    load_store_from_cache,
+    save_store_to_cache,
+)
+from nkpc_estimation.analysis.features import (
+    get_feature,
+    get_feature_vars,
+    load_data,
+    load_pipeline,
+)
+from nkpc_estimation.analysis.kalman import fit_tvp, tvp_loglike_grid
+from nkpc_estimation.analysis.model import (
+    INSTRUMENTED_MODEL_TYPES,
+    MODEL_OPTIONS,
+    fit_model,
+)
+from nkpc_estimation.analysis.ols import fit_ols_batch, stack_design_matrices
+from nkpc_estimation.analysis.results import (
+    FULL_SAMPLE,
+    concat_stores,
+    load_results,
+    results_to_store,
+    save_results,
+    select_models,
+)
+from nkpc_estimation.analysis.rolling import rolling_ols, rolling_path_to_frame
+from nkpc_estimation.analysis.sensitivity import (
+    break_point_analysis,
+    break_scan,
+    break_scan_to_frame,
+    stack_bivariate_designs,
+)
+from nkpc_estimation.analysis.spec_curve import (
+    count_specs,
+    rank_specs,
+    spec_curve,
+    spec_curve_summary,
 )
-from nkpc_estimation.analysis.model import fit_model
-from nkpc_estimation.analysis.sensitivity import break_point_analysis
 from nkpc_estimation.config import BLD
+from nkpc_estimation.utilities import save_panel
 
 
 def _create_parametrization(estimations):
     """Create parametrization for pytask.
 
+    The estimations are grouped by model type so that each task fits the whole feature
+    grid once and saves the results of the group in one results store.
+
     Args:
         estimations (dict): A dictionary with the configuration to create the parametrization.
 
@@ -25,18 +90,18 @@ def _create_parametrization(estimations):
 
     """
     id_to_kwargs = {}
-    depends_on = BLD / "python" / "data" / "data_clean.csv"
-    for name, config in estimations.items():
-        produces = path_to_estimation_result(
-            config["feature_1"],
-            config["feature_2"],
+    depends_on = BLD / "python" / "data" / "data_clean.arrow"
+    for config in estimations.values():
+        kwargs = id_to_kwargs.setdefault(
             config["model"],
+            {
+                "depends_on": depends_on,
+                "model": config["model"],
+                "pairs": [],
+                "produces": path_to_results_store(config["model"]),
+            },
         )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
+        kwargs["pairs"].append((config["feature_1"], config["feature_2"]))
 
     return id_to_kwargs
 
@@ -46,46 +111,29 @@ _ID_TO_KWARGS = _create_parametrization(ESTIMATIONS)
 for id_, kwargs in _ID_TO_KWARGS.items():
 
     @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_fit_model_python(depends_on, model, produces):
-        """Fit a OLS regression model.
+    def task_fit_model_python(depends_on, model, pairs, produces):
+        """Fit the regression models of one model type.
 
         Args:
             depends_on (dict): Dependencies for the pytask function.
+            model (str): The name of the regression method.
+            pairs (list): The pairs of feature names to fit.
             produces (Path): Path where the outcome is saved.
 
         Returns:
-            Pickle: Saves pickle files in the produces path.
+            npz: Saves the results store in the produces path.
 
         """
-        data = pd.read_csv(depends_on, index_col="TIME")
-        outcome_var = data["Inflation"]
-        feature_vars_1 = {
-            "Unemp": data["Unemployment"],
-            "Unemp_Gap": data["Unemployment"] - data["NAIRU"],
-            "Labor_share": data["Labor_share"],
-            "GDP": data["GDP"],
-        }
-        feature_vars_2 = {
-            "BackExp": data["Backward_Expectations_Inflation"],
-            "MSC": data["MSC"],
-        }
-        model_type = "OLS"
-        models = fit_model(
-            outcome_var,
-            feature_vars_1,
-            feature_vars_2,
-            model_type=model_type,
-        )
-        for model_key, model_value in models.items():
-            feature_name_1, feature_name_2 = model_key.split(", ")
-            model_value.save(
-                f"{produces.parent}/{feature_name_1}_{feature_name_2}_{model_type}.pickle",
-            )
+        _fit_and_save(depends_on, model, pairs, produces)
 
 
 def _create_parametrization_sensitivity(sensitivity):
     """Create parametrization for pytask.
 
+    The sensitivity analyses are grouped by model type so that each task fits the whole
+    feature grid on the samples of all start dates in turn. The iterated GMM fit of
+    each sample starts from the weighting matrices of the previous, longer sample.
+
     Args:
         sensitivity (dict): A dictionary with the configuration to create the parametrization.
 
@@ -94,19 +142,24 @@ def _create_parametrization_sensitivity(sensitivity):
 
     """
     id_to_kwargs = {}
-    depends_on = BLD / "python" / "data" / "data_clean.csv"
-    for name, config in sensitivity.items():
-        produces = path_to_sensitivity_result(
-            config["feature_1"],
-            config["feature_2"],
+    depends_on = BLD / "python" / "data" / "data_clean.arrow"
+    for config in sensitivity.values():
+        kwargs = id_to_kwargs.setdefault(
+            config["model"],
+            {
+                "depends_on": depends_on,
+                "model": config["model"],
+                "pairs": [],
+                "produces": {},
+            },
+        )
+        pair = (config["feature_1"], config["feature_2"])
+        if pair not in kwargs["pairs"]:
+            kwargs["pairs"].append(pair)
+        kwargs["produces"][config["date"]] = path_to_results_store(
             config["model"],
             config["date"],
         )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
 
     return id_to_kwargs
 
@@ -116,67 +169,436 @@ _ID_TO_KWARGS_SENSITIVITY = _create_parametrization_sensitivity(SENSITIVITY)
 for id_, kwargs in _ID_TO_KWARGS_SENSITIVITY.items():
 
     @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_sensitivity_analysis(depends_on, model, produces):
-        """Breakpoint analysis of OLS regression model.
+    def task_sensitivity_analysis(depends_on, model, pairs, produces):
+        """Fit the regression models of one model type on the samples after each date.
 
         Args:
             depends_on (dict): Dependencies for the pytask function.
-            produces (Path): Path where the outcome is saved.
+            model (str): The name of the regression method.
+            pairs (list): The pairs of feature names to fit.
+            produces (dict): Paths where the outcomes are saved by first date.
 
         Returns:
-            Pickle: Saves pickle files in the produces path.
+            npz: Saves the results store of each sample in the produces paths.
 
         """
-        data = pd.read_csv(depends_on, index_col="TIME")
-        outcome_var = data["Inflation"]
-        feature_vars_1 = {
-            "Unemp": data["Unemployment"],
-            "Unemp_Gap": data["Unemployment"] - data["NAIRU"],
-            "Labor_share": data["Labor_share"],
-            "GDP": data["GDP"],
+        weights = None
+        for date in sorted(produces):
+            weights = _fit_and_save(
+                depends_on,
+                model,
+                pairs,
+                produces[date],
+                start=date,
+                weights=weights,
+            )
+
+
+@pytask.mark.depends_on(
+    [
+        *(kwargs["produces"] for kwargs in _ID_TO_KWARGS.values()),
+        *(
+            path
+            for kwargs in _ID_TO_KWARGS_SENSITIVITY.values()
+            for path in kwargs["produces"].values()
+        ),
+    ],
+)
+@pytask.mark.produces(RESULTS)
+def task_consolidate_results(depends_on, produces):
+    """Combine the results stores of all estimation tasks into one store.
+
+    Args:
+        depends_on (dict): Dependencies for the pytask function.
+        produces (Path): Path where the outcome is saved.
+
+    Returns:
+        npz: Saves the consolidated results store in the produces path.
+
+    """
+    stores = [load_results(path) for path in depends_on.values()]
+    save_results(concat_stores(stores), produces)
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(
+    {
+        "break_points": BLD / "python" / "models" / "break_points.csv",
+        "break_scan": BLD / "python" / "models" / "break_scan.csv",
+        "break_scan_summary": BLD / "python" / "models" / "break_scan_summary.csv",
+    },
+)
+def task_break_point_analysis(depends_on, produces):
+    """Test for breakpoints in the relation of inflation and each feature variable.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (dict): Paths where the outcomes are saved.
+
+    Returns:
+        csv: Saves the p-values of the Chow tests at the break point dates, the Chow
+            statistics of all candidate dates, and the sup-F, avg-F, and exp-F
+            statistics as csv files.
+
+    """
+    data = load_data(depends_on)
+    outcome_var = get_feature("Inflation", depends_on)
+    feature_vars_1, feature_vars_2 = get_feature_vars(depends_on)
+    feature_vars = feature_vars_1 | feature_vars_2
+    pvalues = break_point_analysis(
+        data,
+        outcome_var,
+        feature_vars,
+        _BREAK_POINTS,
+    )
+    pd.DataFrame(pvalues).to_csv(produces["break_points"], index_label="date")
+
+    design = stack_bivariate_designs(feature_vars)
+    scan = break_scan(outcome_var, design, trim=0.15)
+    statistics, summary = break_scan_to_frame(scan, data.index, list(feature_vars))
+    statistics.to_csv(produces["break_scan"], index=False)
+    summary.to_csv(produces["break_scan_summary"])
+
+
+def _create_parametrization_rolling(rolling):
+    """Create parametrization for pytask.
+
+    Args:
+        rolling (dict): A dictionary with the window types and their options.
+
+    Returns:
+        dict: A dictionary with the dependencies, window, and information where the output is saved.
+
+    """
+    id_to_kwargs = {}
+    depends_on = BLD / "python" / "data" / "data_clean.arrow"
+    for method, options in rolling.items():
+        produces = {
+            f"{config['feature_1']}_{config['feature_2']}": path_to_rolling_result(
+                config["feature_1"],
+                config["feature_2"],
+                "OLS",
+                method,
+            )
+            for config in ESTIMATIONS.values()
+            if config["model"] == "OLS"
         }
-        feature_vars_2 = {
-            "BackExp": data["Backward_Expectations_Inflation"],
-            "MSC": data["MSC"],
+        id_to_kwargs[method] = {
+            "depends_on": depends_on,
+            "method": method,
+            "options": options,
+            "produces": produces,
         }
 
-        break_points = ["1984-10-01", "2007-07-01", "2013-01-01", "2020-04-01"]
-        model_type = "OLS"
-        combined_dict = feature_vars_1 | feature_vars_2
-
-        break_point_analysis(data, outcome_var, combined_dict, break_points)
-
-        dates_ols = [
-            "1961-04-01",
-            "1984-10-01",
-            "2007-07-01",
-            "2013-01-01",
-            "2020-04-01",
-        ]
-
-        for date in dates_ols:
-            data_break_point = data[data.index >= date]
-            outcome_var = data_break_point["Inflation"]
-            feature_vars_1 = {
-                "Unemp": data_break_point["Unemployment"],
-                "Unemp_Gap": data_break_point["Unemployment"]
-                - data_break_point["NAIRU"],
-                "Labor_share": data_break_point["Labor_share"],
-                "GDP": data_break_point["GDP"],
-            }
-            feature_vars_2 = {
-                "BackExp": data_break_point["Backward_Expectations_Inflation"],
-                "MSC": data_break_point["MSC"],
-            }
-
-            models = fit_model(
-                outcome_var,
-                feature_vars_1,
-                feature_vars_2,
-                model_type=model_type,
-            )
-            for model_key, model_value in models.items():
-                feature_name_1, feature_name_2 = model_key.split(", ")
-                model_value.save(
-                    f"{produces.parent}/{feature_name_1}_{feature_name_2}_{model_type}_sensitivity_{date}.pickle",
+    return id_to_kwargs
+
+
+_ID_TO_KWARGS_ROLLING = _create_parametrization_rolling(ROLLING)
+
+for id_, kwargs in _ID_TO_KWARGS_ROLLING.items():
+
+    @pytask.mark.task(id=id_, kwargs=kwargs)
+    def task_rolling_estimation(depends_on, method, options, produces):
+        """Estimate the OLS regression models on rolling or recursive windows.
+
+        Args:
+            depends_on (Path): Dependencies for the pytask function.
+            method (str): The type of window.
+            options (dict): The options of the window.
+            produces (dict): Paths where the outcomes are saved.
+
+        Returns:
+            csv: Saves the coefficient and standard error paths as csv files.
+
+        """
+        outcome_var = get_feature("Inflation", depends_on)
+        feature_vars_1, feature_vars_2 = get_feature_vars(depends_on)
+        pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+        path = rolling_ols(outcome_var, design, method=method, **options)
+        for i, (feature_name_1, feature_name_2) in enumerate(pairs):
+            name = f"{feature_name_1}_{feature_name_2}"
+            if name in produces:
+                frame = rolling_path_to_frame(
+                    path,
+                    outcome_var.index,
+                    [feature_name_1, feature_name_2],
+                    model=i,
                 )
+                frame.to_csv(produces[name])
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(path_to_bootstrap_result("OLS"))
+def task_bootstrap_python(depends_on, produces):
+    """Compute block bootstrap inference for the OLS regression models.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (Path): Path where the outcome is saved.
+
+    Returns:
+        csv: Saves the bootstrap standard errors and percentile intervals as a csv file.
+
+    """
+    outcome_var = get_feature("Inflation", depends_on)
+    feature_vars_1, feature_vars_2 = get_feature_vars(depends_on)
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    batch = fit_ols_batch(outcome_var, design)
+    draws = bootstrap_ols(outcome_var, design, **BOOTSTRAP)
+    summary = bootstrap_summary(draws)
+    index = pd.MultiIndex.from_tuples(
+        [
+            (feature_name_1, feature_name_2, param_name)
+            for feature_name_1, feature_name_2 in pairs
+            for param_name in (feature_name_1, feature_name_2)
+        ],
+        names=["feature_1", "feature_2", "param"],
+    )
+    results = pd.DataFrame(
+        {
+            "params": batch["params"].ravel(),
+            "bse": summary["bse"].ravel(),
+            "ci_lower": summary["ci_lower"].ravel(),
+            "ci_upper": summary["ci_upper"].ravel(),
+        },
+        index=index,
+    )
+    results.to_csv(produces)
+
+
+_BAND_PROBABILITIES = (0.05, 0.5, 0.95)
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(
+    {
+        FULL_SAMPLE: path_to_posterior_store("Bayes"),
+        **{date: path_to_posterior_store("Bayes", date) for date in _DATES},
+    },
+)
+def task_posterior_draws(depends_on, produces):
+    """Draw from the conjugate posteriors of the models of each sample window.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (dict): Paths where the outcomes are saved by sample window.
+
+    Returns:
+        npz: Saves the float32 posterior draws of each sample window.
+
+    """
+    options = {name: value for name, value in BAYES.items() if name != "tvp"}
+    for date, path in produces.items():
+        start = None if date == FULL_SAMPLE else date
+        outcome_var = get_feature("Inflation", depends_on, start)
+        feature_vars_1, feature_vars_2 = get_feature_vars(depends_on, start)
+        pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+        posterior = nig_posterior(outcome_var, design, ESTIMATOR_OPTIONS["prior"])
+        draws = draw_nig(posterior, **options)
+        save_results(draws_to_store(draws, pairs, "Bayes", start), path)
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(path_to_posterior_store("Bayes_TVP"))
+def task_tvp_posterior(depends_on, produces):
+    """Sample the posteriors of the models with random walk coefficients.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (Path): Path where the outcome is saved.
+
+    Returns:
+        npz: Saves the posterior bands of the coefficient paths and the float32 draws
+            of the variances.
+
+    """
+    outcome_var = get_feature("Inflation", depends_on)
+    feature_vars_1, feature_vars_2 = get_feature_vars(depends_on)
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    draws = gibbs_tvp(
+        outcome_var,
+        design,
+        prior=ESTIMATOR_OPTIONS["prior"],
+        n_chains=BAYES["n_chains"],
+        seed=BAYES["seed"],
+        n_workers=BAYES["n_workers"],
+        **BAYES["tvp"],
+    )
+    store = draws_to_store(
+        {
+            "path_bands": posterior_bands(draws["paths"], _BAND_PROBABILITIES),
+            "sigma2": draws["sigma2"],
+            "q": draws["q"],
+        },
+        pairs,
+        "Bayes_TVP",
+    )
+    store["band_probabilities"] = np.array(_BAND_PROBABILITIES)
+    store["time"] = np.array(outcome_var.index.strftime("%Y-%m-%d"), dtype=str)
+    save_results(store, produces)
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(path_to_state_space_store("TVP"))
+def task_tvp_kalman(depends_on, produces):
+    """Estimate the models with random walk coefficients by maximum likelihood.
+
+    Besides the estimates and smoothed coefficient paths, the log-likelihood is
+    evaluated on a grid of state variances around the estimates, shifting the log
+    variances of all coefficients jointly.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (Path): Path where the outcome is saved.
+
+    Returns:
+        npz: Saves the estimates, smoothed paths, and log-likelihood grid.
+
+    """
+    outcome_var = get_feature("Inflation", depends_on)
+    feature_vars_1, feature_vars_2 = get_feature_vars(depends_on)
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    fitted = fit_tvp(
+        outcome_var,
+        design,
+        initial_variance=KALMAN["initial_variance"],
+        max_iter=KALMAN["max_iter"],
+    )
+    offsets = np.linspace(
+        -KALMAN["grid"]["width"],
+        KALMAN["grid"]["width"],
+        KALMAN["grid"]["n_points"],
+    )
+    shifts = np.zeros((len(offsets), design.shape[2] + 1))
+    shifts[:, 1:] = offsets[:, None]
+    store = {
+        "feature_1": np.array([feature_1 for feature_1, _ in pairs]),
+        "feature_2": np.array([feature_2 for _, feature_2 in pairs]),
+        "model": np.full(len(pairs), "TVP"),
+        "date": np.full(len(pairs), FULL_SAMPLE),
+        "log_variances": fitted["log_variances"],
+        "loglike": fitted["loglike"],
+        "smoothed_mean": fitted["smoothed_mean"],
+        "smoothed_se": np.sqrt(
+            np.diagonal(fitted["smoothed_cov"], axis1=2, axis2=3),
+        ),
+        "time": np.array(outcome_var.index.strftime("%Y-%m-%d"), dtype=str),
+        "grid_offsets": offsets,
+        "grid_loglike": tvp_loglike_grid(
+            outcome_var,
+            design,
+            fitted["log_variances"][:, None] + shifts,
+            initial_variance=KALMAN["initial_variance"],
+        ),
+    }
+    save_results(store, produces)
+
+
+@pytask.mark.depends_on(BLD / "python" / "data" / "data_clean.arrow")
+@pytask.mark.produces(
+    {
+        "table": path_to_spec_curve("table"),
+        "summary": path_to_spec_curve("summary"),
+    },
+)
+def task_spec_curve(depends_on, produces):
+    """Estimate the specification curve of the choices in one task.
+
+    Args:
+        depends_on (Path): Dependencies for the pytask function.
+        produces (dict): Paths where the outcomes are saved.
+
+    Returns:
+        arrow, csv: Saves the table of all specifications with the ranks of the
+            coefficients as an Arrow file and the summaries of the coefficients of x1
+            and x2 by feature and, for GDP, the order of the trend as a csv file.
+
+    """
+    choices = SPEC_CURVE["choices"]
+    table = spec_curve(
+        load_pipeline(depends_on),
+        choices,
+        kernel=SPEC_CURVE["kernel"],
+        instrument_lags=SPEC_CURVE["instrument_lags"],
+        min_nobs=SPEC_CURVE["min_nobs"],
+    )
+    print(f"Evaluated {len(table)} of {count_specs(choices)} specifications.")
+    summaries = {}
+    for position in (1, 2):
+        table[f"rank_{position}"] = rank_specs(table, position)
+        summary = spec_curve_summary(table, position, SPEC_CURVE["significance"])
+        summaries[f"x{position}"] = summary.rename_axis(["feature", "detrend_order"])
+    save_panel(table, produces["table"])
+    pd.concat(summaries, names=["param"]).to_csv(produces["summary"])
+
+
+def _fit_and_save(depends_on, model_type, pairs, produces, start=None, weights=None):
+    """Fit the regression models of the feature grid and save them in a results store.
+
+    Each model is looked up in a content-addressed cache first. Its key only covers
+    the columns the model depends on and the options its model type uses, so only the
+    models whose inputs changed are refitted. The store is assembled from the cached
+    and refitted models. The cache keys do not cover the initial GMM weighting
+    matrices, because the converged estimates do not depend on them.
+
+    Args:
+        depends_on (Path): Path to the cleaned data set.
+        model_type (str): The name of the regression method.
+        pairs (list): The pairs of feature names to fit.
+        produces (Path): Path where the results store is saved.
+        start (str, optional): The first date of the sample.
+        weights (dict, optional): The initial GMM weighting matrices by model name.
+
+    Returns:
+        dict: The final GMM weighting matrices of the refitted models by model name.
+
+    """
+    outcome_var = get_feature("Inflation", depends_on, start)
+    feature_vars_1, feature_vars_2 = get_feature_vars(depends_on, start)
+    options = {name: ESTIMATOR_OPTIONS[name] for name in MODEL_OPTIONS[model_type]}
+    instruments = (
+        [*feature_vars_1.values(), *feature_vars_2.values()]
+        if model_type in INSTRUMENTED_MODEL_TYPES
+        else []
+    )
+    keys = {
+        (feature_name_1, feature_name_2): hash_inputs(
+            outcome_var,
+            feature_vars_1[feature_name_1],
+            feature_vars_2[feature_name_2],
+            *instruments,
+            model_type=model_type,
+            pair=[feature_name_1, feature_name_2],
+            date=start,
+            **options,
+        )
+        for feature_name_1, feature_name_2 in pairs
+    }
+    stores = {
+        pair: load_store_from_cache(CACHE["directory"], key)
+        for pair, key in keys.items()
+    }
+    missing = [pair for pair, store in stores.items() if store is None]
+    if missing:
+        models, diagnostics = fit_model(
+            outcome_var,
+            feature_vars_1,
+            feature_vars_2,
+            model_type=model_type,
+            pairs=missing,
+            weights=weights,
+            return_diagnostics=True,
+            **options,
+        )
+        store = results_to_store(models, model_type, start, diagnostics)
+        weights = {
+            name: value["weights"]
+            for name, value in diagnostics.items()
+            if "weights" in value
+        }
+        for position, pair in enumerate(missing):
+            stores[pair] = select_models(store, [position])
+            save_store_to_cache(CACHE["directory"], keys[pair], stores[pair])
+    save_results(concat_stores([stores[pair] for pair in pairs]), produces)
+    evict_cache(CACHE["directory"], CACHE["max_bytes"])
+    return weights if missing else {}
@@ -1,23 +1,46 @@
 """Functions for cleaning the data sets."""
 
+import csv
+import fnmatch
+import io
 import os
 import pathlib
+import re
 import zipfile
-from functools import reduce
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import IO
 
 import numpy as np
 import pandas as pd
 
+from nkpc_estimation.data_management.transformations import (
+    growth_rates,
+    polynomial_detrend,
+    rolling_means,
+)
+
 
 def load_data_files(
     data_files: dict[str, str | pathlib.PosixPath],
-    dest_dir: str | None = None,
+    member_pattern: str | dict[str, str] = "*.csv",
+    usecols: list[str] | Callable[[str], bool] | None = None,
+    max_workers: int | None = None,
 ) -> dict[str, pd.DataFrame]:
     """Load data sets from csv and zip files.
 
+    Members of zip archives are streamed into the csv parser without extracting them to
+    disk. All files and archive members are read concurrently on a thread pool. If
+    several members of an archive match the pattern, their rows are concatenated.
+
     Args:
         data_files (Dict[str, Union[str, pathlib.PosixPath]]): A dictionary with file names and paths.
-        dest_dir (str, optional): The directory where zip files are extracted. Defaults to None.
+        member_pattern (str or dict, optional): The glob pattern of the zip archive members
+            to read, or a dictionary with a pattern per file name. Defaults to "*.csv".
+        usecols (list or callable, optional): The columns to parse. Defaults to all columns.
+        max_workers (int, optional): The number of threads. Defaults to the default of
+            concurrent.futures.ThreadPoolExecutor.
 
     Raises:
         ValueError: If the input is not of the expected format.
@@ -30,49 +53,94 @@ def load_data_files(
     if not isinstance(data_files, dict):
         raise ValueError("data_files must be a dictionary.")
 
-    dataframes = {}
-    for file_name, file_path in data_files.items():
-        if not isinstance(file_name, str) or not isinstance(
-            file_path,
-            str | pathlib.PosixPath,
-        ):
-            raise ValueError(
-                "File names and paths must be strings or pathlib.PosixPath objects.",
-            )
+    futures = {}
+    with ExitStack() as stack, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_name, file_path in data_files.items():
+            if not isinstance(file_name, str) or not isinstance(
+                file_path,
+                str | pathlib.PosixPath,
+            ):
+                raise ValueError(
+                    "File names and paths must be strings or pathlib.PosixPath objects.",
+                )
 
-        file_path_str = str(file_path)
-        if not os.path.isfile(file_path_str):
-            raise FileNotFoundError(f"File not found: {file_path_str}")
-
-        file_extension = os.path.splitext(file_path_str)[1]
-        if file_extension == ".csv":
-            df = read_csv_file(file_path_str)
-            dataframes[file_name] = df
-        elif file_extension == ".zip":
-            if dest_dir is None:
-                raise ValueError("dest_dir must be specified when reading a zip file.")
-
-            with zipfile.ZipFile(file_path_str, "r") as zip_ref:
-                file_list = zip_ref.namelist()
-                if "Quarterly_Feb2023.csv" not in file_list:
+            file_path_str = str(file_path)
+            if not os.path.isfile(file_path_str):
+                raise FileNotFoundError(f"File not found: {file_path_str}")
+
+            file_extension = os.path.splitext(file_path_str)[1]
+            if file_extension == ".csv":
+                futures[file_name] = [
+                    executor.submit(read_csv_file, file_path_str, usecols=usecols),
+                ]
+            elif file_extension == ".zip":
+                zip_ref = stack.enter_context(zipfile.ZipFile(file_path_str, "r"))
+                if isinstance(member_pattern, dict):
+                    pattern = member_pattern.get(file_name, "*.csv")
+                else:
+                    pattern = member_pattern
+                members = fnmatch.filter(zip_ref.namelist(), pattern)
+                if not members:
                     raise ValueError("File not found in zip archive.")
-                inner_file_path = os.path.join(dest_dir, "Quarterly_Feb2023.csv")
-                zip_ref.extract("Quarterly_Feb2023.csv", dest_dir)
-                df = read_csv_file(inner_file_path)
-                dataframes[file_name] = df
-        else:
-            raise ValueError(
-                "Unsupported file format: Only .csv and .zip files are supported.",
+                futures[file_name] = [
+                    executor.submit(_read_zip_member, zip_ref, member, usecols)
+                    for member in members
+                ]
+            else:
+                raise ValueError(
+                    "Unsupported file format: Only .csv and .zip files are supported.",
+                )
+
+        dataframes = {}
+        for file_name, file_futures in futures.items():
+            dfs = [future.result() for future in file_futures]
+            dataframes[file_name] = (
+                dfs[0] if len(dfs) == 1 else pd.concat(dfs, ignore_index=True)
             )
 
     return dataframes
 
 
-def read_csv_file(file_path: str) -> pd.DataFrame:
+def _read_zip_member(
+    zip_ref: zipfile.ZipFile,
+    member: str,
+    usecols: list[str] | Callable[[str], bool] | None = None,
+) -> pd.DataFrame:
+    """Read a csv file from an open zip archive without extracting it.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open zip archive.
+        member (str): The name of the csv file in the archive.
+        usecols (list or callable, optional): The columns to parse. Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: The loaded DataFrame.
+
+    """
+    with zip_ref.open(member) as stream:
+        return read_csv_file(stream, usecols=usecols)
+
+
+def read_csv_file(
+    file_path: str | pathlib.PosixPath | IO[bytes],
+    usecols: list[str] | Callable[[str], bool] | None = None,
+    nrows: int | None = None,
+    dtype: dict[str, type] | None = None,
+) -> pd.DataFrame:
     """Read a csv file into a pandas DataFrame.
 
+    The file is read once. Preamble lines above the header are skipped by locating the
+    first line with more than one field in the raw bytes, and only the body below the
+    header is parsed.
+
     Args:
-        file_path (str): The path to the csv file.
+        file_path (str, pathlib.PosixPath or file-like): The path to the csv file or a
+            binary stream of it.
+        usecols (list or callable, optional): The columns to parse. Defaults to all
+            columns.
+        nrows (int, optional): The number of rows to parse. Defaults to all rows.
+        dtype (dict, optional): The data types of the columns. Defaults to inferring
+            them.
 
     Raises:
         ValueError: If the csv file cannot be read.
@@ -81,19 +149,45 @@ def read_csv_file(file_path: str) -> pd.DataFrame:
         pd.DataFrame: The loaded DataFrame.
 
     """
-    header_num = 0
-    while True:
-        try:
-            df = pd.read_csv(file_path, header=header_num)
-            if df.shape[1] == 1:
-                header_num += 1
-            else:
-                break
-        except Exception as e:
-            raise ValueError(f"Error reading csv file {file_path}: {str(e)}") from e
+    try:
+        if hasattr(file_path, "read"):
+            raw = file_path.read()
+        else:
+            with open(file_path, "rb") as stream:
+                raw = stream.read()
+        body = io.BytesIO(raw)
+        body.seek(_find_header_offset(raw))
+        df = pd.read_csv(body, usecols=usecols, nrows=nrows, dtype=dtype)
+    except Exception as e:
+        name = getattr(file_path, "name", file_path)
+        raise ValueError(f"Error reading csv file {name}: {str(e)}") from e
     return df
 
 
+def _find_header_offset(raw: bytes) -> int:
+    """Find the position of the first line with more than one field.
+
+    Args:
+        raw (bytes): The content of a csv file.
+
+    Returns:
+        int: The byte offset of the header line.
+
+    Raises:
+        ValueError: If no line has more than one field.
+
+    """
+    offset = 0
+    while offset < len(raw):
+        end = raw.find(b"\n", offset)
+        end = len(raw) if end == -1 else end + 1
+        line = raw[offset:end].decode("utf-8", errors="replace")
+        if len(next(csv.reader([line]), [])) > 1:
+            return offset
+        offset = end
+    raise ValueError("No header line with more than one column found.")
+
+
 def clean_data(
     data: dict[str, pd.DataFrame],
     data_info: dict[str, any],
@@ -106,6 +200,8 @@ def clean_data(
         data_info: Information on data set stored in data_info.yaml. The following keys can be accessed:
             - 'variables_to_keep': Names of columns that are kept in data cleaning step
             - 'dates_to_keep': Names of date columns to be kept
+            - 'date_formats' (optional): Format of the date column per data set, one of
+              'iso' or 'quarterly'. The format is inferred if it is not specified.
             - 'column_rename_mapping': Old and new names of columns to be renamed, stored in a dictionary with design: {'old_name': 'new_name'}
 
     Returns:
@@ -114,6 +210,7 @@ def clean_data(
     """
     combined_cols = data_info["variables_to_keep"].copy()
     combined_cols.extend(data_info["dates_to_keep"])
+    date_formats = data_info.get("date_formats", {})
 
     df_dict = {
         df_name: df[df.columns.intersection(combined_cols)]
@@ -124,15 +221,20 @@ def clean_data(
         rename_dict = {col: key for col in data_info["variables_to_keep"]}
         df_dict[key] = _value.rename(columns=rename_dict)
         for date_col in data_info["dates_to_keep"]:
-            if (date_col in _value.columns) and date_col in ("DATE", "date"):
-                df_dict[key]["TIME"] = df_dict[key].pop(date_col).apply(pd.to_datetime)
-            elif (date_col in _value.columns) and date_col == "TIME":
-                df_dict[key]["TIME"] = pd.to_datetime(df_dict[key][date_col])
+            if (date_col in _value.columns) and date_col in ("DATE", "date", "TIME"):
+                date_format = date_formats.get(key) or _cached_date_format(
+                    key,
+                    date_col,
+                    df_dict[key][date_col],
+                )
+                df_dict[key]["TIME"] = normalize_dates(
+                    df_dict[key].pop(date_col),
+                    date_format,
+                )
             elif date_col == "Quarter" and (date_col in _value.columns):
-                df_dict[key]["TIME"] = pd.to_datetime(
-                    df_dict[key]["Year"].astype(str)
-                    + "Q"
-                    + df_dict[key]["Quarter"].astype(str),
+                df_dict[key]["TIME"] = quarter_start_dates(
+                    df_dict[key]["Year"],
+                    df_dict[key]["Quarter"],
                 )
                 df_dict[key] = df_dict[key].drop(["Year", "Quarter"], axis=1)
         if key in ("GDP", "Labor_share"):
@@ -140,6 +242,106 @@ def clean_data(
     return df_dict
 
 
+def infer_date_format(dates: pd.Series) -> str:
+    """Infer the format of a date column from its first non-missing value.
+
+    Args:
+        dates (pandas.Series): The dates as strings.
+
+    Returns:
+        str: 'iso' for dates like '1960-01-01' or 'quarterly' for dates like '1960-Q1',
+            '1960Q1', or '1960q1'.
+
+    Raises:
+        ValueError: If the format is not supported.
+
+    """
+    first = dates.dropna()
+    sample = str(first.iloc[0]).strip() if len(first) else ""
+    for date_format, pattern in _DATE_PATTERNS.items():
+        if pattern.fullmatch(sample):
+            return date_format
+    raise ValueError(f"Unsupported date format: {sample!r}.")
+
+
+def normalize_dates(dates: pd.Series, date_format: str) -> pd.Series:
+    """Convert a date column to timestamps with one vectorized parse.
+
+    Args:
+        dates (pandas.Series): The dates as strings.
+        date_format (str): The format of the dates, 'iso' or 'quarterly'.
+
+    Returns:
+        pandas.Series: The dates as timestamps. Quarterly dates are mapped to the first
+            day of the quarter.
+
+    Raises:
+        ValueError: If the format is not supported.
+
+    """
+    if date_format == "iso":
+        return pd.to_datetime(dates, format="%Y-%m-%d")
+    if date_format == "quarterly":
+        strings = dates.astype(str).str.strip()
+        year = pd.to_numeric(strings.str[:4], errors="coerce")
+        quarter = pd.to_numeric(strings.str[-1], errors="coerce")
+        return quarter_start_dates(year, quarter)
+    raise ValueError(f"Unsupported date format: {date_format!r}.")
+
+
+def quarter_start_dates(
+    year: pd.Series | np.ndarray,
+    quarter: pd.Series | np.ndarray,
+) -> pd.Series:
+    """Compute the first day of each quarter with integer arithmetic.
+
+    Args:
+        year (pandas.Series or numpy.ndarray): The years.
+        quarter (pandas.Series or numpy.ndarray): The quarters from 1 to 4.
+
+    Returns:
+        pandas.Series: The timestamps. Missing years or quarters result in NaT.
+
+    """
+    index = year.index if isinstance(year, pd.Series) else None
+    months = (np.asarray(year, dtype=float) - 1970) * 12
+    months += (np.asarray(quarter, dtype=float) - 1) * 3
+    valid = np.isfinite(months)
+    timestamps = np.full(months.shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+    timestamps[valid] = months[valid].astype(np.int64).astype("datetime64[M]")
+    return pd.Series(timestamps, index=index)
+
+
+_DATE_PATTERNS = {
+    "iso": re.compile(r"\d{4}-\d{2}-\d{2}"),
+    "quarterly": re.compile(r"\d{4}-?[Qq][1-4]"),
+}
+
+_DATE_FORMAT_CACHE: dict[tuple[str, str], str] = {}
+
+
+def _cached_date_format(key: str, date_col: str, dates: pd.Series) -> str:
+    """Infer the date format of a data set once and reuse it while it still matches.
+
+    Args:
+        key (str): The name of the data set.
+        date_col (str): The name of the date column.
+        dates (pandas.Series): The dates as strings.
+
+    Returns:
+        str: The date format.
+
+    """
+    date_format = _DATE_FORMAT_CACHE.get((key, date_col))
+    first = dates.dropna()
+    if date_format is None or not (
+        len(first) and _DATE_PATTERNS[date_format].fullmatch(str(first.iloc[0]).strip())
+    ):
+        date_format = infer_date_format(dates)
+        _DATE_FORMAT_CACHE[key, date_col] = date_format
+    return date_format
+
+
 def merge_data(
     data: dict[str, pd.DataFrame],
     index: str,
@@ -147,6 +349,11 @@ def merge_data(
 ) -> pd.DataFrame:
     """Merge data sets.
 
+    The date window is applied to each data set before the data sets are aligned on
+    their common sorted index in a single concatenation. The data sets that determine
+    the first and last date of the merged sample are stored in
+    ``df.attrs["truncated_by"]``.
+
     Args:
         data (Dict[str, pd.DataFrame]): A dictionary containing the dataframes to be merged.
         index (str): The column to use as the merge key.
@@ -158,6 +365,7 @@ def merge_data(
 
     Raises:
         ValueError: If the input arguments are not of the expected type.
+        KeyError: If the index column is missing in one of the data sets.
 
     """
     # Validate input arguments
@@ -168,10 +376,17 @@ def merge_data(
     if not isinstance(end_date, str):
         raise ValueError("end_date must be a string.")
 
-    dataframes = list(data.values())
-    df = reduce(lambda left, right: pd.merge(left, right, on=index), dataframes)
-    df = df.set_index(index)
-    df = df[df.index <= end_date]
+    windowed = {}
+    for name, df in data.items():
+        df = df.set_index(index)
+        windowed[name] = df[df.index <= end_date]
+
+    df = pd.concat(windowed.values(), axis=1, join="inner", copy=False).sort_index()
+    truncated_by = {
+        "start": max(windowed, key=lambda name: windowed[name].index.min()),
+        "end": min(windowed, key=lambda name: windowed[name].index.max()),
+    }
+    df.attrs["truncated_by"] = truncated_by
     return df
 
 
@@ -192,7 +407,7 @@ def calculate_growth_rates(data: pd.DataFrame, variable: str) -> pd.DataFrame:
     if variable not in data.columns:
         raise ValueError(f"Variable '{variable}' not found in the input dataframe.")
 
-    growthRate = data[variable].pct_change(periods=1) * 100
+    growthRate = growth_rates(data[variable], horizons=[1])[:, 0]
     data[f"{variable}_growth_rate"] = growthRate
     data = data.dropna(axis=0)
     return data
@@ -222,10 +437,7 @@ def calculate_detrend(
     if len(data) < 2:
         raise ValueError("Input data must have at least two data points")
 
-    trend = np.arange(len(data[variable]))
-    coeffs = np.polyfit(trend, data[variable], order)
-    trend = np.polyval(coeffs, trend)
-    detrended = data[variable] - trend
+    detrended = polynomial_detrend(data[variable], orders=[order])[:, 0]
 
     if detrended_column is None:
         detrended_column = f"{variable}_detrended"
@@ -250,6 +462,6 @@ def calculate_backward_expectations(
         pd.DataFrame: The input data with a new column containing the backward-looking average.
 
     """
-    expectations = data[variable].rolling(window=lag_period, min_periods=1).mean()
+    expectations = rolling_means(data[variable], windows=[lag_period])[:, 0]
     data[f"Backward_Expectations_{variable}"] = expectations
     return data.dropna(axis=0)
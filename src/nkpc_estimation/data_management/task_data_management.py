@@ -11,7 +11,7 @@ from nkpc_estimation.data_management.clean_data import (
     load_data_files,
     merge_data,
 )
-from nkpc_estimation.utilities import read_yaml
+from nkpc_estimation.utilities import read_yaml, save_panel
 
 
 @pytask.mark.depends_on(
@@ -28,12 +28,7 @@ from nkpc_estimation.utilities import read_yaml
         },
     },
 )
-@pytask.mark.produces(
-    {
-        "clean_data": BLD / "python" / "data" / "data_clean.csv",
-        "unzipped_path": BLD / "python" / "data",
-    },
-)
+@pytask.mark.produces({"clean_data": BLD / "python" / "data" / "data_clean.arrow"})
 def task_clean_data_python(depends_on, produces):
     """Clean the data.
 
@@ -42,18 +37,25 @@ def task_clean_data_python(depends_on, produces):
         produces (dict): Path where the outcome is saved.
 
     Returns:
-        csv: The cleaned data set as a csv file.
+        arrow: The cleaned data set as an Arrow file.
 
     """
     data_info = read_yaml(path=depends_on["data_info"])
+    columns_to_keep = data_info["variables_to_keep"] + data_info["dates_to_keep"]
     dfs = load_data_files(
         data_files=depends_on["data"],
-        dest_dir=produces["unzipped_path"],
+        member_pattern=data_info["zip_members"],
+        usecols=lambda column: column in columns_to_keep,
     )
     dfs = clean_data(data=dfs, data_info=data_info)
     dfs = merge_data(data=dfs, index="TIME")
+    truncated_by = dfs.attrs["truncated_by"]
+    print(
+        f"Merged sample starts with {truncated_by['start']} and ends with "
+        f"{truncated_by['end']}.",
+    )
     dfs = calculate_detrend(data=dfs, variable="GDP")
     dfs = calculate_growth_rates(data=dfs, variable="CPI")
     dfs = dfs.rename(columns=data_info["column_rename_mapping"])
     dfs = calculate_backward_expectations(data=dfs, variable="Inflation")
-    dfs.to_csv(produces["clean_data"], index=True)
+    save_panel(dfs, produces["clean_data"])
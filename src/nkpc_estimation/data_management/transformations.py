@@ -0,0 +1,188 @@
+"""Functions deriving transformed series of the data set in vectorized sweeps."""
+
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def polynomial_detrend(values: np.ndarray, orders: Sequence[int]) -> np.ndarray:
+    """Remove polynomial time trends of several orders from a series at once.
+
+    The trends of all orders are projections on nested sets of columns of one
+    Vandermonde matrix, so a single QR decomposition yields all of them.
+
+    Args:
+        values (numpy.ndarray): The series of shape (n_obs,).
+        orders (Sequence): The orders of the polynomials.
+
+    Returns:
+        numpy.ndarray: The detrended series of shape (n_obs, n_orders).
+
+    Raises:
+        ValueError: If the series contains missing values or is too short for the
+            highest order.
+
+    """
+    values = np.asarray(values, dtype=float)
+    if np.isnan(values).any():
+        raise ValueError("values must not contain missing values.")
+    if max(orders) >= len(values):
+        raise ValueError("values must have more observations than the highest order.")
+    # The rescaled trend spans the same polynomials and keeps the matrix conditioned.
+    trend = np.linspace(-1, 1, len(values))
+    q, _ = np.linalg.qr(np.vander(trend, max(orders) + 1, increasing=True))
+    trends = np.cumsum(q * (values @ q), axis=1)
+    return values[:, None] - trends[:, list(orders)]
+
+
+def rolling_means(
+    values: np.ndarray,
+    windows: Sequence[int],
+    min_periods: int = 1,
+) -> np.ndarray:
+    """Compute the backward-looking rolling means of several window lengths at once.
+
+    The sums of all windows are differences of one cumulative sum. Missing values are
+    skipped as in :meth:`pandas.Series.rolling`.
+
+    Args:
+        values (numpy.ndarray): The series of shape (n_obs,).
+        windows (Sequence): The window lengths.
+        min_periods (int): The minimum number of observations of a window. Defaults
+            to 1.
+
+    Returns:
+        numpy.ndarray: The rolling means of shape (n_obs, n_windows). Windows with fewer
+            observations than ``min_periods`` are missing.
+
+    """
+    values = np.asarray(values, dtype=float)
+    observed = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(observed, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(observed)))
+    end = np.arange(1, len(values) + 1)[:, None]
+    start = np.maximum(end - np.asarray(windows), 0)
+    window_counts = counts[end] - counts[start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (sums[end] - sums[start]) / window_counts
+    return np.where(window_counts >= max(min_periods, 1), means, np.nan)
+
+
+def growth_rates(values: np.ndarray, horizons: Sequence[int]) -> np.ndarray:
+    """Compute the growth rates in percent over several horizons at once.
+
+    Args:
+        values (numpy.ndarray): The series of shape (n_obs,).
+        horizons (Sequence): The numbers of periods of the growth rates.
+
+    Returns:
+        numpy.ndarray: The growth rates of shape (n_obs, n_horizons). The first
+            ``horizon`` observations of each growth rate are missing.
+
+    """
+    values = np.asarray(values, dtype=float)
+    previous = np.arange(len(values))[:, None] - np.asarray(horizons)
+    lagged = np.where(previous >= 0, values[np.maximum(previous, 0)], np.nan)
+    return (values[:, None] / lagged - 1) * 100
+
+
+TRANSFORMS = {
+    "detrend": {"function": polynomial_detrend, "parameter": "order"},
+    "rolling_mean": {"function": rolling_means, "parameter": "window"},
+    "growth_rate": {"function": growth_rates, "parameter": "horizon"},
+}
+"""dict: The transforms by name. Each function computes a family of variants of a
+series, one for each value of its swept ``parameter``."""
+
+
+def transformation_pipeline(data: pd.DataFrame) -> dict:
+    """Create a pipeline memoizing the series derived from the columns of a data set.
+
+    Args:
+        data (pandas.DataFrame): The data set. It must not be modified while the
+            pipeline is used.
+
+    Returns:
+        dict: The data set 'data' and the memoized series 'derived' keyed by source
+            column, transform, and parameters. The variables of the feature registry
+            are memoized there as well, see
+            :func:`nkpc_estimation.analysis.features.pipeline_feature`.
+
+    """
+    return {"data": data, "derived": {}}
+
+
+def derive_family(
+    pipeline: dict,
+    column: str,
+    transform: str,
+    values: Sequence[Hashable],
+    **options,
+) -> dict[Hashable, pd.Series]:
+    """Derive the variants of a column for several values of a transform parameter.
+
+    All variants which are not memoized yet are computed in one sweep.
+
+    Args:
+        pipeline (dict): The output of :func:`transformation_pipeline`.
+        column (str): The source column.
+        transform (str): The name of the transform in :data:`TRANSFORMS`.
+        values (Sequence): The values of the swept parameter of the transform.
+        **options: Further keyword arguments of the transform.
+
+    Returns:
+        dict: The derived series by parameter value. The Series are shared and must not
+            be modified.
+
+    Raises:
+        KeyError: If the transform or column is unknown.
+
+    """
+    if transform not in TRANSFORMS:
+        raise KeyError(f"Unknown transform {transform!r}.")
+    spec = TRANSFORMS[transform]
+    keys = {
+        value: (
+            column,
+            transform,
+            ((spec["parameter"], value), *sorted(options.items())),
+        )
+        for value in values
+    }
+    derived = pipeline["derived"]
+    missing = [value for value, key in keys.items() if key not in derived]
+    if missing:
+        source = pipeline["data"][column]
+        family = spec["function"](source.to_numpy(dtype=float), missing, **options)
+        for value, variant in zip(missing, family.T):
+            derived[keys[value]] = pd.Series(
+                variant,
+                index=source.index,
+                name=f"{column}_{transform}_{value}",
+            )
+    return {value: derived[key] for value, key in keys.items()}
+
+
+def derive(
+    pipeline: dict,
+    column: str,
+    transform: str,
+    value: Hashable,
+    **options,
+) -> pd.Series:
+    """Derive one variant of a column, see :func:`derive_family`.
+
+    Args:
+        pipeline (dict): The output of :func:`transformation_pipeline`.
+        column (str): The source column.
+        transform (str): The name of the transform in :data:`TRANSFORMS`.
+        value (Hashable): The value of the swept parameter of the transform.
+        **options: Further keyword arguments of the transform.
+
+    Returns:
+        pandas.Series: The derived series. The Series is shared and must not be
+            modified.
+
+    """
+    return derive_family(pipeline, column, transform, [value], **options)[value]
@@ -1,5 +1,5 @@
 """Functions for formatting results."""
 
-from nkpc_estimation.final.plot import plot_regression
+from nkpc_estimation.final.plot import plot_regression, plot_regressions
 
-__all__ = [plot_regression]
+__all__ = [plot_regression, plot_regressions]
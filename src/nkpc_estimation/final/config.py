@@ -5,6 +5,8 @@ import pathlib
 from nkpc_estimation.analysis.config import _DATES, _FEATURE_1, _FEATURE_2, _MODELS
 from nkpc_estimation.config import BLD
 
+PLOT_OPTIONS = {"resolution": 20, "backend": "matplotlib"}
+
 PLOTS = {
     f"{feature_name_1}_{feature_name_2}_{model_name}": {
         "model": model_name,
@@ -104,6 +106,19 @@ def path_to_sensitivity_plots(
     )
 
 
+def path_to_figure_manifest(name: str) -> pathlib.PosixPath:
+    """Create the path for the manifest of the figures rendered by one task.
+
+    Args:
+        name (str): The name of the group of figures.
+
+    Returns:
+        pathlib.PosixPath: The path for the manifest.
+
+    """
+    return BLD / "python" / "figures" / f"manifest_{name}.json"
+
+
 def path_to_tables(
     feature_name_1: str,
     feature_name_2: str,
@@ -152,3 +167,16 @@ def path_to_sensitivity_tables(
         / "tables"
         / f"{feature_name_1}_{feature_name_2}_{model_type}_{date}.tex"
     )
+
+
+def path_to_comparison_tables(model_type: str) -> pathlib.PosixPath:
+    """Create the path for the table comparing the specifications of a method.
+
+    Args:
+        model_type (str): The name of the estimation method.
+
+    Returns:
+        pathlib.PosixPath: The path for the table.
+
+    """
+    return BLD / "python" / "tables" / f"comparison_{model_type}.tex"
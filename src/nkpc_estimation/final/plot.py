@@ -4,11 +4,55 @@ import numpy as np
 import pandas as pd
 import plotly
 import plotly.graph_objs as go
-import statsmodels
+
+
+def regressor_grid(
+    x1: pd.Series,
+    x2: pd.Series,
+    resolution: int = 20,
+) -> dict[str, np.ndarray | tuple[float, float]]:
+    """Compute the evaluation grid and axis ranges of two regressors once.
+
+    Args:
+        x1 (pandas.Series): variable for x-axis.
+        x2 (pandas.Series): variable for y-axis.
+        resolution (int): The number of grid points per axis. Defaults to 20.
+
+    Returns:
+        dict: The axis ranges 'x1_range' and 'x2_range' and the grid coordinates 'xx'
+            and 'yy' of shape (resolution, resolution).
+
+    """
+    x1_range = (float(np.min(x1)), float(np.max(x1)))
+    x2_range = (float(np.min(x2)), float(np.max(x2)))
+    xx, yy = np.meshgrid(
+        np.linspace(*x1_range, resolution),
+        np.linspace(*x2_range, resolution),
+    )
+    return {"x1_range": x1_range, "x2_range": x2_range, "xx": xx, "yy": yy}
+
+
+def evaluate_planes(
+    params: np.ndarray,
+    grid: dict[str, np.ndarray | tuple[float, float]],
+) -> np.ndarray:
+    """Evaluate the fitted planes of many models on a shared grid.
+
+    Args:
+        params (numpy.ndarray): The coefficients of x1 and x2 of shape (2,) or
+            (n_models, 2).
+        grid (dict): The output of :func:`regressor_grid`.
+
+    Returns:
+        numpy.ndarray: The planes of shape (n_models, resolution, resolution).
+
+    """
+    coordinates = np.stack((grid["xx"], grid["yy"]))
+    return np.einsum("mk,kij->mij", np.atleast_2d(params), coordinates)
 
 
 def plot_regression(
-    model: statsmodels.base.model.Results,
+    params: np.ndarray,
     x1: pd.Series,
     x2: pd.Series,
     y: pd.Series,
@@ -16,30 +60,117 @@ def plot_regression(
     x2axis_title: str,
     yaxis_title: str,
     title: str = None,
+    resolution: int = 20,
+    backend: str = "plotly",
 ) -> plotly.graph_objects.Scatter:
     """Plot regression results.
 
     Args:
-        model (statsmodels.base.model.Results): The fitted model.
+        params (numpy.ndarray): The coefficients of x1 and x2.
         x1 (pandas.Series): variable for x-axis.
         x2 (pandas.Series): variable for y-axis.
         y (pandas.Series): variable for z-axis.
         x1axis_title (str): title of x-axis.
         x2axis_title (str): title of y-axis.
         yaxis_title (str): title of z-axis.
+        title (str, optional): title of the figure.
+        resolution (int): The number of grid points per axis of the plane. Defaults
+            to 20.
+        backend (str): The plotting library, 'plotly' or 'matplotlib'. Defaults to
+            'plotly'.
 
     Returns:
-        plotly.graph_objects.Scatter: The figure.
+        plotly.graph_objects.Scatter or matplotlib.figure.Figure: The figure.
 
     """
+    return plot_regressions(
+        np.atleast_2d(params),
+        x1,
+        x2,
+        y,
+        x1axis_title,
+        x2axis_title,
+        yaxis_title,
+        titles=[title],
+        resolution=resolution,
+        backend=backend,
+    )[0]
+
+
+def plot_regressions(
+    params: np.ndarray,
+    x1: pd.Series,
+    x2: pd.Series,
+    y: pd.Series,
+    x1axis_title: str,
+    x2axis_title: str,
+    yaxis_title: str,
+    titles: list[str] | None = None,
+    resolution: int = 20,
+    backend: str = "plotly",
+) -> list[plotly.graph_objects.Scatter]:
+    """Plot the regression results of many models of the same regressors.
+
+    The grid and axis ranges are computed once and all planes are evaluated with one
+    matrix product.
+
+    Args:
+        params (numpy.ndarray): The coefficients of x1 and x2 of shape (n_models, 2).
+        x1 (pandas.Series): variable for x-axis.
+        x2 (pandas.Series): variable for y-axis.
+        y (pandas.Series): variable for z-axis.
+        x1axis_title (str): title of x-axis.
+        x2axis_title (str): title of y-axis.
+        yaxis_title (str): title of z-axis.
+        titles (list, optional): titles of the figures.
+        resolution (int): The number of grid points per axis of the planes. Defaults
+            to 20.
+        backend (str): The plotting library, 'plotly' or 'matplotlib'. The matplotlib
+            figures are saved by its own PDF backend without a browser process.
+            Defaults to 'plotly'.
+
+    Returns:
+        list: The figures.
+
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"backend must be one of {tuple(_BACKENDS)}.")
+    plot_plane = _BACKENDS[backend]
+    grid = regressor_grid(x1, x2, resolution)
+    planes = evaluate_planes(params, grid)
+    titles = [None] * len(planes) if titles is None else titles
+    return [
+        plot_plane(
+            grid,
+            plane,
+            x1,
+            x2,
+            y,
+            x1axis_title,
+            x2axis_title,
+            yaxis_title,
+            title,
+        )
+        for plane, title in zip(planes, titles)
+    ]
+
+
+def _plot_plane_plotly(
+    grid,
+    zz,
+    x1,
+    x2,
+    y,
+    x1axis_title,
+    x2axis_title,
+    yaxis_title,
+    title,
+):
+    """Plot the observations and a fitted plane evaluated on a grid with plotly."""
     fig = go.Figure(
         data=[go.Scatter3d(x=x1, y=x2, z=y, mode="markers", marker={"color": "blue"})],
     )
-    x_range = np.linspace(x1.min(), x1.max(), 20)
-    y_range = np.linspace(x2.min(), x2.max(), 20)
-    xx, yy = np.meshgrid(x_range, y_range)
-    zz = model.predict(np.column_stack((xx.flatten(), yy.flatten()))).reshape(xx.shape)
-    fig.add_trace(go.Surface(x=xx, y=yy, z=zz, showlegend=False))
+    fig.add_trace(go.Surface(x=grid["xx"], y=grid["yy"], z=zz, showlegend=False))
     fig.update_layout(
         title=title,
         scene={
@@ -49,7 +180,7 @@ def plot_regression(
                 "showbackground": True,
                 "zerolinecolor": "white",
                 "title": x1axis_title,
-                "range": [x1.min(), x1.max()],
+                "range": list(grid["x1_range"]),
             },
             "yaxis": {
                 "backgroundcolor": "rgb(230, 200,230)",
@@ -57,7 +188,7 @@ def plot_regression(
                 "showbackground": True,
                 "zerolinecolor": "white",
                 "title": x2axis_title,
-                "range": [x2.min(), x2.max()],
+                "range": list(grid["x2_range"]),
             },
             "zaxis": {
                 "backgroundcolor": "rgb(230, 230,200)",
@@ -76,3 +207,45 @@ def plot_regression(
     )
 
     return fig
+
+
+def _plot_plane_matplotlib(
+    grid,
+    zz,
+    x1,
+    x2,
+    y,
+    x1axis_title,
+    x2axis_title,
+    yaxis_title,
+    title,
+):
+    """Plot the observations and a fitted plane evaluated on a grid with matplotlib.
+
+    The figure is created without pyplot, so it holds no global state and is freed
+    once it is saved.
+
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 7))
+    ax = fig.add_subplot(projection="3d")
+    ax.scatter(x1, x2, y, color="blue", depthshade=False)
+    ax.plot_surface(grid["xx"], grid["yy"], zz, cmap="plasma", alpha=0.8)
+    ax.set(
+        title=title,
+        xlabel=x1axis_title,
+        ylabel=x2axis_title,
+        zlabel=yaxis_title,
+        xlim=grid["x1_range"],
+        ylim=grid["x2_range"],
+    )
+    ax.xaxis.set_pane_color((200 / 255, 200 / 255, 230 / 255))
+    ax.yaxis.set_pane_color((230 / 255, 200 / 255, 230 / 255))
+    ax.zaxis.set_pane_color((230 / 255, 230 / 255, 200 / 255))
+    # Matches the camera eye (2.25, 2.25, 0.1) of the plotly figures.
+    ax.view_init(elev=np.degrees(np.arctan2(0.1, np.hypot(2.25, 2.25))), azim=45)
+    return fig
+
+
+_BACKENDS = {"plotly": _plot_plane_plotly, "matplotlib": _plot_plane_matplotlib}
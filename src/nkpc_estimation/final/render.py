@@ -0,0 +1,92 @@
+"""Functions rendering batches of figures to files."""
+
+import json
+import os
+import pathlib
+import tempfile
+
+import plotly.graph_objs as go
+import plotly.io as pio
+
+
+def stale_figures(
+    hashes: dict[str, str],
+    manifest_path: str | os.PathLike,
+) -> list[str]:
+    """Select the figures that have to be rendered again.
+
+    A figure is stale if its file does not exist or if the hash of its inputs differs
+    from the hash recorded in the manifest when it was last rendered.
+
+    Args:
+        hashes (dict): The hashes of the inputs of each figure by output path.
+        manifest_path (str or pathlib.Path): Path to the manifest of rendered figures.
+
+    Returns:
+        list: The output paths of the stale figures.
+
+    """
+    manifest = _load_manifest(manifest_path)
+    return [
+        path
+        for path, key in hashes.items()
+        if not pathlib.Path(path).exists() or manifest.get(str(path)) != key
+    ]
+
+
+def write_figures(
+    figures: dict[str, go.Figure],
+    hashes: dict[str, str],
+    manifest_path: str | os.PathLike,
+):
+    """Render a batch of figures with one image export engine and record their hashes.
+
+    Plotly figures are exported with a single call to :func:`plotly.io.write_images`,
+    which keeps one Kaleido process alive for the whole batch. Other figures, e.g.
+    matplotlib figures, are saved with their own ``savefig`` method.
+
+    Args:
+        figures (dict): The figures by output path.
+        hashes (dict): The hashes of the inputs of each figure by output path.
+        manifest_path (str or pathlib.Path): Path to the manifest of rendered figures.
+
+    """
+    plotly_figures = {
+        path: fig for path, fig in figures.items() if isinstance(fig, go.Figure)
+    }
+    if plotly_figures:
+        if hasattr(pio, "write_images"):
+            pio.write_images(list(plotly_figures.values()), list(plotly_figures))
+        else:
+            for path, fig in plotly_figures.items():
+                fig.write_image(path)
+    for path, fig in figures.items():
+        if path not in plotly_figures:
+            fig.savefig(path)
+
+    manifest = _load_manifest(manifest_path)
+    manifest.update({str(path): hashes[path] for path in figures})
+    _save_manifest(manifest, manifest_path)
+
+
+def _load_manifest(path):
+    """Load the manifest of rendered figures or an empty one."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest, path):
+    """Save the manifest of rendered figures atomically."""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=path.parent,
+        suffix=".json",
+        delete=False,
+    ) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f.name, path)
@@ -0,0 +1,247 @@
+"""Functions formatting regression tables from the arrays of a results store."""
+
+import numpy as np
+from scipy import stats
+
+from nkpc_estimation.analysis.results import FULL_SAMPLE, results_index
+
+_STARS = ((0.01, "***"), (0.05, "**"), (0.1, "*"))
+
+_NOTES = (
+    "\\bigskip\nStandard errors in parentheses. \\newline \n"
+    "* p<.1, ** p<.05, ***p<.01"
+)
+
+_POSTERIOR_NOTES = (
+    "\\bigskip\nPosterior means with posterior standard deviations in parentheses."
+)
+
+
+def coefficient_pvalues(store: dict[str, np.ndarray]) -> np.ndarray:
+    """Compute the two-sided p-values of the coefficients of a results store.
+
+    Models with nonrobust standard errors use the t distribution with the residual
+    degrees of freedom and models with robust standard errors the normal distribution,
+    which matches the defaults of statsmodels. The moments of Bayesian posteriors have
+    no p-values, so they are missing for models with the covariance type 'posterior'.
+
+    Args:
+        store (dict): The results store.
+
+    Returns:
+        numpy.ndarray: The p-values of shape (n_models, n_params).
+
+    """
+    statistics = np.abs(store["params"] / store["bse"])
+    t_pvalues = 2 * stats.t.sf(statistics, store["df_resid"][:, None])
+    normal_pvalues = 2 * stats.norm.sf(statistics)
+    pvalues = np.where(
+        (store["cov_type"] == "nonrobust")[:, None],
+        t_pvalues,
+        normal_pvalues,
+    )
+    return np.where((store["cov_type"] == "posterior")[:, None], np.nan, pvalues)
+
+
+def format_coefficients(
+    params: np.ndarray,
+    bse: np.ndarray,
+    pvalues: np.ndarray,
+    float_format: str = "%0.2f",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Format coefficients with significance stars and standard errors in parentheses.
+
+    Coefficients with missing p-values get no stars.
+
+    Args:
+        params (numpy.ndarray): The coefficients.
+        bse (numpy.ndarray): The standard errors of the same shape.
+        pvalues (numpy.ndarray): The p-values of the same shape.
+        float_format (str): The format of the numbers. Defaults to '%0.2f'.
+
+    Returns:
+        tuple: The formatted coefficients and standard errors as string arrays of the
+            same shape as the inputs.
+
+    """
+    stars = np.full(np.shape(pvalues), "", dtype=object)
+    for threshold, symbol in reversed(_STARS):
+        stars = np.where(np.asarray(pvalues) < threshold, symbol, stars)
+    format_ = np.vectorize(lambda value: float_format % value, otypes=[object])
+    coefficients = format_(params) + stars
+    errors = "(" + format_(bse) + ")"
+    return coefficients.astype(str), errors.astype(str)
+
+
+def spec_tables(
+    store: dict[str, np.ndarray],
+    outcome_name: str = "Inflation",
+    float_format: str = "%0.2f",
+) -> dict[tuple[str, str, str, str], str]:
+    """Format one LaTeX table per model of a results store.
+
+    The tables have the layout of :func:`statsmodels.iolib.summary2.summary_col` with
+    stars. Bayesian models report posterior means and standard deviations without
+    stars.
+
+    Args:
+        store (dict): The results store.
+        outcome_name (str): The column title. Defaults to 'Inflation'.
+        float_format (str): The format of the numbers. Defaults to '%0.2f'.
+
+    Returns:
+        dict: The LaTeX tables by feature_1, feature_2, model, and date.
+
+    """
+    coefficients, errors = format_coefficients(
+        store["params"],
+        store["bse"],
+        coefficient_pvalues(store),
+        float_format,
+    )
+    tables = {}
+    for position, key in enumerate(results_index(store)):
+        rows = []
+        for name, coefficient, error in zip(
+            store["param_names"][position],
+            coefficients[position],
+            errors[position],
+        ):
+            rows += [[str(name), coefficient], ["", error]]
+        rows += _fit_rows(store, [position], float_format)
+        tables[key] = latex_table(
+            [["", outcome_name], *rows],
+            _table_notes(store, [position]),
+        )
+    return tables
+
+
+def comparison_table(
+    store: dict[str, np.ndarray],
+    model_type: str,
+    float_format: str = "%0.2f",
+) -> str:
+    """Format a LaTeX table comparing the models of one type across specifications.
+
+    The table has one column per pair of features and one block of rows per sample
+    window with the coefficients, standard errors, and R-squared of the models.
+
+    Args:
+        store (dict): The results store.
+        model_type (str): The name of the regression method.
+        float_format (str): The format of the numbers. Defaults to '%0.2f'.
+
+    Returns:
+        str: The LaTeX table.
+
+    """
+    index = results_index(store)
+    selected = np.flatnonzero(store["model"] == model_type)
+    pairs = list(
+        dict.fromkeys(zip(store["feature_1"][selected], store["feature_2"][selected])),
+    )
+    dates = sorted(
+        set(store["date"][selected]),
+        key=lambda date: (date != FULL_SAMPLE, date),
+    )
+    coefficients, errors = format_coefficients(
+        store["params"],
+        store["bse"],
+        coefficient_pvalues(store),
+        float_format,
+    )
+    header = [
+        "",
+        *(_escape(f"{feature_1} / {feature_2}") for feature_1, feature_2 in pairs),
+    ]
+    rows = [header]
+    for date in dates:
+        positions = [_get_position(index, (*pair, model_type, date)) for pair in pairs]
+        label = "Full sample" if date == FULL_SAMPLE else f"Since {date}"
+        rows.append([label, *([""] * len(pairs))])
+        for param in range(store["params"].shape[1]):
+            rows.append(
+                [
+                    f"x{param + 1}",
+                    *_cells(coefficients[:, param], positions),
+                ],
+            )
+            rows.append(["", *_cells(errors[:, param], positions)])
+        rows += _fit_rows(store, positions, float_format)
+    return latex_table(rows, _table_notes(store, selected))
+
+
+def latex_table(rows: list[list[str]], notes: str = _NOTES) -> str:
+    """Render rows of cells as a LaTeX table with a header line.
+
+    Args:
+        rows (list): The rows of cells. The first row is the header.
+        notes (str): The notes below the table. Defaults to the notes of the
+            significance stars.
+
+    Returns:
+        str: The LaTeX table.
+
+    """
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = [
+        " & ".join(cell.ljust(width) for cell, width in zip(row, widths)) + "  \\\\"
+        for row in rows
+    ]
+    return "\n".join(
+        [
+            "\\begin{table}",
+            "\\caption{}",
+            "\\label{}",
+            "\\begin{center}",
+            "\\begin{tabular}{" + "l" * len(widths) + "}",
+            "\\hline",
+            lines[0],
+            "\\hline",
+            *lines[1:],
+            "\\hline",
+            "\\end{tabular}",
+            "\\end{center}",
+            "\\end{table}",
+            notes,
+        ],
+    )
+
+
+def _table_notes(store, positions):
+    """Get the notes of a table of the models at the given positions."""
+    if (store["cov_type"][positions] == "posterior").all():
+        return _POSTERIOR_NOTES
+    return _NOTES
+
+
+def _fit_rows(store, positions, float_format):
+    """Format the R-squared rows of the models at the given positions."""
+    return [
+        [
+            label,
+            *(
+                "" if position is None else float_format % store[statistic][position]
+                for position in positions
+            ),
+        ]
+        for label, statistic in (
+            ("R-squared", "rsquared"),
+            ("R-squared Adj.", "rsquared_adj"),
+        )
+    ]
+
+
+def _cells(values, positions):
+    """Select the formatted values of the models at the given positions."""
+    return ["" if position is None else values[position] for position in positions]
+
+
+def _get_position(index, key):
+    """Get the position of a model in the index or None if it is missing."""
+    return index.get_loc(key) if key in index else None
+
+
+def _escape(text):
+    """Escape the underscores of a text for LaTeX."""
+    return text.replace("_", "\\_")
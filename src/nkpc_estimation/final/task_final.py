@@ -1,325 +1,241 @@
 """Tasks running the results formatting (tables, figures)."""
 
-import pandas as pd
+import numpy as np
 import pytask
-from statsmodels.iolib.summary2 import summary_col
 
-from nkpc_estimation.analysis.config import (
-    path_to_estimation_result,
-    path_to_sensitivity_result,
+from nkpc_estimation.analysis.cache import hash_inputs
+from nkpc_estimation.analysis.config import _MODELS, RESULTS
+from nkpc_estimation.analysis.features import get_feature
+from nkpc_estimation.analysis.results import (
+    FULL_SAMPLE,
+    load_results,
+    results_index,
 )
-from nkpc_estimation.analysis.model import load_model
 from nkpc_estimation.config import BLD
-from nkpc_estimation.final import plot_regression
+from nkpc_estimation.final import plot_regressions
 from nkpc_estimation.final.config import (
+    PLOT_OPTIONS,
     PLOTS,
     PLOTS_SENSITIVITY,
     TABLES,
     TABLES_SENSITIVITY,
+    path_to_comparison_tables,
+    path_to_figure_manifest,
     path_to_plots,
     path_to_sensitivity_plots,
     path_to_sensitivity_tables,
     path_to_tables,
 )
-
-
-def _create_plot_parametrization(plots):
-    """Create parametrization for pytask.
-
-    Args:
-        plots (dict): A dictionary with the configuration to create the parametrization.
-
-    Returns:
-        dict: A dictionary with the dependencies, model, and information where the output is saved.
-
-    """
-    id_to_kwargs = {}
-    for name, config in plots.items():
-        depends_on = {
-            "data": BLD / "python" / "data" / "data_clean.csv",
-            "model": path_to_estimation_result(
+from nkpc_estimation.final.render import stale_figures, write_figures
+from nkpc_estimation.final.tables import comparison_table, spec_tables
+
+
+_YAXIS_TITLE = "Inflation (in %)"
+_X1AXIS_TITLES = {
+    "Unemp": "Unemployment Rate (in %)",
+    "Unemp_Gap": "Unemployment Gap (in %)",
+    "Labor_share": "NFB Labor Income Share (in %)",
+    "GDP": "Detrended log GDP",
+}
+_X2AXIS_TITLES = {
+    "BackExp": "Backward Expectation (in %)",
+    "MSC": "MSC Expectation (in %)",
+}
+
+
+def _plot_key(config):
+    """Get the key of the model of a plot or table in the results store."""
+    return (
+        config["feature_1"],
+        config["feature_2"],
+        config["model"],
+        config.get("date", FULL_SAMPLE),
+    )
+
+
+@pytask.mark.depends_on(
+    {"data": BLD / "python" / "data" / "data_clean.arrow", "results": RESULTS},
+)
+@pytask.mark.produces(
+    {
+        **{
+            name: path_to_plots(
                 config["feature_1"],
                 config["feature_2"],
                 config["model"],
-            ),
-        }
-        produces = path_to_plots(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-        )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
-
-    return id_to_kwargs
-
-
-_ID_TO_KWARGS = _create_plot_parametrization(PLOTS)
-
-for id_, kwargs in _ID_TO_KWARGS.items():
-
-    @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_plot_regression(depends_on, model, produces):
-        """Plot a 3D scatter plot with a plane for the OLS fit.
-
-        Args:
-            depends_on (dict): Dependencies for the pytask function.
-            model (str): The name of the regression method.
-            produces (Path): Path where the outcome is saved.
-
-        Returns:
-            Pdf: Saves a pdf file in the produces path.
-
-        """
-        data = pd.read_csv(depends_on["data"])
-        outcome_var = data["Inflation"]
-        feature_vars_1 = {
-            "Unemp": data["Unemployment"],
-            "Unemp_Gap": data["Unemployment"] - data["NAIRU"],
-            "Labor_share": data["Labor_share"],
-            "GDP": data["GDP"],
-        }
-        feature_vars_2 = {
-            "BackExp": data["Backward_Expectations_Inflation"],
-            "MSC": data["MSC"],
-        }
-        yaxis_title = "Inflation (in %)"
-        x1axis_titles = {
-            "Unemp": "Unemployment Rate (in %)",
-            "Unemp_Gap": "Unemployment Gap (in %)",
-            "Labor_share": "NFB Labor Income Share (in %)",
-            "GDP": "Detrended log GDP",
-        }
-
-        x2axis_titles = {
-            "BackExp": "Backward Expectation (in %)",
-            "MSC": "MSC Expectation (in %)",
-        }
-
-        for feature_name_1, feature_var_1 in feature_vars_1.items():
-            for feature_name_2, feature_var_2 in feature_vars_2.items():
-                x1axis_title = x1axis_titles[feature_name_1]
-                x2axis_title = x2axis_titles[feature_name_2]
-                model = load_model(depends_on["model"])
-                fig = plot_regression(
-                    model,
-                    feature_var_1,
-                    feature_var_2,
-                    outcome_var,
-                    x1axis_title,
-                    x2axis_title,
-                    yaxis_title,
-                )
-                fig.write_image(
-                    f"{produces.parent}/{feature_name_1}_{feature_name_2}_OLS.pdf",
-                )
-
-
-def _create_sensitivity_plot_parametrization(plots_sensitivity):
-    """Create parametrization for pytask.
+            )
+            for name, config in PLOTS.items()
+        },
+        "manifest": path_to_figure_manifest("regression"),
+    },
+)
+def task_plot_regression(depends_on, produces):
+    """Plot a 3D scatter plot with a plane for each OLS fit on the full sample.
 
     Args:
-        plots_sensitivity (dict): A dictionary with the configuration to create the parametrization.
+        depends_on (dict): Dependencies for the pytask function.
+        produces (dict): Paths where the outcomes are saved.
 
     Returns:
-        dict: A dictionary with the dependencies, model, and information where the output is saved.
+        Pdf: Saves pdf files and the manifest of rendered figures in the produces
+            paths.
 
     """
-    id_to_kwargs = {}
-    for name, config in plots_sensitivity.items():
-        depends_on = {
-            "data": BLD / "python" / "data" / "data_clean.csv",
-            "model": path_to_sensitivity_result(
+    _plot_and_save(depends_on, PLOTS, produces)
+
+
+@pytask.mark.depends_on(
+    {"data": BLD / "python" / "data" / "data_clean.arrow", "results": RESULTS},
+)
+@pytask.mark.produces(
+    {
+        **{
+            name: path_to_sensitivity_plots(
                 config["feature_1"],
                 config["feature_2"],
                 config["model"],
                 config["date"],
-            ),
-        }
-        produces = path_to_sensitivity_plots(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-            config["date"],
-        )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
-
-    return id_to_kwargs
-
-
-_ID_TO_KWARGS_SENSITIVITY = _create_sensitivity_plot_parametrization(PLOTS_SENSITIVITY)
-
-for id_, kwargs in _ID_TO_KWARGS_SENSITIVITY.items():
-
-    @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_sensitivity_plot_regression(depends_on, model, produces):
-        """Plot a 3D scatter plot with a plane for the OLS fit.
-
-        Args:
-            depends_on (dict): Dependencies for the pytask function.
-            model (str): The name of the regression method.
-            produces (Path): Path where the outcome is saved.
-
-        Returns:
-            Pdf: Saves a pdf file in the produces path.
-
-        """
-        data = pd.read_csv(depends_on["data"])
-        outcome_var = data["Inflation"]
-        feature_vars_1 = {
-            "Unemp": data["Unemployment"],
-            "Unemp_Gap": data["Unemployment"] - data["NAIRU"],
-            "Labor_share": data["Labor_share"],
-            "GDP": data["GDP"],
-        }
-        feature_vars_2 = {
-            "BackExp": data["Backward_Expectations_Inflation"],
-            "MSC": data["MSC"],
-        }
-        yaxis_title = "Inflation (in %)"
-        x1axis_titles = {
-            "Unemp": "Unemployment Rate (in %)",
-            "Unemp_Gap": "Unemployment Gap (in %)",
-            "Labor_share": "NFB Labor Income Share (in %)",
-            "GDP": "Detrended log GDP",
-        }
-
-        x2axis_titles = {
-            "BackExp": "Backward Expectation (in %)",
-            "MSC": "MSC Expectation (in %)",
-        }
-
-        for feature_name_1, feature_var_1 in feature_vars_1.items():
-            for feature_name_2, feature_var_2 in feature_vars_2.items():
-                x1axis_title = x1axis_titles[feature_name_1]
-                x2axis_title = x2axis_titles[feature_name_2]
-                model = load_model(depends_on["model"])
-                fig = plot_regression(
-                    model,
-                    feature_var_1,
-                    feature_var_2,
-                    outcome_var,
-                    x1axis_title,
-                    x2axis_title,
-                    yaxis_title,
-                )
-                fig.write_image(produces)
-
-
-def _create_table_parametrization(tables):
-    """Create parametrization for pytask.
+            )
+            for name, config in PLOTS_SENSITIVITY.items()
+        },
+        "manifest": path_to_figure_manifest("sensitivity"),
+    },
+)
+def task_sensitivity_plot_regression(depends_on, produces):
+    """Plot a 3D scatter plot with a plane for each OLS fit of the sensitivity analysis.
 
     Args:
-        tables (dict): A dictionary with the configuration to create the parametrization.
+        depends_on (dict): Dependencies for the pytask function.
+        produces (dict): Paths where the outcomes are saved.
 
     Returns:
-        dict: A dictionary with the dependencies, model, and information where the output is saved.
+        Pdf: Saves pdf files and the manifest of rendered figures in the produces
+            paths.
 
     """
-    id_to_kwargs = {}
-    for name, config in tables.items():
-        depends_on = path_to_estimation_result(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-        )
-        produces = path_to_tables(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-        )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
+    _plot_and_save(depends_on, PLOTS_SENSITIVITY, produces)
 
-    return id_to_kwargs
 
+def _plot_and_save(depends_on, plots, produces):
+    """Plot the fitted planes of models of the results store and save the figures.
 
-_ID_TO_KWARGS = _create_table_parametrization(TABLES)
+    Figures whose coefficients, data, titles, and options did not change since they
+    were last rendered are skipped. Each task keeps its own manifest of rendered
+    figures, so tasks running in parallel never write the same file. The planes of the
+    remaining figures are evaluated on one grid per pair of features and rendered in
+    one batch.
 
-for id_, kwargs in _ID_TO_KWARGS.items():
+    Args:
+        depends_on (dict): Paths to the cleaned data set and the results store.
+        plots (dict): The configuration of the plots.
+        produces (dict): Paths where the outcomes and the manifest 'manifest' are
+            saved.
 
-    @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_create_results_table_python(depends_on, model, produces):
-        """Create a table with the regression results.
+    """
+    store = load_results(depends_on["results"])
+    index = results_index(store)
+    outcome_var = get_feature("Inflation", depends_on["data"])
+    params = {}
+    hashes = {}
+    for name, config in plots.items():
+        feature_name_1, feature_name_2 = config["feature_1"], config["feature_2"]
+        path = produces[name]
+        params[path] = store["params"][index.get_loc(_plot_key(config))]
+        hashes[path] = hash_inputs(
+            params[path],
+            get_feature(feature_name_1, depends_on["data"]),
+            get_feature(feature_name_2, depends_on["data"]),
+            outcome_var,
+            titles=_axis_titles(feature_name_1, feature_name_2),
+            options=PLOT_OPTIONS,
+        )
+
+    stale = set(stale_figures(hashes, produces["manifest"]))
+    groups = {}
+    for name, config in plots.items():
+        if produces[name] in stale:
+            groups.setdefault((config["feature_1"], config["feature_2"]), []).append(
+                produces[name],
+            )
+    figures = {}
+    for (feature_name_1, feature_name_2), paths in groups.items():
+        figures.update(
+            zip(
+                paths,
+                plot_regressions(
+                    np.array([params[path] for path in paths]),
+                    get_feature(feature_name_1, depends_on["data"]),
+                    get_feature(feature_name_2, depends_on["data"]),
+                    outcome_var,
+                    *_axis_titles(feature_name_1, feature_name_2),
+                    **PLOT_OPTIONS,
+                ),
+            ),
+        )
+    write_figures(figures, hashes, produces["manifest"])
 
-        Args:
-            depends_on (dict): Dependencies for the pytask function.
-            model (str): The name of the regression method.
-            produces (Path): Path where the outcome is saved.
 
-        Returns:
-            Latex table: Saves a tex file in the produces path.
+def _axis_titles(feature_name_1, feature_name_2):
+    """Get the axis titles of a plot of two features."""
+    return (
+        _X1AXIS_TITLES[feature_name_1],
+        _X2AXIS_TITLES[feature_name_2],
+        _YAXIS_TITLE,
+    )
 
-        """
-        model = load_model(depends_on)
-        table = summary_col([model], stars=True, float_format="%0.2f").as_latex()
-        with open(produces, "w") as f:
-            f.writelines(table)
 
+@pytask.mark.depends_on(RESULTS)
+@pytask.mark.produces(
+    {
+        **{
+            name: path_to_tables(
+                config["feature_1"],
+                config["feature_2"],
+                config["model"],
+            )
+            for name, config in TABLES.items()
+        },
+        **{
+            name: path_to_sensitivity_tables(
+                config["feature_1"],
+                config["feature_2"],
+                config["model"],
+                config["date"],
+            )
+            for name, config in TABLES_SENSITIVITY.items()
+        },
+        **{
+            f"comparison_{model_type}": path_to_comparison_tables(model_type)
+            for model_type in _MODELS
+        },
+    },
+)
+def task_create_results_tables(depends_on, produces):
+    """Create the tables with the regression results of all models.
 
-def _create_table_sensitivity_parametrization(tables_sensitivity):
-    """Create parametrization for pytask.
+    The results store is read once. One table is written per model of the full sample
+    and the sensitivity analysis and one comparison table per regression method.
 
     Args:
-        tables_sensitivity (dict): A dictionary with the configuration to create the parametrization.
+        depends_on (Path): Path to the results store.
+        produces (dict): Paths where the outcomes are saved.
 
     Returns:
-        dict: A dictionary with the dependencies, model, and information where the output is saved.
+        Latex tables: Saves tex files in the produces paths.
 
     """
-    id_to_kwargs = {}
-    for name, config in tables_sensitivity.items():
-        depends_on = path_to_sensitivity_result(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-            config["date"],
+    store = load_results(depends_on)
+    tables = spec_tables(store)
+    for name, config in {**TABLES, **TABLES_SENSITIVITY}.items():
+        _write_table(tables[_plot_key(config)], produces[name])
+    for model_type in _MODELS:
+        _write_table(
+            comparison_table(store, model_type),
+            produces[f"comparison_{model_type}"],
         )
-        produces = path_to_sensitivity_tables(
-            config["feature_1"],
-            config["feature_2"],
-            config["model"],
-            config["date"],
-        )
-        id_to_kwargs[name] = {
-            "depends_on": depends_on,
-            "model": config["model"],
-            "produces": produces,
-        }
-
-    return id_to_kwargs
-
-
-_ID_TO_KWARGS_SENSITIVITY = _create_table_sensitivity_parametrization(
-    TABLES_SENSITIVITY,
-)
-
-for id_, kwargs in _ID_TO_KWARGS_SENSITIVITY.items():
-
-    @pytask.mark.task(id=id_, kwargs=kwargs)
-    def task_create_results_sensitivity_table_python(depends_on, model, produces):
-        """Create a table with the regression results.
-
-        Args:
-            depends_on (dict): Dependencies for the pytask function.
-            model (str): The name of the regression method.
-            produces (Path): Path where the outcome is saved.
 
-        Returns:
-            Latex table: Saves a tex file in the produces path.
 
-        """
-        model = load_model(depends_on)
-        table = summary_col([model], stars=True, float_format="%0.2f").as_latex()
-        with open(produces, "w") as f:
-            f.writelines(table)
+def _write_table(table, path):
+    """Write a LaTeX table to a file."""
+    with open(path, "w") as f:
+        f.writelines(table)
@@ -1,5 +1,8 @@
 """Utilities used in various parts of the project."""
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 import yaml
 
 
@@ -23,3 +26,48 @@ def read_yaml(path):
             )
             raise ValueError(info) from error
     return out
+
+
+def save_panel(data, path):
+    """Save a data set with its index as an uncompressed Arrow (Feather v2) file.
+
+    The file is uncompressed so that it can be memory-mapped by :func:`load_panel`.
+
+    Args:
+        data (pandas.DataFrame): The data set with a named index.
+        path (str or pathlib.Path): Path to file.
+
+    """
+    table = pa.Table.from_pandas(data, preserve_index=True)
+    feather.write_feather(table, path, compression="uncompressed")
+
+
+def load_panel(path, columns=None, memory_map=False):
+    """Load a data set saved with :func:`save_panel`.
+
+    Args:
+        path (str or pathlib.Path): Path to file.
+        columns (list, optional): The columns to read. All columns are read if None.
+        memory_map (bool): Whether to memory-map the file instead of reading it into
+            memory. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: The data set with its index restored.
+
+    """
+    if columns is not None:
+        index_columns = feather.read_table(path, columns=[], memory_map=True)
+        index_columns = _index_columns(index_columns.schema)
+        columns = [*index_columns, *(c for c in columns if c not in index_columns)]
+    table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    return table.to_pandas(split_blocks=True)
+
+
+def _index_columns(schema):
+    """Get the names of the index columns stored in the pandas metadata of a schema."""
+    metadata = schema.pandas_metadata or {}
+    return [
+        column
+        for column in metadata.get("index_columns", [])
+        if isinstance(column, str)
+    ]
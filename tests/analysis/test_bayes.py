@@ -0,0 +1,110 @@
+"""Tests for the Bayesian estimation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.bayes import (
+    draw_nig,
+    draws_to_store,
+    gibbs_tvp,
+    nig_posterior,
+    posterior_bands,
+    posterior_moments,
+)
+from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.ols import fit_ols_batch, stack_design_matrices
+from nkpc_estimation.analysis.results import results_to_store
+
+
+@pytest.fixture()
+def data():
+    rng = np.random.default_rng(0)
+    design = rng.normal(size=(3, 120, 2))
+    outcome = design[0] @ [0.5, 1.0] + 0.5 * rng.normal(size=120)
+    return outcome, design
+
+
+def test_nig_posterior_with_flat_prior_matches_ols(data):
+    outcome, design = data
+    prior = {"precision": 1e-10, "shape": 0.0, "scale": 0.0}
+    posterior = nig_posterior(outcome, design, prior)
+    batch = fit_ols_batch(outcome, design)
+    np.testing.assert_allclose(posterior["mean"], batch["params"], rtol=1e-6)
+    np.testing.assert_allclose(posterior["scale"], batch["ssr"] / 2, rtol=1e-6)
+
+
+def test_draw_nig_matches_posterior_moments(data):
+    posterior = nig_posterior(*data)
+    mean, cov = posterior_moments(posterior)
+    draws = draw_nig(posterior, n_draws=20_000, n_chains=2, seed=1)
+    assert draws["params"].shape == (3, 2, 20_000, 2)
+    assert draws["params"].dtype == np.float32
+    pooled = draws["params"].reshape(3, -1, 2)
+    np.testing.assert_allclose(pooled.mean(axis=1), mean, atol=3e-3)
+    for i in range(3):
+        np.testing.assert_allclose(
+            np.cov(pooled[i].T), cov[i], atol=0.05 * cov[i].max()
+        )
+
+
+def test_draw_nig_does_not_depend_on_workers(data):
+    posterior = nig_posterior(*data)
+    serial = draw_nig(posterior, n_draws=10, n_chains=2, seed=3, n_workers=1)
+    parallel = draw_nig(posterior, n_draws=10, n_chains=2, seed=3, n_workers=2)
+    np.testing.assert_array_equal(serial["params"], parallel["params"])
+
+
+def test_gibbs_tvp_recovers_constant_coefficients(data):
+    outcome, design = data
+    draws = gibbs_tvp(
+        outcome,
+        design[:1],
+        state_scale=1e-4,
+        n_draws=100,
+        n_burn=100,
+        n_chains=1,
+    )
+    assert draws["paths"].shape == (1, 1, 100, 120, 2)
+    bands = posterior_bands(draws["paths"])
+    assert bands.shape == (1, 3, 120, 2)
+    np.testing.assert_allclose(bands[0, 1].mean(axis=0), [0.5, 1.0], atol=0.15)
+    assert np.all(bands[0, 0] <= bands[0, 2])
+
+
+def test_draws_to_store(data):
+    draws = draw_nig(nig_posterior(*data), n_draws=5, n_chains=1)
+    store = draws_to_store(draws, [("a", "b"), ("a", "c"), ("d", "b")], date="2000")
+    assert store["feature_2"].tolist() == ["b", "c", "b"]
+    assert set(store["date"]) == {"2000"}
+    assert store["sigma2"].dtype == np.float32
+
+
+def test_fit_model_bayes_matches_posterior_moments():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("1990-01-01", periods=60, freq="QS")
+    outcome = pd.Series(rng.normal(size=60), index=index)
+    feature_vars_1 = {
+        name: pd.Series(rng.normal(size=60), index=index) for name in ("a", "b")
+    }
+    feature_vars_2 = {
+        name: pd.Series(rng.normal(size=60), index=index) for name in ("c", "d")
+    }
+    prior = {"mean": 0.0, "precision": 0.01, "shape": 0.01, "scale": 0.01}
+    models, diagnostics = fit_model(
+        outcome,
+        feature_vars_1,
+        feature_vars_2,
+        model_type="Bayes",
+        prior=prior,
+        return_diagnostics=True,
+    )
+    ols_models = fit_model(outcome, feature_vars_1, feature_vars_2, model_type="OLS")
+    assert list(models) == list(ols_models)
+    _, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    mean = posterior_moments(nig_posterior(outcome, design, prior))[0]
+    np.testing.assert_allclose(
+        np.array([model.params for model in models.values()]),
+        mean,
+    )
+    store = results_to_store(models, "Bayes", diagnostics=diagnostics)
+    assert (store["cov_type"] == "posterior").all()
@@ -0,0 +1,58 @@
+"""Tests for the block bootstrap."""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.bootstrap import (
+    block_bootstrap_indices,
+    bootstrap_ols,
+    bootstrap_summary,
+)
+
+
+@pytest.fixture()
+def data():
+    np.random.seed(123)
+    n = 200
+    design = np.random.normal(size=(n, 2))
+    outcome = design @ np.array([0.5, -1.0]) + np.random.normal(size=n)
+    return outcome, design
+
+
+@pytest.mark.parametrize("method", ["moving", "stationary"])
+def test_block_bootstrap_indices(method):
+    rng = np.random.default_rng(0)
+    indices = block_bootstrap_indices(50, 100, 5, method=method, rng=rng)
+    assert indices.shape == (100, 50)
+    assert indices.min() >= 0
+    assert indices.max() < 50
+
+
+def test_block_bootstrap_indices_moving_blocks_are_contiguous():
+    rng = np.random.default_rng(0)
+    indices = block_bootstrap_indices(50, 10, 5, method="moving", rng=rng)
+    blocks = indices.reshape(10, 10, 5)
+    assert (np.diff(blocks, axis=2) == 1).all()
+
+
+def test_block_bootstrap_indices_error_method():
+    with pytest.raises(ValueError):
+        block_bootstrap_indices(50, 10, 5, method="circular")
+
+
+def test_bootstrap_ols_does_not_depend_on_n_workers(data):
+    outcome, design = data
+    kwargs = {"n_replicates": 250, "chunk_size": 100, "seed": 1}
+    serial = bootstrap_ols(outcome, design, n_workers=1, **kwargs)
+    parallel = bootstrap_ols(outcome, design, n_workers=2, **kwargs)
+    assert serial.shape == (1, 250, 2)
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_bootstrap_summary_close_to_analytic_standard_errors(data):
+    outcome, design = data
+    draws = bootstrap_ols(outcome, design, n_replicates=2_000, block_length=1)
+    summary = bootstrap_summary(draws)
+    expected = sm.OLS(outcome, design).fit(cov_type="HC0")
+    np.testing.assert_allclose(summary["bse"][0], expected.bse, rtol=0.15)
+    assert (summary["ci_lower"] < summary["ci_upper"]).all()
@@ -0,0 +1,47 @@
+"""Tests for the cache of estimation results."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.cache import (
+    evict_cache,
+    hash_inputs,
+    load_store_from_cache,
+    save_store_to_cache,
+)
+
+
+@pytest.fixture()
+def series():
+    index = pd.date_range("2000-01-01", periods=8, freq="QS")
+    return pd.Series(np.arange(8.0), index=index)
+
+
+def test_hash_inputs_depends_on_data_window_and_options(series):
+    key = hash_inputs(series, model_type="OLS")
+    assert key == hash_inputs(series.copy(), model_type="OLS")
+    assert key == hash_inputs(series.rename("other"), model_type="OLS")
+    assert key != hash_inputs(series + 1, model_type="OLS")
+    assert key != hash_inputs(series.iloc[1:], model_type="OLS")
+    assert key != hash_inputs(series, model_type="OLS", maxlags=2)
+
+
+def test_evict_cache_removes_least_recently_used(tmp_path):
+    for i, name in enumerate(["old", "middle", "new"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (i, i))
+    removed = evict_cache(tmp_path, max_bytes=20)
+    assert removed == ["old"]
+    assert sorted(os.listdir(tmp_path)) == ["middle", "new"]
+
+
+def test_save_and_load_store_from_cache(tmp_path):
+    store = {"params": np.ones((1, 2)), "model": np.array(["OLS"])}
+    assert load_store_from_cache(tmp_path, "key") is None
+    save_store_to_cache(tmp_path, "key", store)
+    loaded = load_store_from_cache(tmp_path, "key")
+    np.testing.assert_array_equal(loaded["params"], store["params"])
+    assert loaded["model"][0] == "OLS"
@@ -0,0 +1,50 @@
+"""Tests for the batched specification tests."""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.diagnostics import batch_diagnostics, diagnostics_to_frame
+from nkpc_estimation.analysis.ols import fit_ols_batch
+from statsmodels.stats.diagnostic import acorr_breusch_godfrey, het_breuschpagan
+
+DESIRED_PRECISION = 10e-8
+
+
+@pytest.fixture()
+def data():
+    np.random.seed(123)
+    n = 120
+    design = np.random.normal(size=(3, n, 2))
+    design[2, :, 0] = 1
+    outcome = 0.1 * np.random.normal(size=n).cumsum() + np.random.normal(size=n)
+    outcome *= 1 + np.abs(design[0, :, 1])
+    return outcome, design
+
+
+def test_batch_diagnostics_matches_statsmodels(data):
+    outcome, design = data
+    diagnostics = batch_diagnostics(fit_ols_batch(outcome, design), nlags=4)
+    for i in range(design.shape[0]):
+        results = sm.OLS(outcome, design[i]).fit()
+        bg_lm, bg_pvalue = acorr_breusch_godfrey(results, nlags=4)[:2]
+        bp_lm, bp_pvalue = het_breuschpagan(results.resid, sm.add_constant(design[i]))[
+            :2
+        ]
+        np.testing.assert_allclose(
+            [
+                diagnostics["bg_lm"][i],
+                diagnostics["bg_pvalue"][i],
+                diagnostics["bp_lm"][i],
+                diagnostics["bp_pvalue"][i],
+            ],
+            [bg_lm, bg_pvalue, bp_lm, bp_pvalue],
+            rtol=DESIRED_PRECISION,
+        )
+
+
+def test_diagnostics_to_frame(data):
+    outcome, design = data
+    diagnostics = batch_diagnostics(fit_ols_batch(outcome, design))
+    frame = diagnostics_to_frame(diagnostics, [("a", "x"), ("b", "x"), ("c", "x")])
+    assert list(frame.columns) == ["bg_lm", "bg_pvalue", "bp_lm", "bp_pvalue"]
+    assert frame.index.names == ["feature_1", "feature_2"]
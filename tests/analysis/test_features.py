@@ -0,0 +1,70 @@
+"""Tests for the feature registry."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.features import (
+    FEATURES,
+    clear_cache,
+    get_feature,
+    get_feature_vars,
+    load_pipeline,
+    pipeline_feature,
+)
+from nkpc_estimation.data_management.transformations import derive
+from nkpc_estimation.utilities import save_panel
+
+
+@pytest.fixture()
+def path(tmp_path):
+    np.random.seed(123)
+    index = pd.date_range("2000-01-01", periods=12, freq="QS", name="TIME")
+    columns = {column for spec in FEATURES.values() for column in spec["columns"]}
+    data = pd.DataFrame(
+        np.random.normal(size=(12, len(columns))),
+        index=index,
+        columns=sorted(columns),
+    )
+    path = tmp_path / "data.arrow"
+    save_panel(data, path)
+    yield path
+    clear_cache()
+
+
+def test_get_feature_derived_variable(path):
+    gap = get_feature("Unemp_Gap", path)
+    data = pd.read_feather(path)
+    np.testing.assert_allclose(gap, data["Unemployment"] - data["NAIRU"])
+    assert gap.name == "Unemp_Gap"
+
+
+def test_get_feature_is_memoized_by_window(path):
+    full = get_feature("MSC", path)
+    window = get_feature("MSC", path, start="2001-01-01")
+    assert get_feature("MSC", path) is full
+    assert get_feature("MSC", path, start="2001-01-01") is window
+    assert window.index[0] == pd.Timestamp("2001-01-01")
+    assert len(window) == 8
+
+
+def test_get_feature_vars(path):
+    feature_vars_1, feature_vars_2 = get_feature_vars(path)
+    assert list(feature_vars_1) == ["Unemp", "Unemp_Gap", "Labor_share", "GDP"]
+    assert list(feature_vars_2) == ["BackExp", "MSC"]
+
+
+def test_get_feature_error_unknown_name(path):
+    with pytest.raises(KeyError):
+        get_feature("Output_Gap", path)
+
+
+def test_load_pipeline_shares_derived_series(path):
+    derived = derive(load_pipeline(path), "Inflation", "rolling_mean", 4)
+    assert derive(load_pipeline(path), "Inflation", "rolling_mean", 4) is derived
+
+
+def test_get_feature_is_memoized_in_pipeline(path):
+    assert get_feature("Unemp_Gap", path) is pipeline_feature(
+        load_pipeline(path),
+        "Unemp_Gap",
+    )
@@ -0,0 +1,188 @@
+"""Tests for the batched instrumental variable estimation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.iv import (
+    fit_gmm_batch,
+    fit_iv_batch,
+    instrument_projection,
+    lagged_instruments,
+)
+from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.ols import batch_bse
+from statsmodels.sandbox.regression.gmm import IV2SLS, IVGMM
+
+
+@pytest.fixture()
+def iv_data():
+    rng = np.random.default_rng(1)
+    instruments = rng.normal(size=(200, 4))
+    design = np.stack(
+        [
+            instruments[:, :2] + 0.5 * instruments[:, 2:] + rng.normal(size=(200, 2)),
+            instruments[:, 1:3] - 0.3 * instruments[:, [0, 3]],
+        ],
+    )
+    outcome = design[0] @ [0.5, 1.0] + rng.normal(size=200)
+    return outcome, design, instruments
+
+
+def test_fit_iv_batch_matches_statsmodels(iv_data):
+    outcome, design, instruments = iv_data
+    batch = fit_iv_batch(outcome, design, instrument_projection(instruments))
+    bse = batch_bse(batch)
+    for i in range(len(design)):
+        expected = IV2SLS(outcome, design[i], instruments).fit()
+        np.testing.assert_allclose(batch["params"][i], expected.params)
+        np.testing.assert_allclose(bse[i], expected.bse)
+        np.testing.assert_allclose(batch["resid"][i], expected.resid)
+
+
+def test_fit_gmm_batch_matches_statsmodels(iv_data):
+    outcome, design, instruments = iv_data
+    batch = fit_gmm_batch(outcome, design, instruments, maxlags=0)
+    for i in range(len(design)):
+        expected = IVGMM(outcome, design[i], instruments).fit(
+            start_params=batch["params"][i],
+            maxiter=100,
+            optim_method="bfgs",
+            weights_method="cov",
+            wargs={"centered": False},
+            optim_args={"gtol": 1e-10, "disp": 0},
+        )
+        np.testing.assert_allclose(batch["params"][i], expected.params, rtol=1e-4)
+        np.testing.assert_allclose(
+            np.sqrt(np.diagonal(batch["cov_params"][i])),
+            expected.bse,
+            rtol=1e-4,
+        )
+        np.testing.assert_allclose(batch["j_stat"][i], expected.jtest()[0], rtol=1e-4)
+
+
+def test_fit_gmm_batch_warm_start_converges_immediately(iv_data):
+    outcome, design, instruments = iv_data
+    batch = fit_gmm_batch(outcome, design, instruments, maxlags=2)
+    warm = fit_gmm_batch(
+        outcome,
+        design,
+        instruments,
+        maxlags=2,
+        weights=batch["weights"],
+    )
+    assert warm["n_iter"] <= 2
+    assert warm["converged"].all()
+    np.testing.assert_allclose(warm["params"], batch["params"], rtol=1e-6)
+
+
+def test_fit_gmm_batch_error_short_sample(iv_data):
+    outcome, design, instruments = iv_data
+    with pytest.raises(ValueError, match="observations per instrument"):
+        fit_gmm_batch(outcome[:15], design[:, :15], instruments[:15])
+
+
+def test_fit_gmm_batch_error_ill_conditioned(iv_data):
+    outcome, design, instruments = iv_data
+    rng = np.random.default_rng(3)
+    collinear = instruments[:, [0]] + 1e-6 * rng.normal(size=(200, 1))
+    with pytest.raises(ValueError, match="ill-conditioned"):
+        fit_gmm_batch(outcome, design, np.hstack([instruments, collinear]))
+
+
+def test_fit_model_gmm_falls_back_to_2sls():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("1990-01-01", periods=12, freq="QS")
+    outcome = pd.Series(rng.normal(size=12), index=index)
+    feature_vars_1 = {"a": pd.Series(rng.normal(size=12), index=index)}
+    feature_vars_2 = {"b": pd.Series(rng.normal(size=12), index=index)}
+    options = {"maxlags": 1, "instrument_lags": 1, "return_diagnostics": True}
+    with pytest.warns(RuntimeWarning, match="GMM falls back to 2SLS"):
+        models, diagnostics = fit_model(
+            outcome,
+            feature_vars_1,
+            feature_vars_2,
+            model_type="GMM",
+            **options,
+        )
+    expected, _ = fit_model(
+        outcome,
+        feature_vars_1,
+        feature_vars_2,
+        model_type="IV",
+        **options,
+    )
+    assert diagnostics["a, b"]["gmm_fallback"] == 1.0
+    np.testing.assert_allclose(models["a, b"].params, expected["a, b"].params)
+    np.testing.assert_allclose(models["a, b"].bse, expected["a, b"].bse)
+
+
+def test_fit_model_gmm_warm_start_and_convergence():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("1990-01-01", periods=80, freq="QS")
+    outcome = pd.Series(rng.normal(size=80), index=index)
+    feature_vars_1 = {"a": pd.Series(rng.normal(size=80), index=index)}
+    feature_vars_2 = {"b": pd.Series(rng.normal(size=80), index=index)}
+    options = {"model_type": "GMM", "maxlags": 2, "return_diagnostics": True}
+    with pytest.warns(RuntimeWarning, match="GMM did not converge in 1 iterations"):
+        _, diagnostics = fit_model(
+            outcome,
+            feature_vars_1,
+            feature_vars_2,
+            max_iter=1,
+            **options,
+        )
+    assert diagnostics["a, b"]["converged"] == 0.0
+    _, cold = fit_model(outcome, feature_vars_1, feature_vars_2, **options)
+    warm_models, warm = fit_model(
+        outcome.iloc[10:],
+        {"a": feature_vars_1["a"].iloc[10:]},
+        {"b": feature_vars_2["b"].iloc[10:]},
+        weights={"a, b": cold["a, b"]["weights"]},
+        **options,
+    )
+    expected, _ = fit_model(
+        outcome.iloc[10:],
+        {"a": feature_vars_1["a"].iloc[10:]},
+        {"b": feature_vars_2["b"].iloc[10:]},
+        **options,
+    )
+    assert warm["a, b"]["converged"] == 1.0
+    np.testing.assert_allclose(
+        warm_models["a, b"].params,
+        expected["a, b"].params,
+        rtol=1e-6,
+    )
+
+
+def test_lagged_instruments():
+    variable = pd.Series([1.0, 2.0, 3.0])
+    instruments = lagged_instruments({"x": variable}, lags=2)
+    assert list(instruments) == ["x_lag1", "x_lag2"]
+    assert instruments.iloc[2].tolist() == [2.0, 1.0]
+
+
+@pytest.mark.parametrize("model_type", ["IV", "GMM"])
+def test_fit_model_instrumental(model_type):
+    rng = np.random.default_rng(2)
+    index = pd.date_range("1990-01-01", periods=80, freq="QS")
+    outcome = pd.Series(rng.normal(size=80), index=index)
+    feature_vars_1 = {"a": pd.Series(rng.normal(size=80), index=index)}
+    feature_vars_2 = {
+        name: pd.Series(rng.normal(size=80), index=index) for name in ("b", "c")
+    }
+    models, diagnostics = fit_model(
+        outcome,
+        feature_vars_1,
+        feature_vars_2,
+        model_type=model_type,
+        maxlags=2,
+        instrument_lags=2,
+        return_diagnostics=True,
+    )
+    assert list(models) == ["a, b", "a, c"]
+    result = models["a, b"]
+    assert result.nobs == 78
+    assert result.cov_type == "HAC"
+    assert result.cov_kwds["maxlags"] == 2
+    np.testing.assert_allclose(result.bse, np.sqrt(np.diag(result.cov_params())))
+    assert 0 <= diagnostics["a, b"]["j_pvalue"] <= 1
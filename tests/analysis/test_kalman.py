@@ -0,0 +1,123 @@
+"""Tests for the state space model with random walk coefficients."""
+
+import numpy as np
+import pytest
+from nkpc_estimation.analysis.kalman import (
+    _filter_kernel,
+    fit_tvp,
+    tvp_filter,
+    tvp_loglike_grid,
+    tvp_smoother,
+)
+from statsmodels.tsa.statespace.mlemodel import MLEModel
+
+
+@pytest.fixture()
+def data():
+    rng = np.random.default_rng(0)
+    design = rng.normal(size=(3, 120, 2))
+    coefficients = np.cumsum(0.1 * rng.normal(size=(120, 2)), axis=0) + [0.5, 1.0]
+    outcome = np.einsum("nk,nk->n", design[0], coefficients)
+    outcome += 0.5 * rng.normal(size=120)
+    log_variances = np.log([[0.25, 0.01, 0.02], [0.3, 0.005, 0.01], [0.2, 0.02, 0.01]])
+    return outcome, design, log_variances
+
+
+def _statsmodels_model(outcome, design, log_variances):
+    variances = np.exp(log_variances)
+    model = MLEModel(
+        outcome,
+        k_states=2,
+        initialization="known",
+        initial_state=np.zeros(2),
+        initial_state_cov=1e6 * np.eye(2),
+        loglikelihood_burn=2,
+    )
+    model["design"] = design.T[None]
+    model["transition"] = np.eye(2)
+    model["selection"] = np.eye(2)
+    model["obs_cov"] = [[variances[0]]]
+    model["state_cov"] = np.diag(variances[1:])
+    return model
+
+
+def test_tvp_filter_and_smoother_match_statsmodels(data):
+    outcome, design, log_variances = data
+    filtered = tvp_filter(outcome, design, log_variances)
+    loglike = filtered["loglike"].copy()
+    smoothed = tvp_smoother(filtered)
+    for i in range(3):
+        model = _statsmodels_model(outcome, design[i], log_variances[i])
+        np.testing.assert_allclose(loglike[i], model.ssm.loglike())
+        expected = model.ssm.smooth()
+        np.testing.assert_allclose(
+            smoothed["smoothed_mean"][i],
+            expected.smoothed_state.T,
+            atol=1e-6,
+        )
+
+
+def test_tvp_filter_score_matches_finite_differences(data):
+    outcome, design, log_variances = data
+    score = tvp_filter(
+        outcome,
+        design,
+        log_variances,
+        initial_variance=10.0,
+        gradient=True,
+    )["score"].copy()
+    expected = np.empty_like(score)
+    for j in range(3):
+        step = np.zeros_like(log_variances)
+        step[:, j] = 1e-5
+        upper = tvp_filter(outcome, design, log_variances + step, 10.0)["loglike"]
+        lower = tvp_filter(outcome, design, log_variances - step, 10.0)["loglike"]
+        expected[:, j] = (upper - lower) / 2e-5
+    np.testing.assert_allclose(score, expected, atol=1e-6)
+
+
+def test_filter_kernel_matches_vectorized_filter(data):
+    outcome, design, log_variances = data
+    filtered = tvp_filter(outcome, design, log_variances)
+    shape = design.shape
+    filtered_mean = np.empty(shape)
+    filtered_cov = np.empty((*shape, 2))
+    predicted_cov = np.empty((*shape, 2))
+    loglike = np.empty(3)
+    _filter_kernel(
+        outcome,
+        design,
+        np.exp(log_variances),
+        1e6,
+        filtered_mean,
+        filtered_cov,
+        predicted_cov,
+        loglike,
+    )
+    np.testing.assert_allclose(loglike, filtered["loglike"])
+    np.testing.assert_allclose(filtered_mean, filtered["filtered_mean"], atol=1e-8)
+
+
+def test_fit_tvp_maximizes_loglike(data):
+    outcome, design, _ = data
+    fitted = fit_tvp(outcome, design)
+    assert fitted["converged"]
+    assert fitted["smoothed_mean"].shape == (3, 120, 2)
+    offsets = np.linspace(-1, 1, 5)
+    shifts = np.zeros((5, 3))
+    shifts[:, 1] = offsets
+    grid = tvp_loglike_grid(
+        outcome,
+        design,
+        fitted["log_variances"][:, None] + shifts,
+    )
+    np.testing.assert_allclose(grid[:, 2], fitted["loglike"])
+    assert np.all(grid.max(axis=1) <= fitted["loglike"] + 1e-6)
+
+
+def test_numba_engine(data):
+    pytest.importorskip("numba")
+    outcome, design, log_variances = data
+    expected = tvp_filter(outcome, design, log_variances)["loglike"].copy()
+    loglike = tvp_filter(outcome, design, log_variances, engine="numba")["loglike"]
+    np.testing.assert_allclose(loglike, expected)
@@ -1,9 +1,11 @@
 """Tests for the regression model."""
 
+import inspect
+
 import numpy as np
 import pandas as pd
 import pytest
-from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.model import MODEL_OPTIONS, MODEL_TYPES, fit_model
 
 DESIRED_PRECISION = 10e-2
 
@@ -30,3 +32,10 @@ def test_fit_model_error_model_type(random_data):
     random_data["model_type"] = "quadratic"
     with pytest.raises(ValueError):
         assert fit_model(**random_data)
+
+
+def test_model_options_are_arguments_of_fit_model():
+    arguments = inspect.signature(fit_model).parameters
+    assert set(MODEL_OPTIONS) == set(MODEL_TYPES)
+    for options in MODEL_OPTIONS.values():
+        assert set(options) <= set(arguments)
@@ -0,0 +1,123 @@
+"""Tests for the batched least squares estimation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.ols import (
+    batch_bse,
+    batch_cov_params,
+    fit_ols_batch,
+    newey_west_maxlags,
+    stack_design_matrices,
+    to_results,
+)
+
+DESIRED_PRECISION = 10e-8
+
+
+@pytest.fixture()
+def grid_data():
+    np.random.seed(123)
+    n = 100
+    outcome = pd.Series(np.random.normal(size=n))
+    feature_vars_1 = {
+        "a": pd.Series(np.random.normal(size=n)),
+        "b": pd.Series(np.random.normal(size=n)),
+    }
+    feature_vars_2 = {
+        "c": pd.Series(np.random.normal(size=n)),
+        "d": pd.Series(np.random.normal(size=n)),
+        "e": pd.Series(np.random.normal(size=n)),
+    }
+    return outcome, feature_vars_1, feature_vars_2
+
+
+def test_stack_design_matrices(grid_data):
+    _, feature_vars_1, feature_vars_2 = grid_data
+    pairs, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    assert design.shape == (6, 100, 2)
+    assert pairs[1] == ("a", "d")
+    np.testing.assert_array_equal(design[1, :, 0], feature_vars_1["a"])
+    np.testing.assert_array_equal(design[1, :, 1], feature_vars_2["d"])
+
+
+def test_fit_ols_batch_matches_statsmodels(grid_data):
+    outcome, feature_vars_1, feature_vars_2 = grid_data
+    _, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    batch = fit_ols_batch(outcome, design)
+    for i in range(design.shape[0]):
+        expected = sm.OLS(outcome, design[i]).fit()
+        expected_hac = sm.OLS(outcome, design[i]).fit(
+            cov_type="HAC",
+            cov_kwds={"maxlags": 4},
+        )
+        np.testing.assert_allclose(
+            batch["params"][i],
+            expected.params,
+            rtol=DESIRED_PRECISION,
+        )
+        np.testing.assert_allclose(
+            batch_bse(batch)[i],
+            expected.bse,
+            rtol=DESIRED_PRECISION,
+        )
+        np.testing.assert_allclose(
+            batch_bse(batch, "HAC", maxlags=4)[i],
+            expected_hac.bse,
+            rtol=DESIRED_PRECISION,
+        )
+        np.testing.assert_allclose(
+            batch["rsquared"][i],
+            expected.rsquared,
+            rtol=DESIRED_PRECISION,
+        )
+
+
+@pytest.mark.parametrize(
+    ("cov_type", "cov_kwds"),
+    [
+        ("HC0", {}),
+        ("HC1", {}),
+        ("HC2", {}),
+        ("HC3", {}),
+        ("HAC", {"maxlags": 2, "kernel": "uniform"}),
+        ("HAC", {"maxlags": 3, "kernel": "bartlett"}),
+    ],
+)
+def test_batch_cov_params_matches_statsmodels(grid_data, cov_type, cov_kwds):
+    outcome, feature_vars_1, feature_vars_2 = grid_data
+    _, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    batch = fit_ols_batch(outcome, design)
+    cov = batch_cov_params(batch, cov_type, **cov_kwds)
+    expected = sm.OLS(outcome, design[2]).fit(cov_type=cov_type, cov_kwds=cov_kwds)
+    np.testing.assert_allclose(cov[2], expected.cov_params(), rtol=DESIRED_PRECISION)
+    assert batch_cov_params(batch, cov_type, **cov_kwds) is cov
+
+
+def test_batch_cov_params_auto_maxlags(grid_data):
+    outcome, feature_vars_1, feature_vars_2 = grid_data
+    _, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    batch = fit_ols_batch(outcome, design)
+    batch_cov_params(batch, "HAC", maxlags="auto")
+    assert ("HAC", newey_west_maxlags(100), "bartlett") in batch["cov_params"]
+    with pytest.raises(ValueError):
+        batch_cov_params(batch, "HAC", kernel="parzen")
+
+
+def test_fit_ols_batch_error_design_shape(grid_data):
+    outcome, feature_vars_1, _ = grid_data
+    with pytest.raises(ValueError):
+        fit_ols_batch(outcome, np.column_stack(list(feature_vars_1.values())))
+
+
+def test_to_results_matches_statsmodels(grid_data):
+    outcome, feature_vars_1, feature_vars_2 = grid_data
+    _, design = stack_design_matrices(feature_vars_1, feature_vars_2)
+    batch = fit_ols_batch(outcome, design)
+    result = to_results(outcome, design[0], batch, 0, "HAC", {"maxlags": 4})
+    expected = sm.OLS(outcome, design[0]).fit(cov_type="HAC", cov_kwds={"maxlags": 4})
+    np.testing.assert_allclose(result.bse, expected.bse, rtol=DESIRED_PRECISION)
+    np.testing.assert_allclose(result.resid, expected.resid, atol=DESIRED_PRECISION)
+    assert result.df_resid == expected.df_resid
+    assert result.cov_type == "HAC"
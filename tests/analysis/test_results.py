@@ -0,0 +1,105 @@
+"""Tests for the results store."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.features import FEATURES, clear_cache, get_feature
+from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.results import (
+    concat_stores,
+    load_results,
+    rehydrate_results,
+    results_index,
+    results_to_frame,
+    results_to_store,
+    save_results,
+    select_models,
+)
+from nkpc_estimation.utilities import save_panel
+
+
+@pytest.fixture()
+def data_path(tmp_path):
+    np.random.seed(123)
+    index = pd.date_range("1990-01-01", periods=80, freq="QS", name="TIME")
+    columns = sorted({c for spec in FEATURES.values() for c in spec["columns"]})
+    data = pd.DataFrame(
+        np.random.normal(size=(80, len(columns))),
+        index=index,
+        columns=columns,
+    )
+    path = tmp_path / "data.arrow"
+    save_panel(data, path)
+    yield path
+    clear_cache()
+
+
+@pytest.fixture()
+def fitted(data_path):
+    def _fit(start):
+        return fit_model(
+            get_feature("Inflation", data_path, start),
+            {"Unemp": get_feature("Unemp", data_path, start)},
+            {name: get_feature(name, data_path, start) for name in ("BackExp", "MSC")},
+            model_type="OLS",
+            maxlags=2,
+            return_diagnostics=True,
+        )
+
+    return _fit
+
+
+def test_save_and_load_results(fitted, tmp_path):
+    models, diagnostics = fitted(None)
+    store = results_to_store(models, "OLS", diagnostics=diagnostics)
+    save_results(store, tmp_path / "results.npz")
+    loaded = load_results(tmp_path / "results.npz")
+    assert list(loaded) == list(store)
+    np.testing.assert_array_equal(loaded["params"], store["params"])
+    np.testing.assert_allclose(
+        loaded["bse"][1],
+        models["Unemp, MSC"].bse,
+    )
+    assert loaded["bg_pvalue"][0] == diagnostics["Unemp, BackExp"]["bg_pvalue"]
+
+
+def test_results_index_and_frame(fitted):
+    stores = [
+        results_to_store(fitted(None)[0], "OLS"),
+        results_to_store(fitted("2000-01-01")[0], "OLS", "2000-01-01"),
+    ]
+    store = concat_stores(stores)
+    index = results_index(store)
+    assert index.names == ["feature_1", "feature_2", "model", "date"]
+    assert ("Unemp", "MSC", "OLS", "2000-01-01") in index
+    assert len(results_to_frame(store)) == 2 * len(index)
+
+
+@pytest.mark.parametrize("start", [None, "2000-01-01"])
+def test_rehydrate_results_matches_fitted_model(fitted, data_path, start):
+    models, _ = fitted(start)
+    store = results_to_store(models, "OLS", start)
+    key = ("Unemp", "MSC", "OLS", store["date"][0])
+    result = rehydrate_results(store, key, data_path)
+    expected = models["Unemp, MSC"]
+    assert result.cov_type == expected.cov_type
+    np.testing.assert_allclose(result.params, expected.params)
+    np.testing.assert_allclose(result.bse, expected.bse)
+    np.testing.assert_allclose(result.rsquared, expected.rsquared)
+
+
+def test_select_models_splits_store(fitted):
+    models, diagnostics = fitted(None)
+    store = results_to_store(models, "OLS", diagnostics=diagnostics)
+    parts = [select_models(store, [position]) for position in (1, 0)]
+    combined = concat_stores(parts)
+    assert list(results_index(combined)) == list(results_index(store))[::-1]
+    np.testing.assert_array_equal(combined["params"], store["params"][::-1])
+
+
+def test_results_to_store_skips_non_scalar_diagnostics(fitted):
+    models, _ = fitted(None)
+    diagnostics = {key: {"j_pvalue": 0.5, "weights": np.eye(2)} for key in models}
+    store = results_to_store(models, "GMM", diagnostics=diagnostics)
+    assert "weights" not in store
+    np.testing.assert_array_equal(store["j_pvalue"], 0.5)
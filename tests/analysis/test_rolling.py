@@ -0,0 +1,59 @@
+"""Tests for the rolling window estimation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.rolling import rolling_ols, rolling_path_to_frame
+
+DESIRED_PRECISION = 10e-8
+
+
+@pytest.fixture()
+def data():
+    np.random.seed(123)
+    n = 60
+    design = np.random.normal(size=(n, 2))
+    outcome = design @ np.array([0.5, -1.0]) + np.random.normal(size=n)
+    return outcome, design
+
+
+@pytest.mark.parametrize(
+    ("method", "options", "position", "sample"),
+    [
+        ("expanding", {"min_nobs": 10}, 5, slice(0, 15)),
+        ("rolling", {"window": 20}, 3, slice(3, 23)),
+        ("backward", {"min_nobs": 10}, 7, slice(7, 60)),
+    ],
+)
+def test_rolling_ols_matches_statsmodels(data, method, options, position, sample):
+    outcome, design = data
+    path = rolling_ols(outcome, design, method=method, **options)
+    expected = sm.OLS(outcome[sample], design[sample]).fit()
+    np.testing.assert_allclose(
+        path["params"][0, position],
+        expected.params,
+        rtol=DESIRED_PRECISION,
+    )
+    np.testing.assert_allclose(
+        path["bse"][0, position],
+        expected.bse,
+        rtol=DESIRED_PRECISION,
+    )
+    assert path["nobs"][position] == expected.nobs
+
+
+def test_rolling_ols_error_missing_window(data):
+    outcome, design = data
+    with pytest.raises(ValueError):
+        rolling_ols(outcome, design, method="rolling")
+
+
+def test_rolling_path_to_frame(data):
+    outcome, design = data
+    index = pd.date_range("2000-01-01", periods=len(outcome), freq="QS")
+    path = rolling_ols(outcome, design, method="rolling", window=20)
+    frame = rolling_path_to_frame(path, index, ["x1", "x2"])
+    assert list(frame.columns) == ["params_x1", "params_x2", "bse_x1", "bse_x2", "nobs"]
+    assert frame.index[0] == index[19]
+    assert len(frame) == len(outcome) - 19
@@ -0,0 +1,55 @@
+"""Tests for the parallel grid runner."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.analysis.features import FEATURES
+from nkpc_estimation.analysis.model import fit_model
+from nkpc_estimation.analysis.results import load_results
+from nkpc_estimation.analysis.runner import run_grid
+from nkpc_estimation.utilities import load_panel, save_panel
+
+
+@pytest.fixture()
+def data_path(tmp_path):
+    np.random.seed(123)
+    index = pd.date_range("1990-01-01", periods=80, freq="QS", name="TIME")
+    columns = sorted({c for spec in FEATURES.values() for c in spec["columns"]})
+    data = pd.DataFrame(
+        np.random.normal(size=(80, len(columns))),
+        index=index,
+        columns=columns,
+    )
+    path = tmp_path / "data.arrow"
+    save_panel(data, path)
+    return path
+
+
+def test_run_grid_matches_fit_model(data_path, tmp_path):
+    grid = {
+        "Unemp_MSC_OLS": {"model": "OLS", "feature_1": "Unemp", "feature_2": "MSC"},
+        "GDP_BackExp_OLS_2000-01-01": {
+            "model": "OLS",
+            "feature_1": "GDP",
+            "feature_2": "BackExp",
+            "date": "2000-01-01",
+        },
+    }
+    produces = {
+        ("OLS", None): tmp_path / "results_OLS.npz",
+        ("OLS", "2000-01-01"): tmp_path / "results_OLS_2000-01-01.npz",
+    }
+    results = dict(run_grid(grid, data_path, produces=produces, n_workers=2))
+    assert results == produces
+
+    data = load_panel(data_path).loc["2000-01-01":]
+    expected = fit_model(
+        data["Inflation"],
+        {"GDP": data["GDP"]},
+        {"BackExp": data["Backward_Expectations_Inflation"]},
+        model_type="OLS",
+    )["GDP, BackExp"]
+    store = load_results(produces["OLS", "2000-01-01"])
+    assert list(store["feature_1"]) == ["GDP"]
+    np.testing.assert_allclose(store["params"][0], expected.params)
+    assert store["nobs"][0] == expected.nobs
@@ -1,7 +1,15 @@
 """Tests for the sensitivity analysis."""
 
+import numpy as np
 import pandas as pd
-from nkpc_estimation.analysis.sensitivity import break_point_analysis
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.sensitivity import (
+    break_point_analysis,
+    break_scan,
+    break_scan_to_frame,
+    chow_statistics,
+)
 
 
 def test_break_point_analysis():
@@ -19,3 +27,71 @@ def test_break_point_analysis():
     # Test that the function returns a dictionary
     result = break_point_analysis(df, outcome_variable, feature_variables, dates)
     assert isinstance(result, dict)
+
+
+@pytest.fixture()
+def break_data():
+    np.random.seed(123)
+    n = 80
+    feature = np.random.normal(size=n)
+    slope = np.where(np.arange(n) < 50, 1.0, -1.0)
+    outcome = slope * feature + 0.1 * np.random.normal(size=n)
+    return outcome, np.column_stack((np.ones(n), feature))
+
+
+def test_chow_statistics_matches_separate_fits(break_data):
+    outcome, design = break_data
+    chow = chow_statistics(outcome, design)
+    position = 30
+    column = list(chow["index"]).index(position)
+    ssr_pooled = sm.OLS(outcome, design).fit().ssr
+    ssr_1 = sm.OLS(outcome[:position], design[:position]).fit().ssr
+    ssr_2 = sm.OLS(outcome[position:], design[position:]).fit().ssr
+    expected = ((ssr_pooled - ssr_1 - ssr_2) / 2) / ((ssr_1 + ssr_2) / (80 - 4))
+    np.testing.assert_allclose(chow["f_statistic"][0, column], expected, rtol=1e-6)
+
+
+def test_break_scan_finds_break(break_data):
+    outcome, design = break_data
+    scan = break_scan(outcome, design, trim=0.15)
+    assert scan["index"][0] == 12
+    assert scan["index"][-1] == 68
+    assert scan["sup_index"][0] == 50
+    assert scan["sup_wald"][0] >= scan["exp_wald"][0]
+    assert scan["sup_wald"][0] >= scan["avg_wald"][0]
+
+
+def test_break_scan_matches_brute_force_wald():
+    rng = np.random.default_rng(5)
+    n = 30
+    design = np.column_stack((np.ones(n), rng.normal(size=n)))
+    outcome = design @ [0.5, 1.0] + rng.normal(size=n)
+    scan = break_scan(outcome, design, trim=0.2)
+    ssr_pooled = sm.OLS(outcome, design).fit().ssr
+    wald = []
+    for position in range(6, n - 5):
+        ssr_1 = sm.OLS(outcome[:position], design[:position]).fit().ssr
+        ssr_2 = sm.OLS(outcome[position:], design[position:]).fit().ssr
+        f_statistic = ((ssr_pooled - ssr_1 - ssr_2) / 2) / ((ssr_1 + ssr_2) / (n - 4))
+        wald.append(2 * f_statistic)
+    wald = np.array(wald)
+    np.testing.assert_array_equal(scan["index"], np.arange(6, n - 5))
+    np.testing.assert_allclose(scan["sup_wald"][0], wald.max())
+    np.testing.assert_allclose(scan["avg_wald"][0], wald.mean())
+    np.testing.assert_allclose(scan["exp_wald"][0], np.log(np.mean(np.exp(wald / 2))))
+
+
+def test_break_scan_error_trim(break_data):
+    outcome, design = break_data
+    with pytest.raises(ValueError):
+        break_scan(outcome, design, trim=0.6)
+
+
+def test_break_scan_to_frame(break_data):
+    outcome, design = break_data
+    index = pd.date_range("2000-01-01", periods=len(outcome), freq="QS")
+    scan = break_scan(outcome, design)
+    statistics, summary = break_scan_to_frame(scan, index, ["x"])
+    assert list(statistics.columns) == ["model", "date", "f_statistic", "p_value"]
+    assert len(statistics) == len(scan["index"])
+    assert summary.loc["x", "sup_date"] == index[50]
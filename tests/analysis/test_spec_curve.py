@@ -0,0 +1,159 @@
+"""Tests for the specification curve analysis."""
+
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.spec_curve import (
+    SPEC_DIMENSIONS,
+    count_specs,
+    iter_specs,
+    preprocess_data,
+    rank_specs,
+    spec_curve,
+    spec_curve_summary,
+)
+from nkpc_estimation.data_management.transformations import transformation_pipeline
+
+
+@pytest.fixture()
+def pipeline():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("1990-01-01", periods=60, freq="QS", name="TIME")
+    columns = ["Inflation", "Unemployment", "NAIRU", "Labor_share", "GDP", "MSC"]
+    data = pd.DataFrame(rng.normal(size=(60, 6)), index=index, columns=columns)
+    data["GDP"] += np.arange(60) * 0.1
+    data["Backward_Expectations_Inflation"] = np.nan
+    return transformation_pipeline(data)
+
+
+@pytest.fixture()
+def choices():
+    return {
+        "expectation_lags": [2, 4],
+        "detrend_order": [None, 1],
+        "start": [None, "2000-01-01", "2002-01-01"],
+        "end": [None, "2001-10-01"],
+        "model": ["OLS", "IV"],
+        "feature_1": ["Unemp", "GDP"],
+        "feature_2": ["BackExp", "MSC"],
+        "hac_maxlags": [0, 2],
+    }
+
+
+def test_iter_specs_is_lazy_and_ordered(choices):
+    specs = iter_specs(choices)
+    assert isinstance(specs, types.GeneratorType)
+    first = next(specs)
+    assert list(first) == list(SPEC_DIMENSIONS)
+    assert first["hac_maxlags"] == 0
+    assert next(specs)["hac_maxlags"] == 2
+    assert sum(1 for _ in iter_specs(choices)) == count_specs(choices)
+
+
+def test_iter_specs_unknown_dimension():
+    with pytest.raises(ValueError, match="Unknown specification dimensions"):
+        next(iter_specs({"lags": [1]}))
+
+
+def test_preprocess_data_does_not_modify_input(pipeline):
+    data = pipeline["data"]
+    original = data.copy()
+    transformed = preprocess_data(pipeline, expectation_lags=3, detrend_order=1)
+    pd.testing.assert_frame_equal(data, original)
+    np.testing.assert_allclose(
+        transformed["Backward_Expectations_Inflation"].iloc[3:],
+        data["Inflation"].rolling(3).mean().iloc[3:],
+    )
+    trend = np.polyval(np.polyfit(np.arange(60), data["GDP"], 1), np.arange(60))
+    np.testing.assert_allclose(transformed["GDP"], data["GDP"] - trend)
+
+
+def test_preprocess_data_keeps_columns_of_names(pipeline):
+    transformed = preprocess_data(
+        pipeline,
+        expectation_lags=2,
+        detrend_order=None,
+        names=["BackExp", "GDP"],
+    )
+    assert sorted(transformed) == ["Backward_Expectations_Inflation", "GDP"]
+    pd.testing.assert_series_equal(transformed["GDP"], pipeline["data"]["GDP"])
+
+
+def test_spec_curve_rows_follow_enumeration(pipeline, choices):
+    table = spec_curve(pipeline, choices, min_nobs=10)
+    valid = [
+        spec
+        for spec in iter_specs(choices)
+        if spec["start"] is None or spec["end"] is None
+    ]
+    specs = table[list(SPEC_DIMENSIONS)].reset_index(drop=True).astype(object)
+    pd.testing.assert_frame_equal(
+        specs.where(specs.notna(), None),
+        pd.DataFrame(valid, dtype=object),
+    )
+    assert table.index.name == "spec"
+
+
+def test_spec_curve_matches_statsmodels(pipeline, choices):
+    table = spec_curve(pipeline, choices, min_nobs=10)
+    transformed = preprocess_data(pipeline, expectation_lags=4, detrend_order=1)
+    sample = transformed.loc["2000-01-01":]
+    design = sample[["GDP", "MSC"]]
+    expected = sm.OLS(sample["Inflation"], design).fit(
+        cov_type="HAC",
+        cov_kwds={"maxlags": 2},
+    )
+    spec = {
+        "expectation_lags": 4,
+        "detrend_order": 1,
+        "start": "2000-01-01",
+        "end": None,
+        "model": "OLS",
+        "feature_1": "GDP",
+        "feature_2": "MSC",
+        "hac_maxlags": 2,
+    }
+    selected = np.logical_and.reduce(
+        [
+            table[name].isna() if value is None else table[name] == value
+            for name, value in spec.items()
+        ],
+    )
+    (row,) = table[selected].to_dict("records")
+    np.testing.assert_allclose([row["params_1"], row["params_2"]], expected.params)
+    np.testing.assert_allclose([row["bse_1"], row["bse_2"]], expected.bse)
+    np.testing.assert_allclose([row["pvalues_1"], row["pvalues_2"]], expected.pvalues)
+    assert row["nobs"] == len(sample)
+
+
+def test_spec_curve_error_model_type(pipeline, choices):
+    with pytest.raises(ValueError, match="Unsupported model types"):
+        spec_curve(pipeline, choices | {"model": ["OLS", "GMM"]})
+
+
+def test_spec_curve_summary():
+    table = pd.DataFrame(
+        {
+            "feature_1": ["a", "a", "a", "b", "GDP", "GDP", "GDP"],
+            "detrend_order": [1.0, np.nan, 2.0, np.nan, np.nan, 1.0, 1.0],
+            "params_1": [1.0, -2.0, 3.0, 0.5, 100.0, 0.1, 0.3],
+            "pvalues_1": [0.01, 0.01, 0.2, 0.5, 0.01, 0.01, 0.5],
+        },
+    )
+    summary = spec_curve_summary(table, position=1, significance=0.05).reset_index()
+    assert summary["feature_1"].tolist() == ["a", "b", "GDP", "GDP"]
+    a = summary.iloc[0]
+    assert a["n_specs"] == 3
+    assert a["median"] == 1.0
+    np.testing.assert_allclose(a["share_positive"], 2 / 3)
+    np.testing.assert_allclose(a["share_significant"], 2 / 3)
+    np.testing.assert_allclose(a["share_significant_negative"], 1 / 3)
+    assert summary.iloc[1]["share_significant"] == 0
+    assert np.isnan(summary.iloc[2]["detrend_order"])
+    assert summary.iloc[2]["n_specs"] == 1
+    assert summary.iloc[3]["detrend_order"] == 1
+    np.testing.assert_allclose(summary.iloc[3]["median"], 0.2)
+    assert rank_specs(table).tolist() == [2, 1, 3, 1, 1, 1, 2]
@@ -9,8 +9,11 @@ from nkpc_estimation.data_management.clean_data import (
     calculate_detrend,
     calculate_growth_rates,
     clean_data,
+    infer_date_format,
     load_data_files,
     merge_data,
+    normalize_dates,
+    quarter_start_dates,
     read_csv_file,
 )
 from nkpc_estimation.utilities import read_yaml
@@ -22,20 +25,20 @@ def setup():
         "data_files": {
             "zip": TEST_DIR / "data_management" / "sample_data" / "data_fixture.zip",
         },
-        "dest_dir": TEST_DIR / "data_management" / "sample_data",
     }
     return out
 
 
-def test_load_zip_files(tmp_path):
-    """Test that the function unzips and loads CSV files correctly from a ZIP file."""
+def test_load_zip_files():
+    """Test that the function loads CSV files correctly from a ZIP file without
+    extracting them."""
     data_files = {
         "data": TEST_DIR / "data_management" / "sample_data" / "data_fixture.zip",
     }
-    dest_dir = tmp_path
-    dataframes = load_data_files(data_files=data_files, dest_dir=dest_dir)
+    dataframes = load_data_files(data_files=data_files)
     assert len(dataframes) == 1
     assert isinstance(dataframes["data"], pd.DataFrame)
+    assert list(dataframes["data"].columns) == ["date", "NAIRU", "col3"]
 
 
 def test_unsupported_file_extension():
@@ -51,16 +54,22 @@ def test_unsupported_file_extension():
         load_data_files(data_files=data_files)
 
 
-def test_load_data_files_missing_dest_dir_for_zip_file_extraction():
-    """Test that the function raises specific AssertionError."""
+def test_load_data_files_member_pattern():
+    """Test that zip members are selected by pattern and that the function raises an
+    error if no member matches."""
     data_files = {
         "data": TEST_DIR / "data_management" / "sample_data" / "data_fixture.zip",
     }
+    dataframes = load_data_files(
+        data_files=data_files,
+        member_pattern={"data": "Quarterly_*.csv"},
+    )
+    assert "NAIRU" in dataframes["data"].columns
     with pytest.raises(
         ValueError,
-        match="dest_dir must be specified when reading a zip file.",
+        match="File not found in zip archive.",
     ):
-        load_data_files(data_files=data_files)
+        load_data_files(data_files=data_files, member_pattern="Annual_*.csv")
 
 
 @pytest.fixture()
@@ -107,6 +116,19 @@ def test_merge_data(example_data_1):
         merge_data(data=example_data_1, index="nonexistent_column")
 
 
+def test_merge_data_reports_truncating_data_sets():
+    dates = pd.date_range("2000-01-01", periods=8, freq="QS")
+    data = {
+        "long": pd.DataFrame({"TIME": dates, "A": range(8)}),
+        "late": pd.DataFrame({"TIME": dates[2:], "B": range(6)}),
+        "early": pd.DataFrame({"TIME": dates[::-1][2:], "C": range(6)}),
+    }
+    result = merge_data(data=data, index="TIME", end_date="2001-07-01")
+    assert list(result.index) == list(dates[2:6])
+    assert list(result.columns) == ["A", "B", "C"]
+    assert result.attrs["truncated_by"] == {"start": "late", "end": "early"}
+
+
 @pytest.fixture()
 def example_data():
     return pd.DataFrame({"A": [1, 2, 3, 4, 5], "B": [10, 20, 30, 40, 50]})
@@ -154,7 +176,7 @@ def test_calculate_expectations(example_data):
     assert result.shape == (5, 3)
 
 
-def test_clean_data(tmp_path):
+def test_clean_data():
     dfs = {
         "GDP": TEST_DIR / "data_management" / "sample_data" / "data_fixture.csv",
         "NAIRU": TEST_DIR / "data_management" / "sample_data" / "data_fixture.zip",
@@ -162,10 +184,7 @@ def test_clean_data(tmp_path):
     data_info = read_yaml(
         TEST_DIR / "data_management" / "sample_data" / "data_info_fixture.yaml",
     )
-    dfs = load_data_files(
-        data_files=dfs,
-        dest_dir=tmp_path,
-    )
+    dfs = load_data_files(data_files=dfs)
     cleaned_data_dict = clean_data(data=dfs, data_info=data_info)
     # Check that data is cleaned as expected
     assert isinstance(cleaned_data_dict, dict)
@@ -176,7 +195,37 @@ def test_clean_data(tmp_path):
         assert all(cleaned_data_dict["GDP"]["GDP"] == np.log(dfs["GDP"]["GDP"]))
 
 
-def test_merge_data(tmp_path):
+@pytest.mark.parametrize(
+    ("dates", "date_format"),
+    [
+        (["1960-01-01", "1960-04-01"], "iso"),
+        (["1960-Q1", "1960-Q2"], "quarterly"),
+        (["1960q1", "1960q2"], "quarterly"),
+        (["1960Q1", "1960Q2"], "quarterly"),
+    ],
+)
+def test_normalize_dates(dates, date_format):
+    dates = pd.Series(dates)
+    assert infer_date_format(dates) == date_format
+    normalized = normalize_dates(dates, date_format)
+    expected = pd.Series(pd.to_datetime(["1960-01-01", "1960-04-01"]))
+    pd.testing.assert_series_equal(normalized, expected)
+
+
+def test_infer_date_format_error():
+    with pytest.raises(ValueError):
+        infer_date_format(pd.Series(["01/01/1960"]))
+
+
+def test_quarter_start_dates_with_missing_values():
+    year = pd.Series([1960.0, 2020.0, np.nan])
+    quarter = pd.Series([4.0, 1.0, 2.0])
+    dates = quarter_start_dates(year, quarter)
+    assert list(dates[:2]) == list(pd.to_datetime(["1960-10-01", "2020-01-01"]))
+    assert pd.isna(dates[2])
+
+
+def test_merge_data():
     dfs = {
         "GDP": TEST_DIR / "data_management" / "sample_data" / "data_fixture.csv",
         "Emp": TEST_DIR / "data_management" / "sample_data" / "data_fixture.zip",
@@ -184,10 +233,7 @@ def test_merge_data(tmp_path):
     data_info = read_yaml(
         TEST_DIR / "data_management" / "sample_data" / "data_info_fixture.yaml",
     )
-    dfs = load_data_files(
-        data_files=dfs,
-        dest_dir=tmp_path,
-    )
+    dfs = load_data_files(data_files=dfs)
     cleaned_data = clean_data(data=dfs, data_info=data_info)
     merged_data = merge_data(data=cleaned_data, index="TIME")
     assert isinstance(merged_data, pd.DataFrame)
@@ -206,3 +252,17 @@ def test_read_csv_file():
     # Test that the function raises an exception for a non-existent file
     with pytest.raises(ValueError):
         read_csv_file("nonexistent_file.csv")
+
+
+def test_read_csv_file_skips_preamble_and_projects_columns(tmp_path):
+    file_path = tmp_path / "preamble.csv"
+    file_path.write_text(
+        "Table 32: Expected Change in Prices\n\nQuarter,Year,Mean\n1,1960,1.7\n2,1960,1.6\n",
+    )
+    result = read_csv_file(file_path)
+    assert list(result.columns) == ["Quarter", "Year", "Mean"]
+    assert result["Mean"].tolist() == [1.7, 1.6]
+
+    result = read_csv_file(file_path, usecols=["Year", "Mean"], nrows=1)
+    assert list(result.columns) == ["Year", "Mean"]
+    assert len(result) == 1
@@ -0,0 +1,76 @@
+"""Tests for the vectorized transformations of the data set."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.data_management.transformations import (
+    TRANSFORMS,
+    derive,
+    derive_family,
+    growth_rates,
+    polynomial_detrend,
+    rolling_means,
+    transformation_pipeline,
+)
+
+
+@pytest.fixture()
+def series():
+    rng = np.random.default_rng(3)
+    return pd.Series(
+        100 + np.cumsum(rng.normal(size=80)),
+        index=pd.date_range("2000-01-01", periods=80, freq="QS", name="TIME"),
+    )
+
+
+def test_polynomial_detrend_matches_polyfit(series):
+    detrended = polynomial_detrend(series, orders=[0, 1, 3])
+    trend = np.arange(len(series))
+    for i, order in enumerate([0, 1, 3]):
+        expected = series - np.polyval(np.polyfit(trend, series, order), trend)
+        np.testing.assert_allclose(detrended[:, i], expected, atol=1e-8)
+
+
+def test_polynomial_detrend_missing_values(series):
+    series.iloc[3] = np.nan
+    with pytest.raises(ValueError, match="missing values"):
+        polynomial_detrend(series, orders=[1])
+
+
+def test_rolling_means_match_pandas(series):
+    series.iloc[[5, 6, 30]] = np.nan
+    means = rolling_means(series, windows=[2, 4, 12], min_periods=2)
+    for i, window in enumerate([2, 4, 12]):
+        expected = series.rolling(window, min_periods=2).mean()
+        np.testing.assert_allclose(means[:, i], expected)
+
+
+def test_growth_rates_match_pandas(series):
+    rates = growth_rates(series, horizons=[1, 4])
+    for i, horizon in enumerate([1, 4]):
+        np.testing.assert_allclose(rates[:, i], series.pct_change(horizon) * 100)
+
+
+def test_derive_family_is_memoized(series, monkeypatch):
+    calls = []
+    function = TRANSFORMS["rolling_mean"]["function"]
+
+    def counted(values, windows, **options):
+        calls.append(list(windows))
+        return function(values, windows, **options)
+
+    monkeypatch.setitem(TRANSFORMS["rolling_mean"], "function", counted)
+    pipeline = transformation_pipeline(series.to_frame("Inflation"))
+    family = derive_family(pipeline, "Inflation", "rolling_mean", [2, 4])
+    assert derive(pipeline, "Inflation", "rolling_mean", 4) is family[4]
+    derive_family(pipeline, "Inflation", "rolling_mean", [4, 8])
+    derive(pipeline, "Inflation", "rolling_mean", 4, min_periods=4)
+    assert calls == [[2, 4], [8], [4]]
+    assert family[2].name == "Inflation_rolling_mean_2"
+    pd.testing.assert_index_equal(family[2].index, series.index)
+
+
+def test_derive_unknown_transform(series):
+    pipeline = transformation_pipeline(series.to_frame("Inflation"))
+    with pytest.raises(KeyError, match="Unknown transform"):
+        derive(pipeline, "Inflation", "log", 1)
@@ -0,0 +1,77 @@
+"""Tests for the regression plots."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nkpc_estimation.final.plot import (
+    evaluate_planes,
+    plot_regression,
+    plot_regressions,
+    regressor_grid,
+)
+
+
+@pytest.fixture()
+def regressors():
+    rng = np.random.default_rng(0)
+    return pd.Series(rng.normal(size=30)), pd.Series(rng.normal(size=30))
+
+
+def test_evaluate_planes_matches_direct_products(regressors):
+    grid = regressor_grid(*regressors, resolution=7)
+    params = np.array([[1.0, -0.5], [0.2, 2.0], [0.0, 0.0]])
+    planes = evaluate_planes(params, grid)
+    assert planes.shape == (3, 7, 7)
+    for plane, (beta_1, beta_2) in zip(planes, params):
+        np.testing.assert_allclose(plane, beta_1 * grid["xx"] + beta_2 * grid["yy"])
+
+
+def test_regressor_grid_spans_ranges(regressors):
+    x1, x2 = regressors
+    grid = regressor_grid(x1, x2, resolution=5)
+    assert grid["x1_range"] == (x1.min(), x1.max())
+    assert grid["xx"][0, 0] == x1.min() and grid["xx"][0, -1] == x1.max()
+    assert grid["yy"][0, 0] == x2.min() and grid["yy"][-1, 0] == x2.max()
+
+
+def test_plot_regressions_matches_plot_regression(regressors):
+    x1, x2 = regressors
+    y = x1 - x2
+    params = np.array([[1.0, -1.0], [0.5, 0.5]])
+    figures = plot_regressions(params, x1, x2, y, "x1", "x2", "y", titles=["a", "b"])
+    for fig, row, title in zip(figures, params, ["a", "b"]):
+        expected = plot_regression(row, x1, x2, y, "x1", "x2", "y", title=title)
+        np.testing.assert_allclose(fig.data[1].z, expected.data[1].z)
+        assert fig.layout.title.text == title
+
+
+def test_plot_regressions_rejects_unknown_backend(regressors):
+    with pytest.raises(ValueError, match="backend"):
+        plot_regressions(
+            np.ones((1, 2)),
+            *regressors,
+            regressors[0],
+            "x1",
+            "x2",
+            "y",
+            backend="bokeh"
+        )
+
+
+def test_matplotlib_backend_writes_pdf(regressors, tmp_path):
+    pytest.importorskip("matplotlib")
+    x1, x2 = regressors
+    fig = plot_regression(
+        np.array([1.0, -1.0]),
+        x1,
+        x2,
+        x1 - x2,
+        "x1",
+        "x2",
+        "y",
+        title="a",
+        backend="matplotlib",
+    )
+    fig.savefig(tmp_path / "a.pdf")
+    assert (tmp_path / "a.pdf").read_bytes().startswith(b"%PDF")
@@ -0,0 +1,28 @@
+"""Tests for the batched figure rendering."""
+
+from nkpc_estimation.final.render import stale_figures, write_figures
+
+
+class _Figure:
+    def __init__(self):
+        self.saved = []
+
+    def savefig(self, path):
+        self.saved.append(path)
+        with open(path, "w") as f:
+            f.write("figure")
+
+
+def test_write_figures_skips_unchanged_figures(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    paths = [str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")]
+    hashes = {paths[0]: "1", paths[1]: "2"}
+    assert stale_figures(hashes, manifest) == paths
+
+    figures = {path: _Figure() for path in paths}
+    write_figures(figures, hashes, manifest)
+    assert all(fig.saved == [path] for path, fig in figures.items())
+    assert stale_figures(hashes, manifest) == []
+
+    hashes[paths[1]] = "3"
+    assert stale_figures(hashes, manifest) == [paths[1]]
@@ -0,0 +1,54 @@
+"""Tests for the regression tables."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from nkpc_estimation.analysis.results import concat_stores, results_to_store
+from nkpc_estimation.final.tables import comparison_table, spec_tables
+from statsmodels.iolib.summary2 import summary_col
+
+
+@pytest.fixture()
+def models():
+    rng = np.random.default_rng(0)
+    design = rng.normal(size=(60, 2))
+    outcome = pd.Series(design @ [0.3, 0.05] + rng.normal(size=60), name="Inflation")
+    return {
+        "Unemp, BackExp": sm.OLS(outcome, design).fit(),
+        "Unemp, MSC": sm.OLS(outcome, design).fit(
+            cov_type="HAC",
+            cov_kwds={"maxlags": 4},
+        ),
+    }
+
+
+def test_spec_tables_match_summary_col(models):
+    tables = spec_tables(results_to_store(models, "OLS"))
+    for key, model in models.items():
+        expected = summary_col([model], stars=True, float_format="%0.2f").as_latex()
+        assert tables[(*key.split(", "), "OLS", "full")] == expected
+
+
+def test_comparison_table_has_rows_per_window(models):
+    store = concat_stores(
+        [
+            results_to_store(models, "OLS"),
+            results_to_store(models, "OLS", "2000-01-01"),
+            results_to_store({"GDP, MSC": models["Unemp, MSC"]}, "IV"),
+        ],
+    )
+    table = comparison_table(store, "OLS")
+    header = table.splitlines()[6]
+    assert "Unemp / BackExp" in header and "Unemp / MSC" in header
+    assert "GDP" not in header
+    assert table.index("Full sample") < table.index("Since 2000-01-01")
+
+
+def test_tables_of_posteriors_have_no_stars(models):
+    store = results_to_store(models, "Bayes")
+    store["cov_type"] = np.full(len(models), "posterior")
+    table = spec_tables(store)[("Unemp", "BackExp", "Bayes", "full")]
+    assert "*" not in table
+    assert "Posterior means" in table
+    assert "*" not in comparison_table(store, "Bayes")
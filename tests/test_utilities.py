@@ -0,0 +1,30 @@
+"""Tests for the utilities."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from nkpc_estimation.utilities import load_panel, save_panel
+
+
+@pytest.fixture()
+def data():
+    index = pd.date_range("2000-01-01", periods=4, freq="QS", name="TIME")
+    return pd.DataFrame({"A": [1.0, 2.0, np.nan, 4.0], "B": [1, 2, 3, 4]}, index=index)
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_save_and_load_panel(data, tmp_path, memory_map):
+    path = tmp_path / "data.arrow"
+    save_panel(data, path)
+    pd.testing.assert_frame_equal(
+        load_panel(path, memory_map=memory_map),
+        data,
+        check_freq=False,
+    )
+
+
+def test_load_panel_projects_columns(data, tmp_path):
+    path = tmp_path / "data.arrow"
+    save_panel(data, path)
+    result = load_panel(path, columns=["B"])
+    pd.testing.assert_frame_equal(result, data[["B"]], check_freq=False)